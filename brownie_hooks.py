@@ -1,3 +1,6 @@
 from dotenv import load_dotenv
 
+# pytest plugin hooks, see scripts/profiler.py
+from scripts.profiler import pytest_addoption, pytest_configure  # noqa: F401
+
 load_dotenv()
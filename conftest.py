@@ -0,0 +1,2 @@
+# pytest puts the directory of a conftest.py on sys.path, with this one at the root
+# `pytest tests/Model` imports jointsim and scripts as brownie test does
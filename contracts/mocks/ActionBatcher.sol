@@ -0,0 +1,33 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.6.12;
+pragma experimental ABIEncoderV2;
+
+/// @notice test helper that makes a scripted list of calls in one transaction, so setup
+/// phases (approvals, deposits, harvests across both vaults and providers) cost one RPC
+/// round trip. Calls are made as the batcher, which the tests make keeper where needed
+/// @dev reverts with the reason of the first failing call
+contract ActionBatcher {
+    address public owner;
+
+    constructor() public {
+        owner = msg.sender;
+    }
+
+    function execute(address[] calldata targets, bytes[] calldata data)
+        external
+        returns (bytes[] memory results)
+    {
+        require(msg.sender == owner, "!owner");
+        require(targets.length == data.length, "!length");
+        results = new bytes[](data.length);
+        for (uint256 i = 0; i < targets.length; i++) {
+            (bool success, bytes memory result) = targets[i].call(data[i]);
+            if (!success) {
+                assembly {
+                    revert(add(result, 32), mload(result))
+                }
+            }
+            results[i] = result;
+        }
+    }
+}
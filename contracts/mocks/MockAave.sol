@@ -0,0 +1,168 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.6.12;
+
+import {
+    SafeERC20,
+    SafeMath,
+    IERC20
+} from "@openzeppelin/contracts/token/ERC20/SafeERC20.sol";
+import {MockERC20} from "./MockERC20.sol";
+
+/// @notice Aave v3 aToken: scaled balances times the reserve's normalized income, backed by
+/// the underlying it holds
+/// @dev transfers aren't supported, the providers only read balanceOf
+contract MockAToken {
+    using SafeERC20 for IERC20;
+    using SafeMath for uint256;
+
+    uint256 constant RAY = 1e27;
+
+    MockAavePool public pool;
+    address public UNDERLYING_ASSET_ADDRESS;
+    uint8 public decimals;
+    uint256 public scaledTotalSupply;
+    mapping(address => uint256) public scaledBalanceOf;
+
+    constructor(
+        address _pool,
+        address _underlying,
+        uint8 _decimals
+    ) public {
+        pool = MockAavePool(_pool);
+        UNDERLYING_ASSET_ADDRESS = _underlying;
+        decimals = _decimals;
+    }
+
+    modifier onlyPool() {
+        require(msg.sender == address(pool), "CALLER_MUST_BE_POOL");
+        _;
+    }
+
+    function _index() internal view returns (uint256) {
+        return pool.getReserveNormalizedIncome(UNDERLYING_ASSET_ADDRESS);
+    }
+
+    function balanceOf(address user) external view returns (uint256) {
+        return scaledBalanceOf[user].mul(_index()).div(RAY);
+    }
+
+    function totalSupply() external view returns (uint256) {
+        return scaledTotalSupply.mul(_index()).div(RAY);
+    }
+
+    function mint(
+        address onBehalfOf,
+        uint256 amount,
+        uint256 index
+    ) external onlyPool {
+        uint256 scaled = amount.mul(RAY).div(index);
+        require(scaled != 0, "INVALID_MINT_AMOUNT");
+        scaledBalanceOf[onBehalfOf] = scaledBalanceOf[onBehalfOf].add(scaled);
+        scaledTotalSupply = scaledTotalSupply.add(scaled);
+    }
+
+    function burn(
+        address from,
+        address receiver,
+        uint256 amount,
+        uint256 index
+    ) external onlyPool {
+        uint256 scaled = amount.mul(RAY).div(index);
+        require(scaled != 0, "INVALID_BURN_AMOUNT");
+        scaledBalanceOf[from] = scaledBalanceOf[from].sub(scaled);
+        scaledTotalSupply = scaledTotalSupply.sub(scaled);
+        // no borrowers pay the interest, mint what the reserve is short of
+        uint256 cash = IERC20(UNDERLYING_ASSET_ADDRESS).balanceOf(address(this));
+        if (amount > cash) {
+            MockERC20(UNDERLYING_ASSET_ADDRESS).mint(address(this), amount.sub(cash));
+        }
+        IERC20(UNDERLYING_ASSET_ADDRESS).safeTransfer(receiver, amount);
+    }
+}
+
+/// @notice Aave v3 Pool supply / withdraw with no borrowers: each reserve's liquidity index
+/// grows linearly at liquidityRate (ray per year), as MathUtils.calculateLinearInterest
+contract MockAavePool {
+    using SafeERC20 for IERC20;
+    using SafeMath for uint256;
+
+    uint256 constant RAY = 1e27;
+    uint256 constant SECONDS_PER_YEAR = 365 days;
+
+    struct Reserve {
+        address aToken;
+        uint256 liquidityIndex;
+        uint256 liquidityRate;
+        uint256 lastUpdateTimestamp;
+    }
+
+    mapping(address => Reserve) public reserves;
+
+    function initReserve(address asset, address aToken) external {
+        require(reserves[asset].aToken == address(0), "RESERVE_ALREADY_INITIALIZED");
+        reserves[asset] = Reserve(aToken, RAY, 0, block.timestamp);
+    }
+
+    function setLiquidityRate(address asset, uint256 liquidityRate) external {
+        _updateState(asset);
+        reserves[asset].liquidityRate = liquidityRate;
+    }
+
+    function getReserveNormalizedIncome(address asset) public view returns (uint256) {
+        Reserve memory reserve = reserves[asset];
+        uint256 elapsed = block.timestamp.sub(reserve.lastUpdateTimestamp);
+        uint256 interest = RAY.add(reserve.liquidityRate.mul(elapsed).div(SECONDS_PER_YEAR));
+        return reserve.liquidityIndex.mul(interest).div(RAY);
+    }
+
+    function _updateState(address asset) internal returns (Reserve storage reserve) {
+        reserve = reserves[asset];
+        require(reserve.aToken != address(0), "RESERVE_NOT_INITIALIZED");
+        reserve.liquidityIndex = getReserveNormalizedIncome(asset);
+        reserve.lastUpdateTimestamp = block.timestamp;
+    }
+
+    function supply(
+        address asset,
+        uint256 amount,
+        address onBehalfOf,
+        uint16
+    ) external {
+        Reserve storage reserve = _updateState(asset);
+        IERC20(asset).safeTransferFrom(msg.sender, reserve.aToken, amount);
+        MockAToken(reserve.aToken).mint(onBehalfOf, amount, reserve.liquidityIndex);
+    }
+
+    function withdraw(
+        address asset,
+        uint256 amount,
+        address to
+    ) external returns (uint256) {
+        Reserve storage reserve = _updateState(asset);
+        uint256 userBalance = MockAToken(reserve.aToken).balanceOf(msg.sender);
+        if (amount == uint256(-1)) {
+            amount = userBalance;
+        }
+        require(amount != 0 && amount <= userBalance, "NOT_ENOUGH_AVAILABLE_USER_BALANCE");
+        MockAToken(reserve.aToken).burn(msg.sender, to, amount, reserve.liquidityIndex);
+        return amount;
+    }
+}
+
+/// @notice IPoolAddressesProvider calls providerAAVE and the tests make
+contract MockPoolAddressesProvider {
+    address public owner;
+    address public getPool;
+    address public getPriceOracle;
+
+    constructor(address _pool, address _priceOracle) public {
+        owner = msg.sender;
+        getPool = _pool;
+        getPriceOracle = _priceOracle;
+    }
+
+    function setPriceOracle(address newPriceOracle) external {
+        require(msg.sender == owner, "Ownable: caller is not the owner");
+        getPriceOracle = newPriceOracle;
+    }
+}
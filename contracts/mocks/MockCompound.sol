@@ -0,0 +1,130 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.6.12;
+
+import {
+    SafeERC20,
+    SafeMath,
+    IERC20
+} from "@openzeppelin/contracts/token/ERC20/SafeERC20.sol";
+import {ERC20} from "@openzeppelin/contracts/token/ERC20/ERC20.sol";
+import {MockERC20} from "./MockERC20.sol";
+
+/// @notice Scream / Iron Bank cErc20 with no borrowers: the exchange rate grows at
+/// supplyRatePerSecond and the interest is minted into the market as underlying
+/// @dev error codes follow Compound, 0 is success
+contract MockCToken is ERC20 {
+    using SafeERC20 for IERC20;
+    using SafeMath for uint256;
+
+    address public underlying;
+    address public comptroller;
+    uint256 public exchangeRateStored;
+    uint256 public supplyRatePerSecond;
+    uint256 public accrualBlockTimestamp;
+
+    constructor(
+        address _underlying,
+        address _comptroller,
+        uint256 _initialExchangeRate
+    ) public ERC20("Mock cToken", "cMOCK") {
+        _setupDecimals(8);
+        underlying = _underlying;
+        comptroller = _comptroller;
+        exchangeRateStored = _initialExchangeRate;
+        accrualBlockTimestamp = block.timestamp;
+    }
+
+    function setSupplyRatePerSecond(uint256 _supplyRatePerSecond) external {
+        accrueInterest();
+        supplyRatePerSecond = _supplyRatePerSecond;
+    }
+
+    function supplyRatePerBlock() external view returns (uint256) {
+        return supplyRatePerSecond;
+    }
+
+    function getCash() public view returns (uint256) {
+        return IERC20(underlying).balanceOf(address(this));
+    }
+
+    function accrueInterest() public returns (uint256) {
+        uint256 delta = block.timestamp.sub(accrualBlockTimestamp);
+        if (delta == 0) return 0;
+        accrualBlockTimestamp = block.timestamp;
+        uint256 rate = exchangeRateStored;
+        exchangeRateStored = rate.add(rate.mul(supplyRatePerSecond).mul(delta).div(1e18));
+        uint256 owed = totalSupply().mul(exchangeRateStored).div(1e18);
+        if (owed > getCash()) {
+            MockERC20(underlying).mint(address(this), owed.sub(getCash()));
+        }
+        return 0;
+    }
+
+    function exchangeRateCurrent() external returns (uint256) {
+        accrueInterest();
+        return exchangeRateStored;
+    }
+
+    function balanceOfUnderlying(address owner) external returns (uint256) {
+        accrueInterest();
+        return balanceOf(owner).mul(exchangeRateStored).div(1e18);
+    }
+
+    function mint(uint256 mintAmount) external returns (uint256) {
+        accrueInterest();
+        IERC20(underlying).safeTransferFrom(msg.sender, address(this), mintAmount);
+        _mint(msg.sender, mintAmount.mul(1e18).div(exchangeRateStored));
+        return 0;
+    }
+
+    function redeem(uint256 redeemTokens) external returns (uint256) {
+        accrueInterest();
+        _burn(msg.sender, redeemTokens);
+        IERC20(underlying).safeTransfer(msg.sender, redeemTokens.mul(exchangeRateStored).div(1e18));
+        return 0;
+    }
+
+    function redeemUnderlying(uint256 redeemAmount) external returns (uint256) {
+        accrueInterest();
+        _burn(msg.sender, redeemAmount.mul(1e18).div(exchangeRateStored));
+        IERC20(underlying).safeTransfer(msg.sender, redeemAmount);
+        return 0;
+    }
+}
+
+/// @notice comptroller calls the providers and ScreamPriceOracle make: markets to enter,
+/// the price oracle and comp claims paid from a mintable comp token
+contract MockComptroller {
+    address public oracle;
+    MockERC20 public compToken;
+    mapping(address => uint256) public compAccrued;
+
+    constructor(address _oracle, address _compToken) public {
+        oracle = _oracle;
+        compToken = MockERC20(_compToken);
+    }
+
+    function setOracle(address _oracle) external {
+        oracle = _oracle;
+    }
+
+    function setCompAccrued(address holder, uint256 amount) external {
+        compAccrued[holder] = amount;
+    }
+
+    function enterMarkets(address[] calldata cTokens) external returns (uint256[] memory results) {
+        results = new uint256[](cTokens.length);
+    }
+
+    function exitMarket(address) external returns (uint256) {
+        return 0;
+    }
+
+    function claimComp(address holder) public {
+        uint256 amount = compAccrued[holder];
+        compAccrued[holder] = 0;
+        if (amount > 0) {
+            compToken.mint(holder, amount);
+        }
+    }
+}
@@ -0,0 +1,125 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.6.12;
+
+import {
+    SafeERC20,
+    SafeMath,
+    IERC20
+} from "@openzeppelin/contracts/token/ERC20/SafeERC20.sol";
+import {MockERC20} from "./MockERC20.sol";
+
+/// @notice LQDR-style MasterChefV2 (IMasterChefv2 in lpHolderUniV2.sol) minting a MockERC20
+/// reward at rewardPerSecond, split across pools by allocPoint
+contract MockMasterChef {
+    using SafeERC20 for IERC20;
+    using SafeMath for uint256;
+
+    uint256 constant ACC_PRECISION = 1e12;
+
+    struct UserInfo {
+        uint256 amount;
+        uint256 rewardDebt;
+    }
+
+    struct PoolInfo {
+        uint256 allocPoint;
+        uint256 lastRewardTime;
+        uint256 accRewardPerShare;
+    }
+
+    MockERC20 public rewardToken;
+    uint256 public rewardPerSecond;
+    uint256 public totalAllocPoint;
+
+    IERC20[] public lpToken;
+    PoolInfo[] public poolInfo;
+    mapping(uint256 => mapping(address => UserInfo)) public userInfo;
+
+    constructor(address _rewardToken, uint256 _rewardPerSecond) public {
+        rewardToken = MockERC20(_rewardToken);
+        rewardPerSecond = _rewardPerSecond;
+    }
+
+    function poolLength() external view returns (uint256) {
+        return poolInfo.length;
+    }
+
+    function lqdrPerBlock() external view returns (uint256) {
+        return rewardPerSecond;
+    }
+
+    function add(uint256 _allocPoint, address _lpToken) external returns (uint256 pid) {
+        totalAllocPoint = totalAllocPoint.add(_allocPoint);
+        lpToken.push(IERC20(_lpToken));
+        poolInfo.push(PoolInfo(_allocPoint, block.timestamp, 0));
+        pid = poolInfo.length - 1;
+    }
+
+    function setRewardPerSecond(uint256 _rewardPerSecond) external {
+        rewardPerSecond = _rewardPerSecond;
+    }
+
+    function _accRewardPerShare(uint256 _pid) internal view returns (uint256) {
+        PoolInfo memory pool = poolInfo[_pid];
+        uint256 lpSupply = lpToken[_pid].balanceOf(address(this));
+        if (block.timestamp <= pool.lastRewardTime || lpSupply == 0 || totalAllocPoint == 0) {
+            return pool.accRewardPerShare;
+        }
+        uint256 reward =
+            block.timestamp.sub(pool.lastRewardTime).mul(rewardPerSecond).mul(pool.allocPoint).div(totalAllocPoint);
+        return pool.accRewardPerShare.add(reward.mul(ACC_PRECISION).div(lpSupply));
+    }
+
+    function updatePool(uint256 _pid) public {
+        PoolInfo storage pool = poolInfo[_pid];
+        pool.accRewardPerShare = _accRewardPerShare(_pid);
+        pool.lastRewardTime = block.timestamp;
+    }
+
+    function pendingLqdr(uint256 _pid, address _user) external view returns (uint256) {
+        UserInfo memory user = userInfo[_pid][_user];
+        return user.amount.mul(_accRewardPerShare(_pid)).div(ACC_PRECISION).sub(user.rewardDebt);
+    }
+
+    function _pay(uint256 _pid, address _user, address _to) internal {
+        UserInfo storage user = userInfo[_pid][_user];
+        uint256 accumulated = user.amount.mul(poolInfo[_pid].accRewardPerShare).div(ACC_PRECISION);
+        uint256 pending = accumulated.sub(user.rewardDebt);
+        user.rewardDebt = accumulated;
+        if (pending > 0) {
+            rewardToken.mint(_to, pending);
+        }
+    }
+
+    /// @dev unlike MasterChefV2 pending rewards are paid out on deposit / withdraw
+    function deposit(uint256 _pid, uint256 _amount, address _to) external {
+        updatePool(_pid);
+        _pay(_pid, _to, _to);
+        lpToken[_pid].safeTransferFrom(msg.sender, address(this), _amount);
+        UserInfo storage user = userInfo[_pid][_to];
+        user.amount = user.amount.add(_amount);
+        user.rewardDebt = user.amount.mul(poolInfo[_pid].accRewardPerShare).div(ACC_PRECISION);
+    }
+
+    function withdraw(uint256 _pid, uint256 _amount, address _to) external {
+        updatePool(_pid);
+        _pay(_pid, msg.sender, _to);
+        UserInfo storage user = userInfo[_pid][msg.sender];
+        user.amount = user.amount.sub(_amount);
+        user.rewardDebt = user.amount.mul(poolInfo[_pid].accRewardPerShare).div(ACC_PRECISION);
+        lpToken[_pid].safeTransfer(_to, _amount);
+    }
+
+    function harvest(uint256 _pid, address _to) external {
+        updatePool(_pid);
+        _pay(_pid, msg.sender, _to);
+    }
+
+    function emergencyWithdraw(uint256 _pid) external {
+        UserInfo storage user = userInfo[_pid][msg.sender];
+        uint256 amount = user.amount;
+        user.amount = 0;
+        user.rewardDebt = 0;
+        lpToken[_pid].safeTransfer(msg.sender, amount);
+    }
+}
@@ -0,0 +1,581 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.6.12;
+pragma experimental ABIEncoderV2;
+
+import {
+    SafeERC20,
+    SafeMath,
+    IERC20
+} from "@openzeppelin/contracts/token/ERC20/SafeERC20.sol";
+import {ERC20} from "@openzeppelin/contracts/token/ERC20/ERC20.sol";
+import {Math} from "@openzeppelin/contracts/math/Math.sol";
+import {Route} from "../interfaces/ISolidlyRouter01.sol";
+import {MockERC20} from "./MockERC20.sol";
+
+/// @notice Velodrome v1 BaseV1Pair (IBaseV1Pair) with the swap fee in bps of amountIn.
+/// Fees are sent to the factory rather than left in the reserves, as PairFees does
+/// @dev no TWAP observations, claimable fees or flash swaps
+contract MockSolidlyPair is ERC20 {
+    using SafeERC20 for IERC20;
+    using SafeMath for uint256;
+
+    uint256 public constant MINIMUM_LIQUIDITY = 10**3;
+    uint256 constant BASIS_PRECISION = 10000;
+
+    address public factory;
+    address public token0;
+    address public token1;
+    bool public stable;
+    uint256 public swapFee;
+
+    uint256 decimals0;
+    uint256 decimals1;
+    uint256 private reserve0;
+    uint256 private reserve1;
+    uint256 private blockTimestampLast;
+
+    constructor(
+        address _token0,
+        address _token1,
+        bool _stable,
+        uint256 _swapFee
+    ) public ERC20("Mock Solidly LP", "MOCK-SLP") {
+        factory = msg.sender;
+        token0 = _token0;
+        token1 = _token1;
+        stable = _stable;
+        swapFee = _swapFee;
+        decimals0 = 10**uint256(ERC20(_token0).decimals());
+        decimals1 = 10**uint256(ERC20(_token1).decimals());
+    }
+
+    function metadata()
+        external
+        view
+        returns (
+            uint256 dec0,
+            uint256 dec1,
+            uint256 r0,
+            uint256 r1,
+            bool st,
+            address t0,
+            address t1
+        )
+    {
+        return (decimals0, decimals1, reserve0, reserve1, stable, token0, token1);
+    }
+
+    function getReserves()
+        public
+        view
+        returns (
+            uint112 _reserve0,
+            uint112 _reserve1,
+            uint32 _blockTimestampLast
+        )
+    {
+        return (uint112(reserve0), uint112(reserve1), uint32(blockTimestampLast));
+    }
+
+    function _update(uint256 balance0, uint256 balance1) internal {
+        require(balance0 <= uint112(-1) && balance1 <= uint112(-1), "BaseV1: OVERFLOW");
+        reserve0 = balance0;
+        reserve1 = balance1;
+        blockTimestampLast = block.timestamp;
+    }
+
+    function mint(address to) external returns (uint256 liquidity) {
+        uint256 balance0 = IERC20(token0).balanceOf(address(this));
+        uint256 balance1 = IERC20(token1).balanceOf(address(this));
+        uint256 amount0 = balance0.sub(reserve0);
+        uint256 amount1 = balance1.sub(reserve1);
+
+        if (totalSupply() == 0) {
+            liquidity = _sqrt(amount0.mul(amount1)).sub(MINIMUM_LIQUIDITY);
+            // OZ won't mint to address(0), lock the minimum liquidity at address(1) instead
+            _mint(address(1), MINIMUM_LIQUIDITY);
+        } else {
+            liquidity = Math.min(
+                amount0.mul(totalSupply()) / reserve0,
+                amount1.mul(totalSupply()) / reserve1
+            );
+        }
+        require(liquidity > 0, "BaseV1: ILM");
+        _mint(to, liquidity);
+        _update(balance0, balance1);
+    }
+
+    function burn(address to) external returns (uint256 amount0, uint256 amount1) {
+        uint256 balance0 = IERC20(token0).balanceOf(address(this));
+        uint256 balance1 = IERC20(token1).balanceOf(address(this));
+        uint256 liquidity = balanceOf(address(this));
+
+        amount0 = liquidity.mul(balance0) / totalSupply();
+        amount1 = liquidity.mul(balance1) / totalSupply();
+        require(amount0 > 0 && amount1 > 0, "BaseV1: ILB");
+        _burn(address(this), liquidity);
+        IERC20(token0).safeTransfer(to, amount0);
+        IERC20(token1).safeTransfer(to, amount1);
+        _update(IERC20(token0).balanceOf(address(this)), IERC20(token1).balanceOf(address(this)));
+    }
+
+    function swap(
+        uint256 amount0Out,
+        uint256 amount1Out,
+        address to,
+        bytes calldata
+    ) external {
+        require(amount0Out > 0 || amount1Out > 0, "BaseV1: IOA");
+        require(amount0Out < reserve0 && amount1Out < reserve1, "BaseV1: IL");
+        require(to != token0 && to != token1, "BaseV1: IT");
+
+        if (amount0Out > 0) IERC20(token0).safeTransfer(to, amount0Out);
+        if (amount1Out > 0) IERC20(token1).safeTransfer(to, amount1Out);
+        uint256 balance0 = IERC20(token0).balanceOf(address(this));
+        uint256 balance1 = IERC20(token1).balanceOf(address(this));
+
+        uint256 amount0In = balance0 > reserve0 - amount0Out ? balance0 - (reserve0 - amount0Out) : 0;
+        uint256 amount1In = balance1 > reserve1 - amount1Out ? balance1 - (reserve1 - amount1Out) : 0;
+        require(amount0In > 0 || amount1In > 0, "BaseV1: IIA");
+
+        // fees leave the pair before k is checked
+        if (amount0In > 0) IERC20(token0).safeTransfer(factory, amount0In.mul(swapFee) / BASIS_PRECISION);
+        if (amount1In > 0) IERC20(token1).safeTransfer(factory, amount1In.mul(swapFee) / BASIS_PRECISION);
+        balance0 = IERC20(token0).balanceOf(address(this));
+        balance1 = IERC20(token1).balanceOf(address(this));
+        require(_k(balance0, balance1) >= _k(reserve0, reserve1), "BaseV1: K");
+        _update(balance0, balance1);
+    }
+
+    function sync() external {
+        _update(IERC20(token0).balanceOf(address(this)), IERC20(token1).balanceOf(address(this)));
+    }
+
+    function getAmountOut(uint256 amountIn, address tokenIn) external view returns (uint256) {
+        amountIn = amountIn.sub(amountIn.mul(swapFee) / BASIS_PRECISION);
+        return _getAmountOut(amountIn, tokenIn, reserve0, reserve1);
+    }
+
+    function _getAmountOut(
+        uint256 amountIn,
+        address tokenIn,
+        uint256 _reserve0,
+        uint256 _reserve1
+    ) internal view returns (uint256) {
+        if (stable) {
+            uint256 xy = _k(_reserve0, _reserve1);
+            _reserve0 = _reserve0.mul(1e18) / decimals0;
+            _reserve1 = _reserve1.mul(1e18) / decimals1;
+            (uint256 reserveA, uint256 reserveB) =
+                tokenIn == token0 ? (_reserve0, _reserve1) : (_reserve1, _reserve0);
+            amountIn = tokenIn == token0 ? amountIn.mul(1e18) / decimals0 : amountIn.mul(1e18) / decimals1;
+            uint256 y = reserveB.sub(_get_y(amountIn.add(reserveA), xy, reserveB));
+            return y.mul(tokenIn == token0 ? decimals1 : decimals0) / 1e18;
+        }
+        (uint256 reserveA, uint256 reserveB) =
+            tokenIn == token0 ? (_reserve0, _reserve1) : (_reserve1, _reserve0);
+        return amountIn.mul(reserveB) / reserveA.add(amountIn);
+    }
+
+    function _k(uint256 x, uint256 y) internal view returns (uint256) {
+        if (stable) {
+            uint256 _x = x.mul(1e18) / decimals0;
+            uint256 _y = y.mul(1e18) / decimals1;
+            uint256 _a = _x.mul(_y) / 1e18;
+            uint256 _b = (_x.mul(_x) / 1e18).add(_y.mul(_y) / 1e18);
+            return _a.mul(_b) / 1e18; // x3y+y3x >= k
+        }
+        return x.mul(y); // xy >= k
+    }
+
+    function _f(uint256 x0, uint256 y) internal pure returns (uint256) {
+        uint256 y3 = y.mul(y).div(1e18).mul(y).div(1e18);
+        uint256 x3 = x0.mul(x0).div(1e18).mul(x0).div(1e18);
+        return x0.mul(y3).div(1e18).add(x3.mul(y).div(1e18));
+    }
+
+    function _d(uint256 x0, uint256 y) internal pure returns (uint256) {
+        uint256 x3 = x0.mul(x0).div(1e18).mul(x0).div(1e18);
+        return x0.mul(3).mul(y.mul(y).div(1e18)).div(1e18).add(x3);
+    }
+
+    function _get_y(
+        uint256 x0,
+        uint256 xy,
+        uint256 y
+    ) internal pure returns (uint256) {
+        for (uint256 i = 0; i < 255; i++) {
+            uint256 y_prev = y;
+            uint256 k = _f(x0, y);
+            if (k < xy) {
+                y = y.add(xy.sub(k).mul(1e18) / _d(x0, y));
+            } else {
+                y = y.sub(k.sub(xy).mul(1e18) / _d(x0, y));
+            }
+            if (y > y_prev) {
+                if (y - y_prev <= 1) {
+                    return y;
+                }
+            } else {
+                if (y_prev - y <= 1) {
+                    return y;
+                }
+            }
+        }
+        return y;
+    }
+
+    function _sqrt(uint256 y) internal pure returns (uint256 z) {
+        if (y > 3) {
+            z = y;
+            uint256 x = y / 2 + 1;
+            while (x < z) {
+                z = x;
+                x = (y / x + x) / 2;
+            }
+        } else if (y != 0) {
+            z = 1;
+        }
+    }
+}
+
+/// @notice PairFactory with one fee for each curve, in bps (getFee, 2 = 0.02%). Swap fees
+/// of its pairs end up here
+contract MockSolidlyFactory {
+    uint256 public volatileFee;
+    uint256 public stableFee;
+    mapping(address => mapping(address => mapping(bool => address))) public getPair;
+    mapping(address => bool) public isPair;
+    address[] public allPairs;
+
+    constructor(uint256 _volatileFee, uint256 _stableFee) public {
+        volatileFee = _volatileFee;
+        stableFee = _stableFee;
+    }
+
+    function allPairsLength() external view returns (uint256) {
+        return allPairs.length;
+    }
+
+    function getFee(bool _stable) external view returns (uint256) {
+        return _stable ? stableFee : volatileFee;
+    }
+
+    function createPair(
+        address tokenA,
+        address tokenB,
+        bool stable
+    ) external returns (address pair) {
+        require(tokenA != tokenB, "IA");
+        (address token0, address token1) = tokenA < tokenB ? (tokenA, tokenB) : (tokenB, tokenA);
+        require(getPair[token0][token1][stable] == address(0), "PE");
+        pair = address(new MockSolidlyPair(token0, token1, stable, stable ? stableFee : volatileFee));
+        getPair[token0][token1][stable] = pair;
+        getPair[token1][token0][stable] = pair;
+        isPair[pair] = true;
+        allPairs.push(pair);
+    }
+}
+
+/// @notice the ISolidlyRouter01 calls lpHolderVelo and the tests make
+contract MockSolidlyRouter {
+    using SafeERC20 for IERC20;
+    using SafeMath for uint256;
+
+    address public factory;
+    address public weth;
+
+    constructor(address _factory, address _weth) public {
+        factory = _factory;
+        weth = _weth;
+    }
+
+    modifier ensure(uint256 deadline) {
+        require(deadline >= block.timestamp, "BaseV1Router: EXPIRED");
+        _;
+    }
+
+    function pairFor(
+        address tokenA,
+        address tokenB,
+        bool stable
+    ) public view returns (address pair) {
+        pair = MockSolidlyFactory(factory).getPair(tokenA, tokenB, stable);
+    }
+
+    function _pairFor(
+        address tokenA,
+        address tokenB,
+        bool stable
+    ) internal view returns (MockSolidlyPair pair) {
+        pair = MockSolidlyPair(pairFor(tokenA, tokenB, stable));
+        require(address(pair) != address(0), "BaseV1Router: NO_PAIR");
+    }
+
+    function getReserves(
+        address tokenA,
+        address tokenB,
+        bool stable
+    ) public view returns (uint256 reserveA, uint256 reserveB) {
+        MockSolidlyPair pair = _pairFor(tokenA, tokenB, stable);
+        (uint256 reserve0, uint256 reserve1, ) = pair.getReserves();
+        (reserveA, reserveB) = tokenA == pair.token0() ? (reserve0, reserve1) : (reserve1, reserve0);
+    }
+
+    function getAmountOut(
+        uint256 amountIn,
+        address tokenIn,
+        address tokenOut
+    ) external view returns (uint256 amount, bool stable) {
+        uint256 amountStable;
+        uint256 amountVolatile;
+        address pair = pairFor(tokenIn, tokenOut, true);
+        if (pair != address(0)) {
+            amountStable = MockSolidlyPair(pair).getAmountOut(amountIn, tokenIn);
+        }
+        pair = pairFor(tokenIn, tokenOut, false);
+        if (pair != address(0)) {
+            amountVolatile = MockSolidlyPair(pair).getAmountOut(amountIn, tokenIn);
+        }
+        return amountStable > amountVolatile ? (amountStable, true) : (amountVolatile, false);
+    }
+
+    function getAmountsOut(uint256 amountIn, Route[] memory routes) public view returns (uint256[] memory amounts) {
+        require(routes.length >= 1, "BaseV1Router: INVALID_PATH");
+        amounts = new uint256[](routes.length + 1);
+        amounts[0] = amountIn;
+        for (uint256 i = 0; i < routes.length; i++) {
+            amounts[i + 1] = _pairFor(routes[i].from, routes[i].to, routes[i].stable).getAmountOut(
+                amounts[i],
+                routes[i].from
+            );
+        }
+    }
+
+    function quoteLiquidity(
+        uint256 amountA,
+        uint256 reserveA,
+        uint256 reserveB
+    ) public pure returns (uint256 amountB) {
+        require(amountA > 0, "BaseV1Router: INSUFFICIENT_AMOUNT");
+        require(reserveA > 0 && reserveB > 0, "BaseV1Router: INSUFFICIENT_LIQUIDITY");
+        amountB = amountA.mul(reserveB) / reserveA;
+    }
+
+    function _addLiquidity(
+        address tokenA,
+        address tokenB,
+        bool stable,
+        uint256 amountADesired,
+        uint256 amountBDesired,
+        uint256 amountAMin,
+        uint256 amountBMin
+    ) internal returns (uint256 amountA, uint256 amountB) {
+        if (pairFor(tokenA, tokenB, stable) == address(0)) {
+            MockSolidlyFactory(factory).createPair(tokenA, tokenB, stable);
+        }
+        (uint256 reserveA, uint256 reserveB) = getReserves(tokenA, tokenB, stable);
+        if (reserveA == 0 && reserveB == 0) {
+            (amountA, amountB) = (amountADesired, amountBDesired);
+        } else {
+            uint256 amountBOptimal = quoteLiquidity(amountADesired, reserveA, reserveB);
+            if (amountBOptimal <= amountBDesired) {
+                require(amountBOptimal >= amountBMin, "BaseV1Router: INSUFFICIENT_B_AMOUNT");
+                (amountA, amountB) = (amountADesired, amountBOptimal);
+            } else {
+                uint256 amountAOptimal = quoteLiquidity(amountBDesired, reserveB, reserveA);
+                assert(amountAOptimal <= amountADesired);
+                require(amountAOptimal >= amountAMin, "BaseV1Router: INSUFFICIENT_A_AMOUNT");
+                (amountA, amountB) = (amountAOptimal, amountBDesired);
+            }
+        }
+    }
+
+    function addLiquidity(
+        address tokenA,
+        address tokenB,
+        bool stable,
+        uint256 amountADesired,
+        uint256 amountBDesired,
+        uint256 amountAMin,
+        uint256 amountBMin,
+        address to,
+        uint256 deadline
+    )
+        external
+        ensure(deadline)
+        returns (
+            uint256 amountA,
+            uint256 amountB,
+            uint256 liquidity
+        )
+    {
+        (amountA, amountB) = _addLiquidity(tokenA, tokenB, stable, amountADesired, amountBDesired, amountAMin, amountBMin);
+        MockSolidlyPair pair = _pairFor(tokenA, tokenB, stable);
+        IERC20(tokenA).safeTransferFrom(msg.sender, address(pair), amountA);
+        IERC20(tokenB).safeTransferFrom(msg.sender, address(pair), amountB);
+        liquidity = pair.mint(to);
+    }
+
+    function removeLiquidity(
+        address tokenA,
+        address tokenB,
+        bool stable,
+        uint256 liquidity,
+        uint256 amountAMin,
+        uint256 amountBMin,
+        address to,
+        uint256 deadline
+    ) public ensure(deadline) returns (uint256 amountA, uint256 amountB) {
+        MockSolidlyPair pair = _pairFor(tokenA, tokenB, stable);
+        IERC20(address(pair)).safeTransferFrom(msg.sender, address(pair), liquidity);
+        (uint256 amount0, uint256 amount1) = pair.burn(to);
+        (amountA, amountB) = tokenA == pair.token0() ? (amount0, amount1) : (amount1, amount0);
+        require(amountA >= amountAMin, "BaseV1Router: INSUFFICIENT_A_AMOUNT");
+        require(amountB >= amountBMin, "BaseV1Router: INSUFFICIENT_B_AMOUNT");
+    }
+
+    function _swap(
+        uint256[] memory amounts,
+        Route[] memory routes,
+        address to
+    ) internal {
+        for (uint256 i = 0; i < routes.length; i++) {
+            MockSolidlyPair pair = _pairFor(routes[i].from, routes[i].to, routes[i].stable);
+            uint256 amountOut = amounts[i + 1];
+            (uint256 amount0Out, uint256 amount1Out) =
+                routes[i].from == pair.token0() ? (uint256(0), amountOut) : (amountOut, uint256(0));
+            address receiver =
+                i < routes.length - 1
+                    ? address(_pairFor(routes[i + 1].from, routes[i + 1].to, routes[i + 1].stable))
+                    : to;
+            pair.swap(amount0Out, amount1Out, receiver, new bytes(0));
+        }
+    }
+
+    function swapExactTokensForTokensSimple(
+        uint256 amountIn,
+        uint256 amountOutMin,
+        address tokenFrom,
+        address tokenTo,
+        bool stable,
+        address to,
+        uint256 deadline
+    ) external ensure(deadline) returns (uint256[] memory amounts) {
+        Route[] memory routes = new Route[](1);
+        routes[0] = Route(tokenFrom, tokenTo, stable);
+        amounts = getAmountsOut(amountIn, routes);
+        require(amounts[amounts.length - 1] >= amountOutMin, "BaseV1Router: INSUFFICIENT_OUTPUT_AMOUNT");
+        IERC20(tokenFrom).safeTransferFrom(msg.sender, address(_pairFor(tokenFrom, tokenTo, stable)), amounts[0]);
+        _swap(amounts, routes, to);
+    }
+
+    function swapExactTokensForTokens(
+        uint256 amountIn,
+        uint256 amountOutMin,
+        Route[] memory routes,
+        address to,
+        uint256 deadline
+    ) external ensure(deadline) returns (uint256[] memory amounts) {
+        amounts = getAmountsOut(amountIn, routes);
+        require(amounts[amounts.length - 1] >= amountOutMin, "BaseV1Router: INSUFFICIENT_OUTPUT_AMOUNT");
+        IERC20(routes[0].from).safeTransferFrom(
+            msg.sender,
+            address(_pairFor(routes[0].from, routes[0].to, routes[0].stable)),
+            amounts[0]
+        );
+        _swap(amounts, routes, to);
+    }
+}
+
+/// @notice Velodrome Gauge (IGauge) paying one MockERC20 reward at rewardRate per second
+/// of staked LP, shared pro rata
+/// @dev no veNFT boost, tokenId is ignored
+contract MockGauge {
+    using SafeERC20 for IERC20;
+    using SafeMath for uint256;
+
+    IERC20 public stake;
+    MockERC20 public rewardToken;
+    uint256 public rewardRate;
+    uint256 public totalSupply;
+    uint256 public lastUpdateTime;
+    uint256 public rewardPerTokenStored;
+
+    mapping(address => uint256) public balanceOf;
+    mapping(address => uint256) public userRewardPerTokenPaid;
+    mapping(address => uint256) public rewards;
+
+    constructor(
+        address _stake,
+        address _rewardToken,
+        uint256 _rewardRate
+    ) public {
+        stake = IERC20(_stake);
+        rewardToken = MockERC20(_rewardToken);
+        rewardRate = _rewardRate;
+        lastUpdateTime = block.timestamp;
+    }
+
+    modifier updateReward(address account) {
+        rewardPerTokenStored = rewardPerToken();
+        lastUpdateTime = block.timestamp;
+        rewards[account] = earned(address(rewardToken), account);
+        userRewardPerTokenPaid[account] = rewardPerTokenStored;
+        _;
+    }
+
+    function setRewardRate(uint256 _rewardRate) external updateReward(address(0)) {
+        rewardRate = _rewardRate;
+    }
+
+    function rewardPerToken() public view returns (uint256) {
+        if (totalSupply == 0) {
+            return rewardPerTokenStored;
+        }
+        return rewardPerTokenStored.add(block.timestamp.sub(lastUpdateTime).mul(rewardRate).mul(1e18).div(totalSupply));
+    }
+
+    function earned(address token, address account) public view returns (uint256) {
+        if (token != address(rewardToken)) {
+            return 0;
+        }
+        return
+            balanceOf[account].mul(rewardPerToken().sub(userRewardPerTokenPaid[account])).div(1e18).add(
+                rewards[account]
+            );
+    }
+
+    function depositAll(uint256 tokenId) external {
+        deposit(stake.balanceOf(msg.sender), tokenId);
+    }
+
+    function deposit(uint256 amount, uint256) public updateReward(msg.sender) {
+        require(amount > 0);
+        stake.safeTransferFrom(msg.sender, address(this), amount);
+        totalSupply = totalSupply.add(amount);
+        balanceOf[msg.sender] = balanceOf[msg.sender].add(amount);
+    }
+
+    function withdrawAll() external {
+        withdraw(balanceOf[msg.sender]);
+    }
+
+    function withdraw(uint256 amount) public updateReward(msg.sender) {
+        totalSupply = totalSupply.sub(amount);
+        balanceOf[msg.sender] = balanceOf[msg.sender].sub(amount);
+        stake.safeTransfer(msg.sender, amount);
+    }
+
+    function getReward(address account, address[] memory tokens) external updateReward(account) {
+        require(msg.sender == account);
+        for (uint256 i = 0; i < tokens.length; i++) {
+            if (tokens[i] != address(rewardToken)) continue;
+            uint256 reward = rewards[account];
+            rewards[account] = 0;
+            if (reward > 0) {
+                rewardToken.mint(account, reward);
+            }
+        }
+    }
+}
@@ -0,0 +1,325 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.6.12;
+
+import {
+    SafeERC20,
+    SafeMath,
+    IERC20
+} from "@openzeppelin/contracts/token/ERC20/SafeERC20.sol";
+import {ERC20} from "@openzeppelin/contracts/token/ERC20/ERC20.sol";
+import {Math} from "@openzeppelin/contracts/math/Math.sol";
+
+/// @notice UniswapV2Pair with the swap fee in bps (20 on Spooky, 30 on Spirit)
+/// @dev no TWAP accumulators, flash swaps or protocol fee
+contract MockUniswapV2Pair is ERC20 {
+    using SafeERC20 for IERC20;
+    using SafeMath for uint256;
+
+    uint256 public constant MINIMUM_LIQUIDITY = 10**3;
+    uint256 constant BASIS_PRECISION = 10000;
+
+    address public factory;
+    address public token0;
+    address public token1;
+    uint256 public swapFee;
+
+    uint112 private reserve0;
+    uint112 private reserve1;
+    uint32 private blockTimestampLast;
+
+    constructor(
+        address _token0,
+        address _token1,
+        uint256 _swapFee
+    ) public ERC20("Mock UniswapV2 LP", "MOCK-LP") {
+        factory = msg.sender;
+        token0 = _token0;
+        token1 = _token1;
+        swapFee = _swapFee;
+    }
+
+    function getReserves()
+        public
+        view
+        returns (
+            uint112 _reserve0,
+            uint112 _reserve1,
+            uint32 _blockTimestampLast
+        )
+    {
+        return (reserve0, reserve1, blockTimestampLast);
+    }
+
+    function _update(uint256 balance0, uint256 balance1) internal {
+        require(balance0 <= uint112(-1) && balance1 <= uint112(-1), "UniswapV2: OVERFLOW");
+        reserve0 = uint112(balance0);
+        reserve1 = uint112(balance1);
+        blockTimestampLast = uint32(block.timestamp % 2**32);
+    }
+
+    function mint(address to) external returns (uint256 liquidity) {
+        uint256 balance0 = IERC20(token0).balanceOf(address(this));
+        uint256 balance1 = IERC20(token1).balanceOf(address(this));
+        uint256 amount0 = balance0.sub(reserve0);
+        uint256 amount1 = balance1.sub(reserve1);
+
+        if (totalSupply() == 0) {
+            liquidity = _sqrt(amount0.mul(amount1)).sub(MINIMUM_LIQUIDITY);
+            // OZ won't mint to address(0), lock the minimum liquidity at address(1) instead
+            _mint(address(1), MINIMUM_LIQUIDITY);
+        } else {
+            liquidity = Math.min(
+                amount0.mul(totalSupply()) / reserve0,
+                amount1.mul(totalSupply()) / reserve1
+            );
+        }
+        require(liquidity > 0, "UniswapV2: INSUFFICIENT_LIQUIDITY_MINTED");
+        _mint(to, liquidity);
+        _update(balance0, balance1);
+    }
+
+    function burn(address to) external returns (uint256 amount0, uint256 amount1) {
+        uint256 balance0 = IERC20(token0).balanceOf(address(this));
+        uint256 balance1 = IERC20(token1).balanceOf(address(this));
+        uint256 liquidity = balanceOf(address(this));
+
+        amount0 = liquidity.mul(balance0) / totalSupply();
+        amount1 = liquidity.mul(balance1) / totalSupply();
+        require(amount0 > 0 && amount1 > 0, "UniswapV2: INSUFFICIENT_LIQUIDITY_BURNED");
+        _burn(address(this), liquidity);
+        IERC20(token0).safeTransfer(to, amount0);
+        IERC20(token1).safeTransfer(to, amount1);
+        _update(IERC20(token0).balanceOf(address(this)), IERC20(token1).balanceOf(address(this)));
+    }
+
+    function swap(
+        uint256 amount0Out,
+        uint256 amount1Out,
+        address to,
+        bytes calldata
+    ) external {
+        require(amount0Out > 0 || amount1Out > 0, "UniswapV2: INSUFFICIENT_OUTPUT_AMOUNT");
+        require(amount0Out < reserve0 && amount1Out < reserve1, "UniswapV2: INSUFFICIENT_LIQUIDITY");
+        require(to != token0 && to != token1, "UniswapV2: INVALID_TO");
+
+        if (amount0Out > 0) IERC20(token0).safeTransfer(to, amount0Out);
+        if (amount1Out > 0) IERC20(token1).safeTransfer(to, amount1Out);
+        uint256 balance0 = IERC20(token0).balanceOf(address(this));
+        uint256 balance1 = IERC20(token1).balanceOf(address(this));
+
+        uint256 amount0In = balance0 > reserve0 - amount0Out ? balance0 - (reserve0 - amount0Out) : 0;
+        uint256 amount1In = balance1 > reserve1 - amount1Out ? balance1 - (reserve1 - amount1Out) : 0;
+        require(amount0In > 0 || amount1In > 0, "UniswapV2: INSUFFICIENT_INPUT_AMOUNT");
+
+        uint256 balance0Adjusted = balance0.mul(BASIS_PRECISION).sub(amount0In.mul(swapFee));
+        uint256 balance1Adjusted = balance1.mul(BASIS_PRECISION).sub(amount1In.mul(swapFee));
+        require(
+            balance0Adjusted.mul(balance1Adjusted) >=
+                uint256(reserve0).mul(reserve1).mul(BASIS_PRECISION**2),
+            "UniswapV2: K"
+        );
+        _update(balance0, balance1);
+    }
+
+    function sync() external {
+        _update(IERC20(token0).balanceOf(address(this)), IERC20(token1).balanceOf(address(this)));
+    }
+
+    function _sqrt(uint256 y) internal pure returns (uint256 z) {
+        if (y > 3) {
+            z = y;
+            uint256 x = y / 2 + 1;
+            while (x < z) {
+                z = x;
+                x = (y / x + x) / 2;
+            }
+        } else if (y != 0) {
+            z = 1;
+        }
+    }
+}
+
+contract MockUniswapV2Factory {
+    uint256 public swapFee;
+    mapping(address => mapping(address => address)) public getPair;
+    address[] public allPairs;
+
+    constructor(uint256 _swapFee) public {
+        swapFee = _swapFee;
+    }
+
+    function allPairsLength() external view returns (uint256) {
+        return allPairs.length;
+    }
+
+    function createPair(address tokenA, address tokenB) external returns (address pair) {
+        require(tokenA != tokenB, "UniswapV2: IDENTICAL_ADDRESSES");
+        (address token0, address token1) = tokenA < tokenB ? (tokenA, tokenB) : (tokenB, tokenA);
+        require(getPair[token0][token1] == address(0), "UniswapV2: PAIR_EXISTS");
+        pair = address(new MockUniswapV2Pair(token0, token1, swapFee));
+        getPair[token0][token1] = pair;
+        getPair[token1][token0] = pair;
+        allPairs.push(pair);
+    }
+}
+
+/// @notice the IUniswapV2Router01 calls the holder and providers make, no ETH variants
+contract MockUniswapV2Router {
+    using SafeERC20 for IERC20;
+    using SafeMath for uint256;
+
+    uint256 constant BASIS_PRECISION = 10000;
+
+    address public factory;
+    address public WETH;
+
+    constructor(address _factory, address _weth) public {
+        factory = _factory;
+        WETH = _weth;
+    }
+
+    modifier ensure(uint256 deadline) {
+        require(deadline >= block.timestamp, "UniswapV2Router: EXPIRED");
+        _;
+    }
+
+    function _pairFor(address tokenA, address tokenB) internal view returns (MockUniswapV2Pair pair) {
+        pair = MockUniswapV2Pair(MockUniswapV2Factory(factory).getPair(tokenA, tokenB));
+        require(address(pair) != address(0), "UniswapV2Router: NO_PAIR");
+    }
+
+    function _getReserves(address tokenA, address tokenB)
+        internal
+        view
+        returns (uint256 reserveA, uint256 reserveB)
+    {
+        MockUniswapV2Pair pair = _pairFor(tokenA, tokenB);
+        (uint256 reserve0, uint256 reserve1, ) = pair.getReserves();
+        (reserveA, reserveB) = tokenA == pair.token0() ? (reserve0, reserve1) : (reserve1, reserve0);
+    }
+
+    function quote(
+        uint256 amountA,
+        uint256 reserveA,
+        uint256 reserveB
+    ) public pure returns (uint256 amountB) {
+        require(amountA > 0, "UniswapV2Library: INSUFFICIENT_AMOUNT");
+        require(reserveA > 0 && reserveB > 0, "UniswapV2Library: INSUFFICIENT_LIQUIDITY");
+        amountB = amountA.mul(reserveB) / reserveA;
+    }
+
+    function getAmountOut(
+        uint256 amountIn,
+        uint256 reserveIn,
+        uint256 reserveOut
+    ) public view returns (uint256 amountOut) {
+        require(amountIn > 0, "UniswapV2Library: INSUFFICIENT_INPUT_AMOUNT");
+        require(reserveIn > 0 && reserveOut > 0, "UniswapV2Library: INSUFFICIENT_LIQUIDITY");
+        uint256 amountInWithFee = amountIn.mul(BASIS_PRECISION.sub(MockUniswapV2Factory(factory).swapFee()));
+        amountOut = amountInWithFee.mul(reserveOut) / reserveIn.mul(BASIS_PRECISION).add(amountInWithFee);
+    }
+
+    function getAmountsOut(uint256 amountIn, address[] memory path)
+        public
+        view
+        returns (uint256[] memory amounts)
+    {
+        require(path.length >= 2, "UniswapV2Library: INVALID_PATH");
+        amounts = new uint256[](path.length);
+        amounts[0] = amountIn;
+        for (uint256 i; i < path.length - 1; i++) {
+            (uint256 reserveIn, uint256 reserveOut) = _getReserves(path[i], path[i + 1]);
+            amounts[i + 1] = getAmountOut(amounts[i], reserveIn, reserveOut);
+        }
+    }
+
+    function _addLiquidity(
+        address tokenA,
+        address tokenB,
+        uint256 amountADesired,
+        uint256 amountBDesired,
+        uint256 amountAMin,
+        uint256 amountBMin
+    ) internal returns (uint256 amountA, uint256 amountB) {
+        if (MockUniswapV2Factory(factory).getPair(tokenA, tokenB) == address(0)) {
+            MockUniswapV2Factory(factory).createPair(tokenA, tokenB);
+        }
+        (uint256 reserveA, uint256 reserveB) = _getReserves(tokenA, tokenB);
+        if (reserveA == 0 && reserveB == 0) {
+            (amountA, amountB) = (amountADesired, amountBDesired);
+        } else {
+            uint256 amountBOptimal = quote(amountADesired, reserveA, reserveB);
+            if (amountBOptimal <= amountBDesired) {
+                require(amountBOptimal >= amountBMin, "UniswapV2Router: INSUFFICIENT_B_AMOUNT");
+                (amountA, amountB) = (amountADesired, amountBOptimal);
+            } else {
+                uint256 amountAOptimal = quote(amountBDesired, reserveB, reserveA);
+                assert(amountAOptimal <= amountADesired);
+                require(amountAOptimal >= amountAMin, "UniswapV2Router: INSUFFICIENT_A_AMOUNT");
+                (amountA, amountB) = (amountAOptimal, amountBDesired);
+            }
+        }
+    }
+
+    function addLiquidity(
+        address tokenA,
+        address tokenB,
+        uint256 amountADesired,
+        uint256 amountBDesired,
+        uint256 amountAMin,
+        uint256 amountBMin,
+        address to,
+        uint256 deadline
+    )
+        external
+        ensure(deadline)
+        returns (
+            uint256 amountA,
+            uint256 amountB,
+            uint256 liquidity
+        )
+    {
+        (amountA, amountB) = _addLiquidity(tokenA, tokenB, amountADesired, amountBDesired, amountAMin, amountBMin);
+        MockUniswapV2Pair pair = _pairFor(tokenA, tokenB);
+        IERC20(tokenA).safeTransferFrom(msg.sender, address(pair), amountA);
+        IERC20(tokenB).safeTransferFrom(msg.sender, address(pair), amountB);
+        liquidity = pair.mint(to);
+    }
+
+    function removeLiquidity(
+        address tokenA,
+        address tokenB,
+        uint256 liquidity,
+        uint256 amountAMin,
+        uint256 amountBMin,
+        address to,
+        uint256 deadline
+    ) public ensure(deadline) returns (uint256 amountA, uint256 amountB) {
+        MockUniswapV2Pair pair = _pairFor(tokenA, tokenB);
+        IERC20(address(pair)).safeTransferFrom(msg.sender, address(pair), liquidity);
+        (uint256 amount0, uint256 amount1) = pair.burn(to);
+        (amountA, amountB) = tokenA == pair.token0() ? (amount0, amount1) : (amount1, amount0);
+        require(amountA >= amountAMin, "UniswapV2Router: INSUFFICIENT_A_AMOUNT");
+        require(amountB >= amountBMin, "UniswapV2Router: INSUFFICIENT_B_AMOUNT");
+    }
+
+    function swapExactTokensForTokens(
+        uint256 amountIn,
+        uint256 amountOutMin,
+        address[] calldata path,
+        address to,
+        uint256 deadline
+    ) external ensure(deadline) returns (uint256[] memory amounts) {
+        amounts = getAmountsOut(amountIn, path);
+        require(amounts[amounts.length - 1] >= amountOutMin, "UniswapV2Router: INSUFFICIENT_OUTPUT_AMOUNT");
+        IERC20(path[0]).safeTransferFrom(msg.sender, address(_pairFor(path[0], path[1])), amounts[0]);
+        for (uint256 i; i < path.length - 1; i++) {
+            MockUniswapV2Pair pair = _pairFor(path[i], path[i + 1]);
+            uint256 amountOut = amounts[i + 1];
+            (uint256 amount0Out, uint256 amount1Out) =
+                path[i] == pair.token0() ? (uint256(0), amountOut) : (amountOut, uint256(0));
+            address receiver = i < path.length - 2 ? address(_pairFor(path[i + 1], path[i + 2])) : to;
+            pair.swap(amount0Out, amount1Out, receiver, new bytes(0));
+        }
+    }
+}
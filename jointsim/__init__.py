@@ -0,0 +1,11 @@
+"""Offline models of the joint LP holder and provider strategies."""
+
+from jointsim.holder import BASIS_PRECISION, JointLPHolderUniV2
+from jointsim.insurance import StrategyInsurance
+from jointsim.lending import AaveReserve, CTokenMarket
+from jointsim.pair import UniV2Pair
+from jointsim.provider import Strategy
+from jointsim.safemath import Revert
+from jointsim.solidly import SolidlyPair
+from jointsim.vault import Vault
+from jointsim.velo import JointLPHolderVelo
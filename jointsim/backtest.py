@@ -0,0 +1,265 @@
+"""Replays historical pair reserves through the holder model.
+
+Reserves live in a .npy file of RESERVES_DTYPE rows, one per UniswapV2 Sync(reserve0,
+reserve1) event together with the pair totalSupply at that block. Only constant product
+pairs are replayed: Solidly stable pairs emit the same event, but the holder model swaps
+and prices on x * y = k. Values are split into two little endian uint64 limbs so rows stay fixed
+width and exact; that covers uint112 reserves and any LP supply below 2**128. The file is memory mapped and walked in chunks, so
+multi-year histories never have to fit in RAM.
+
+Between rebalances the position (LP held, debts) is fixed, so debt ratios are evaluated
+with NumPy over a window of rows and only rows that may cross debtUpper are replayed with
+the integer model. The window starts small after each rebalance and doubles while nothing
+triggers, so a rebalance costs a few hundred rows of float work rather than the rest of the
+chunk. The position is assumed small enough that its own swaps don't change the recorded
+history.
+
+The providers keep `reserve` bps of their entry outside the joint (debtJointMax leaves at
+least 5% there) and collect what a rebalance sends back. Right after a rebalance the keeper harvests both
+providers: debtJoint is marked to balanceJoint(), realising the IL so the debt ratios start
+again from the rebalanced position, and addToJoint puts the free want back at the pool
+ratio, limited by the scarcer side as in _processWantFromProviders. Once the LP left is
+below lpDust the replay stops.
+
+    python -m jointsim.backtest reserves.npy --share 0.001 --debtUpper 10250
+"""
+
+import argparse
+
+import numpy as np
+
+from jointsim.holder import BASIS_PRECISION, STD_PRECISION, JointLPHolderUniV2
+from jointsim.pair import UniV2Pair
+from jointsim.safemath import Revert
+
+RESERVES_DTYPE = np.dtype(
+    [
+        ("block", "<u8"),
+        ("timestamp", "<u8"),
+        ("reserve0", "<u8", (2,)),
+        ("reserve1", "<u8", (2,)),
+        ("totalSupply", "<u8", (2,)),
+    ]
+)
+
+_LIMB = 2 ** 64
+
+
+def _toLimbs(value):
+    if not 0 <= value < _LIMB ** 2:
+        raise ValueError("{0} does not fit in two uint64 limbs".format(value))
+    return (value % _LIMB, value // _LIMB)
+
+
+def _fromLimbs(limbs):
+    return int(limbs[0]) + int(limbs[1]) * _LIMB
+
+
+def _limbsToFloat(column):
+    return column[:, 0].astype(np.float64) + column[:, 1].astype(np.float64) * float(
+        _LIMB
+    )
+
+
+def writeReserves(path, rows):
+    """Writes (block, timestamp, reserve0, reserve1, totalSupply) tuples of ints to path."""
+    out = np.lib.format.open_memmap(
+        path, mode="w+", dtype=RESERVES_DTYPE, shape=(len(rows),)
+    )
+    for i, (block, timestamp, reserve0, reserve1, totalSupply) in enumerate(rows):
+        out[i] = (
+            block,
+            timestamp,
+            _toLimbs(reserve0),
+            _toLimbs(reserve1),
+            _toLimbs(totalSupply),
+        )
+    out.flush()
+    del out
+
+
+def openReserves(path):
+    return np.load(path, mmap_mode="r")
+
+
+def _setRow(holder, row):
+    pair = holder.pair
+    pair.reserve0 = _fromLimbs(row["reserve0"])
+    pair.reserve1 = _fromLimbs(row["reserve1"])
+    pair.totalSupply = _fromLimbs(row["totalSupply"])
+    # the oracle tracks the pool, so _testPriceSource passes on every row
+    holder.oraclePrices = [pair.reserve1 * 10 ** 18 // pair.reserve0, 10 ** 18]
+
+
+def _harvest(holder, free):
+    """Both providers harvesting with `free` as their wantAvailable: prepareReturn marks
+    debtJoint to balanceJoint(), then adjustPosition calls addToJoint.
+    """
+    holder.debtJoint = [holder.balanceTokenWithRebalance(i) for i in range(2)]
+    lpBalancePull = min(
+        free[i] * STD_PRECISION // holder.getLpReserves(i) for i in range(2)
+    )
+    if lpBalancePull <= holder.lpDust:
+        return
+    for i in range(2):
+        wantAmount = min(
+            free[i], holder.getLpReserves(i) * lpBalancePull // STD_PRECISION
+        )
+        free[i] -= wantAmount
+        holder.balances[i] += wantAmount
+        holder.debtJoint[i] += wantAmount
+    holder._depositLp()
+    holder._depositToFarm()
+
+
+def backtest(
+    path,
+    share=0.001,
+    swapFee=30,
+    jointParams=(9900, 50, 10000, 10250),
+    chunkSize=1 << 20,
+    reserve=500,
+    window=256,
+):
+    """Enters with `share` of the pool's LP at the first row and rebalances whenever a
+    debt ratio goes above debtUpper, re-adding the returned tokens after each rebalance.
+    Returns rebalance count, swap cost and IL figures; token amounts are raw units, values
+    are in token1.
+    """
+    reserves = openReserves(path)
+    first = reserves[0]
+    pair = UniV2Pair(0, 0, 0, swapFee)
+    holder = JointLPHolderUniV2(pair)
+    holder.setParamaters(*jointParams)
+    _setRow(holder, first)
+
+    holder.lpPooled = entryLp = int(pair.totalSupply * share)
+    holder.debtJoint = [holder.balanceToken(0), holder.balanceToken(1)]
+    free = [debt * reserve // BASIS_PRECISION for debt in holder.debtJoint]
+    entry = (holder.debtJoint[0] + free[0], holder.debtJoint[1] + free[1])
+    rebalances = []
+    failed = 0
+    exitBlock = None
+
+    debtUpper = holder.debtUpper
+    bpsRebalanceDiff = holder.bpsRebalanceDiff
+    stuckRows = 0
+    for start in range(0, len(reserves), chunkSize):
+        if exitBlock is not None:
+            break
+        chunk = reserves[start : start + chunkSize]
+        reserve0 = _limbsToFloat(chunk["reserve0"])
+        reserve1 = _limbsToFloat(chunk["reserve1"])
+        totalSupply = _limbsToFloat(chunk["totalSupply"])
+
+        offset = 0
+        size = window
+        while offset < len(chunk):
+            end = min(offset + size, len(chunk))
+            lp = float(holder.lpBalance())
+            ratio0 = (
+                holder.debtJoint[0]
+                * BASIS_PRECISION
+                / (lp * reserve0[offset:end] / totalSupply[offset:end])
+            )
+            ratio1 = (
+                holder.debtJoint[1]
+                * BASIS_PRECISION
+                / (lp * reserve1[offset:end] / totalSupply[offset:end])
+            )
+            # 1 bps of headroom for float error, the integer model has the final say
+            triggered = np.maximum(ratio0, ratio1) > debtUpper - 1
+            # once IL pushes both ratios over debtUpper rebalanceDebt passes its require but
+            # has nothing to swap, the keeper skips those rows
+            candidates = np.nonzero(
+                triggered & (np.abs(ratio0 - ratio1) > bpsRebalanceDiff - 1)
+            )[0]
+
+            rebalanced = False
+            for index in candidates:
+                row = chunk[offset + index]
+                _setRow(holder, row)
+                debtRatio0, debtRatio1 = holder.calcDebtRatio()
+                if (
+                    max(debtRatio0, debtRatio1) <= debtUpper
+                    or abs(debtRatio0 - debtRatio1) <= bpsRebalanceDiff
+                ):
+                    continue
+                try:
+                    sent = holder.rebalanceDebt()
+                except Revert:
+                    failed += 1
+                    continue
+                free = [free[0] + sent[0], free[1] + sent[1]]
+                rebalances.append(int(row["block"]))
+                stuckRows += int(np.count_nonzero(triggered[:index])) - int(
+                    np.count_nonzero(candidates < index)
+                )
+                offset += index + 1
+                rebalanced = True
+                break
+            if rebalanced:
+                if holder.lpBalance() <= holder.lpDust:
+                    exitBlock = rebalances[-1]
+                    break
+                _harvest(holder, free)
+                size = window
+            else:
+                stuckRows += int(np.count_nonzero(triggered)) - len(candidates)
+                offset = end
+                size *= 2
+
+    _setRow(holder, reserves[-1])
+    price = pair.reserve1 / pair.reserve0
+    final = (
+        holder.balanceToken(0) + holder.balances[0] + free[0],
+        holder.balanceToken(1) + holder.balances[1] + free[1],
+    )
+    holdValue = entry[0] * price + entry[1]
+    return {
+        "rows": len(reserves),
+        "rebalances": len(rebalances),
+        "rebalanceBlocks": rebalances,
+        "failedRebalances": failed,
+        "exitBlock": exitBlock,
+        "lpRetained": holder.lpBalance() / entryLp,
+        "stuckRows": stuckRows,
+        "swapCost": holder.swapSlippage[0] * price + holder.swapSlippage[1],
+        "swapCostBps": (holder.swapSlippage[0] * price + holder.swapSlippage[1])
+        / holdValue
+        * BASIS_PRECISION,
+        "il": (final[0] * price + final[1]) / holdValue - 1,
+        "providerReturn0": final[0] / entry[0] - 1,
+        "providerReturn1": final[1] / entry[1] - 1,
+        "debtRatio": holder.calcDebtRatio() if exitBlock is None else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("path")
+    parser.add_argument("--share", type=float, default=0.001)
+    parser.add_argument("--swapFee", type=int, default=30)
+    parser.add_argument("--slippageAdj", type=int, default=9900)
+    parser.add_argument("--bpsRebalanceDiff", type=int, default=50)
+    parser.add_argument("--rebalancePercent", type=int, default=10000)
+    parser.add_argument("--debtUpper", type=int, default=10250)
+    parser.add_argument("--reserve", type=int, default=500)
+    args = parser.parse_args()
+
+    jointParams = (
+        args.slippageAdj,
+        args.bpsRebalanceDiff,
+        args.rebalancePercent,
+        args.debtUpper,
+    )
+    result = backtest(
+        args.path, args.share, args.swapFee, jointParams, reserve=args.reserve
+    )
+    result.pop("rebalanceBlocks")
+    for key, value in result.items():
+        print("{0:>16}  {1}".format(key, value))
+
+
+if __name__ == "__main__":
+    main()
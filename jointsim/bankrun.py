@@ -0,0 +1,144 @@
+"""Run on the bank: depositors of both provider vaults withdrawing in the same block.
+
+Each sequence deploys the stack the way jointsim.montecarlo does, moves the pair price by
+priceMove (the oracle follows unless oracleMove says otherwise) so the joint carries IL,
+splits each vault's shares between depositors and replays their Vault.withdraw calls in a
+random interleaved order. Nothing else happens between withdrawals, as in one block.
+
+Every withdrawal goes Vault._withdraw -> Strategy.liquidatePosition, which scales the
+request by totalAssets / totalDebt when the provider is under water, then _withdraw pulls
+lend first and the rest from the joint as a debtProportion that snaps to a full exit above
+9500 bps. Payouts are measured against par, the value the shares were minted at.
+
+    python -m jointsim.bankrun FRAXFTMSpiritLQDR -n 2000 --priceMove -0.3 --depositors 50
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+
+from jointsim.montecarlo import DEFAULT_SCENARIO, _movePrice, deploy, summarize
+from jointsim.pairs import PAIRS
+from jointsim.safemath import Revert
+
+DEFAULT_RUN = {
+    # relative move of the token0 price before the run, and of the oracle (None: same)
+    "priceMove": -0.2,
+    "oracleMove": None,
+    "depositors": 50,
+    # chance each depositor joins the run
+    "runShare": 1.0,
+    # maxLoss depositors pass to withdraw, in bps
+    "maxLoss": 10000,
+}
+
+
+def runSequence(pairName, scenario, run, seed):
+    rng = random.Random(seed)
+    holder, strategies, deposits = deploy(pairName, scenario)
+    pair = holder.pair
+    vaults = [strategy.vault for strategy in strategies]
+
+    startPrice = pair.spotPrice()
+    _movePrice(pair, startPrice * (1 + run["priceMove"]))
+    oracleMove = run["priceMove"] if run["oracleMove"] is None else run["oracleMove"]
+    holder.oraclePrices[0] = int(startPrice * (1 + oracleMove) * 10 ** 18)
+
+    queue = []
+    for i, vault in enumerate(vaults):
+        weights = [rng.expovariate(1) for _ in range(run["depositors"])]
+        total = sum(weights)
+        queue += [
+            (i, int(vault.totalSupply * weight / total))
+            for weight in weights
+            if rng.random() < run["runShare"]
+        ]
+    rng.shuffle(queue)
+
+    supply = [vault.totalSupply for vault in vaults]
+    swapCount = holder.swapCount
+    received = [0, 0]
+    par = [0, 0]
+    payouts = [[], []]
+    reverted = [0, 0]
+    for i, shares in queue:
+        try:
+            value, _ = vaults[i].withdraw(shares, run["maxLoss"])
+        except Revert:
+            reverted[i] += 1
+            continue
+        parValue = shares * deposits[i] / supply[i]
+        received[i] += value
+        par[i] += parValue
+        payouts[i].append(value / parValue)
+
+    result = {
+        "seed": seed,
+        "withdrawals": len(queue),
+        "rebalances": holder.swapCount - swapCount,
+    }
+    for i, strategy in enumerate(strategies):
+        result["loss{0}".format(i)] = 1 - received[i] / par[i] if par[i] else 0
+        result["firstPayout{0}".format(i)] = payouts[i][0] if payouts[i] else 0
+        result["lastPayout{0}".format(i)] = payouts[i][-1] if payouts[i] else 0
+        result["jointExits{0}".format(i)] = strategy.jointExits
+        result["reverted{0}".format(i)] = reverted[i]
+    return result
+
+
+def _runSeed(args):
+    return runSequence(*args)
+
+
+def runBankRuns(
+    pairName, scenario=None, run=None, nSequences=1000, seed=0, processes=None
+):
+    """Replays nSequences withdrawal orders (seed, seed + 1, ...) across a multiprocessing pool."""
+    params = dict(DEFAULT_SCENARIO)
+    params.update(scenario or {})
+    runParams = dict(DEFAULT_RUN)
+    runParams.update(run or {})
+    jobs = [(pairName, params, runParams, seed + i) for i in range(nSequences)]
+    processes = processes or os.cpu_count()
+    chunksize = max(len(jobs) // (processes * 8), 1)
+    with multiprocessing.Pool(processes) as pool:
+        return pool.map(_runSeed, jobs, chunksize)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("pair", choices=sorted(PAIRS))
+    parser.add_argument("-n", "--sequences", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--price", type=float, default=DEFAULT_SCENARIO["price"])
+    parser.add_argument("--priceMove", type=float, default=DEFAULT_RUN["priceMove"])
+    parser.add_argument("--oracleMove", type=float, default=DEFAULT_RUN["oracleMove"])
+    parser.add_argument("--depositors", type=int, default=DEFAULT_RUN["depositors"])
+    parser.add_argument("--runShare", type=float, default=DEFAULT_RUN["runShare"])
+    parser.add_argument("--maxLoss", type=int, default=DEFAULT_RUN["maxLoss"])
+    args = vars(parser.parse_args())
+
+    run = {key: args[key] for key in DEFAULT_RUN}
+    results = runBankRuns(
+        args["pair"],
+        {"price": args["price"]},
+        run,
+        args["sequences"],
+        args["seed"],
+        args["processes"],
+    )
+    tokens = PAIRS[args["pair"]]["tokens"]
+    print("{0} sequences, {1} vault = 0, {2} vault = 1".format(len(results), *tokens))
+    for key, stats in summarize(results).items():
+        print(
+            "{0:>16}  ".format(key)
+            + "  ".join(
+                "{0} {1:+.4f}".format(name, value) for name, value in stats.items()
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
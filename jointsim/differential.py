@@ -0,0 +1,94 @@
+"""Differential check of the offline model against a deployed holder and its providers.
+
+A chain state is read into a plain dict (see STATE_KEYS) with one batched call, the model is
+rebuilt from it and every view is evaluated on both sides. Any difference is a divergence
+between lpHolderUniV2.sol / providerStrategy.sol and jointsim.
+
+Index i always means holder.tokens(i), i.e. pair order. state['strategies'][i] is the
+provider of that token.
+"""
+
+from jointsim.holder import JointLPHolderUniV2
+from jointsim.insurance import StrategyInsurance
+from jointsim.pair import UniV2Pair
+from jointsim.provider import Strategy
+
+STATE_KEYS = (
+    "reserves",
+    "totalSupply",
+    "lpPooled",
+    "lpUnpooled",
+    "balances",
+    "token0TotalSupply",
+    "strategies",
+)
+STRATEGY_KEYS = (
+    "debtJoint",
+    "oraclePrice",
+    "wantBalance",
+    "cTokenBalance",
+    "exchangeRate",
+)
+
+HOLDER_VIEWS = (
+    "calcDebtRatio",
+    "balanceTokenWithRebalance",
+    "calculateProfit",
+    "calcPriceDiff",
+)
+STRATEGY_VIEWS = ("estimatedTotalAssets",)
+
+
+def modelFromState(state):
+    """Returns (holder, strategies) models holding exactly the state read from chain."""
+    pair = UniV2Pair(state["reserves"][0], state["reserves"][1], state["totalSupply"])
+    holder = JointLPHolderUniV2(
+        pair,
+        lpPooled=state["lpPooled"],
+        lpUnpooled=state["lpUnpooled"],
+        balances=state["balances"],
+        debtJoint=[strategy["debtJoint"] for strategy in state["strategies"]],
+        oraclePrices=[strategy["oraclePrice"] for strategy in state["strategies"]],
+        token0TotalSupply=state["token0TotalSupply"],
+    )
+    strategies = []
+    for i, strategyState in enumerate(state["strategies"]):
+        strategy = Strategy(
+            None, holder, i, StrategyInsurance(), strategyState["exchangeRate"]
+        )
+        strategy.wantBalance = strategyState["wantBalance"]
+        strategy.cTokenBalance = strategyState["cTokenBalance"]
+        strategies.append(strategy)
+    return holder, strategies
+
+
+def modelViews(state):
+    """Every compared view, keyed like the dict the chain reader returns."""
+    holder, strategies = modelFromState(state)
+    return {
+        "calcDebtRatio": holder.calcDebtRatio(),
+        "balanceTokenWithRebalance": tuple(
+            holder.balanceTokenWithRebalance(i) for i in range(2)
+        ),
+        "calculateProfit": tuple(holder.calculateProfit(i) for i in range(2)),
+        "calcPriceDiff": holder.calcPriceDiff(),
+        "estimatedTotalAssets": tuple(
+            strategy.estimatedTotalAssets() for strategy in strategies
+        ),
+    }
+
+
+def diffViews(state, chainViews):
+    """Returns {view: (model, chain)} for every view that doesn't match to the wei."""
+    expected = modelViews(state)
+    return {
+        key: (expected[key], chainViews[key])
+        for key in expected
+        if _normalise(expected[key]) != _normalise(chainViews[key])
+    }
+
+
+def _normalise(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalise(v) for v in value)
+    return int(value)
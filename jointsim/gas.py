@@ -0,0 +1,182 @@
+"""Keeper gas of the joint's calls, by farm and by the length of the token paths they swap along.
+
+Measured gas lives in one place, tests/gas_baseline.json, recorded by the gas benchmarks
+(tests/*/test_gasbench.py, see scripts/gasbaseline.py). keeperGas takes an action's gasUsed
+from there, under the benchmark path in BASELINE_PATHS, preferring a fork of the pair's
+chain over development, where the mocks stand in for the live farms and routers. A pair
+without any measurement raises UnmeasuredGas unless the caller asks for the GAS_USED
+estimates, which are placeholders, not measurements. hops is the number of tokens in the
+longest getTokenOutPath the call swaps along: 2 when either side is WETH (router.WETH(),
+the chain's wrapped native token), 3 when it routes through WETH.
+
+  harvest         provider harvest that doesn't sell rewards (harvestFromProvider skipped
+                  by canHarvestJoint), including its addToJoint
+  addToJoint      joint adding both providers' want to the pair and the farm
+  withdraw        vault withdraw of half the depositor's shares, paid out of the provider's
+                  lend position and a joint withdraw with its rebalance swap
+  rebalanceDebt   keeper rebalance, one swap between the pair tokens
+  harvestRewards  farm harvest and both reward sales, reward -> WETH (-> token)
+
+Gas is paid in the native token, so costs are converted with the pair price wherever the
+native token is one of the pair tokens, as it is for every pair in jointsim.pairs.
+
+    python -m jointsim.gas FRAXFTMSpiritLQDR --gasPrice 300
+"""
+
+import argparse
+import functools
+import json
+import os
+
+from jointsim.pairs import PAIRS
+from jointsim.solidly import getTokenOutPath
+
+# base cost of any transaction, what a call made from inside another one doesn't pay
+TX_GAS = 21_000
+
+ACTIONS = ("harvest", "addToJoint", "withdraw", "rebalanceDebt", "harvestRewards")
+
+BASELINE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "tests",
+    "gas_baseline.json",
+)
+# the benchmark path measuring each action
+BASELINE_PATHS = {
+    "harvest": "harvestSteady",
+    "addToJoint": "addToJoint",
+    "withdraw": "withdraw50pct",
+    "rebalanceDebt": "rebalanceDebt",
+    "harvestRewards": "harvestRewards",
+}
+# networks running the mocks, used only when no fork of the pair's chain was benchmarked
+MOCK_NETWORKS = ("development",)
+
+
+class UnmeasuredGas(LookupError):
+    """No benchmark in the baseline measured the action for the pair."""
+
+
+GAS_USED = {
+    "LQDRMasterChef": {
+        "harvest": {2: 640_000, 3: 640_000},
+        "addToJoint": {2: 330_000, 3: 330_000},
+        "withdraw": {2: 480_000, 3: 540_000},
+        "rebalanceDebt": {2: 390_000, 3: 450_000},
+        "harvestRewards": {2: 460_000, 3: 520_000},
+    },
+    "SpookyMasterChef": {
+        "harvest": {2: 600_000, 3: 600_000},
+        "addToJoint": {2: 300_000, 3: 300_000},
+        "withdraw": {2: 450_000, 3: 510_000},
+        "rebalanceDebt": {2: 360_000, 3: 420_000},
+        "harvestRewards": {2: 420_000, 3: 480_000},
+    },
+    "VelodromeGauge": {
+        "harvest": {2: 720_000, 3: 720_000},
+        "addToJoint": {2: 380_000, 3: 380_000},
+        "withdraw": {2: 560_000, 3: 640_000},
+        "rebalanceDebt": {2: 460_000, 3: 540_000},
+        "harvestRewards": {2: 570_000, 3: 650_000},
+    },
+}
+
+
+def gasUsed(action, farm, hops=2):
+    return GAS_USED[farm][action][hops]
+
+
+def pathHops(pairName, action):
+    """Longest token path `action` swaps along for the pair: between the pair tokens for
+    withdraw / rebalanceDebt, from the farm's reward to each token otherwise."""
+    pairConf = PAIRS[pairName]
+    weth = pairConf["weth"]
+    token0, token1 = pairConf["tokens"]
+    if action in ("withdraw", "rebalanceDebt"):
+        return len(getTokenOutPath(token0, token1, weth))
+    return max(
+        len(getTokenOutPath(pairConf["reward"], token, weth))
+        for token in (token0, token1)
+    )
+
+
+def _loadBaseline(path):
+    if not os.path.exists(path):
+        return {}
+    return _readBaseline(path, os.path.getmtime(path))
+
+
+# read once per version of the file, the Monte Carlo runs ask for every scenario
+@functools.lru_cache(maxsize=None)
+def _readBaseline(path, mtime):
+    with open(path) as f:
+        return json.load(f)
+
+
+def measuredGas(pairName, action, path=BASELINE):
+    """gasUsed of `action` benchmarked for the pair, from a fork if there is one and from
+    development otherwise, None if it wasn't benchmarked."""
+    measured = []
+    for pairs in _loadBaseline(path).values():
+        for network, paths in pairs.get(pairName, {}).items():
+            if BASELINE_PATHS[action] in paths:
+                measured.append(
+                    (network in MOCK_NETWORKS, network, paths[BASELINE_PATHS[action]])
+                )
+    if not measured:
+        return None
+    return min(measured)[2]
+
+
+def keeperGas(pairName, action, path=BASELINE, estimate=False):
+    """gasUsed of `action` on the pair as benchmarked. With estimate a pair that wasn't
+    benchmarked gets the GAS_USED estimate for its farm and token paths, without it that
+    raises UnmeasuredGas."""
+    measured = measuredGas(pairName, action, path)
+    if measured is not None:
+        return measured
+    if not estimate:
+        raise UnmeasuredGas(
+            "{0} has no {1} gas ({2}) in {3}, record it with GAS_BASELINE_UPDATE=1 "
+            "brownie test tests/<chain>/test_gasbench.py or use the GAS_USED "
+            "estimates".format(pairName, action, BASELINE_PATHS[action], path)
+        )
+    return gasUsed(action, PAIRS[pairName]["farm"], pathHops(pairName, action))
+
+
+def gasCost(gas, gasPrice):
+    """Wei of the native token for `gas` at gasPrice gwei."""
+    return gas * int(gasPrice * 10 ** 9)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("pair", choices=sorted(PAIRS))
+    parser.add_argument("--gasPrice", type=float, default=300, help="gwei")
+    parser.add_argument(
+        "--estimates",
+        action="store_true",
+        help="use the GAS_USED estimates for actions the baseline has no gas for",
+    )
+    args = parser.parse_args()
+
+    pairConf = PAIRS[args.pair]
+    print(
+        "{0} on {1}, gas price {2} gwei, costs in {3}".format(
+            args.pair, pairConf["farm"], args.gasPrice, pairConf["weth"]
+        )
+    )
+    for action in ACTIONS:
+        gas = keeperGas(args.pair, action, estimate=args.estimates)
+        print(
+            "{0:>16} {1} hops {2:>9,} gas {3:>12.6f}".format(
+                action,
+                pathHops(args.pair, action),
+                gas,
+                gasCost(gas, args.gasPrice) / 1e18,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,386 @@
+"""Offline model of contracts/lpHolderUniV2.sol.
+
+Every view / internal function below mirrors the contract line for line, including the
+order of SafeMath operations, so results match the deployed holder to the wei.
+Tokens are referred to by their index in the pair (0 / 1) instead of their address.
+"""
+
+from jointsim.safemath import (
+    MAX_UINT256,
+    Model,
+    add,
+    div,
+    mul,
+    require,
+    sub,
+    transaction,
+)
+
+BASIS_PRECISION = 10000
+STD_PRECISION = 10 ** 12
+
+
+class JointLPHolderUniV2(Model):
+    """State of a jointLPHolderUniV2 and the pair it provides liquidity to.
+
+    debtJoint[i] stands in for strategies[tokens[i]].debtJoint() and oraclePrices[i] for
+    strategies[tokens[i]].getOraclePrice(). lpUnpooled is lp.balanceOf(holder), lpPooled
+    is the amount staked in the farm (countLpPooled) and balances are loose token balances.
+    Swaps are routed through `pair`, which is what getTokenOutPath does when one side is WETH.
+
+    Once initaliseStrategies has been called with provider models (jointsim.provider) tokens
+    leaving the holder are credited to them, otherwise entry points just return the amounts.
+    Farm rewards are tracked as pendingRewards and sold at rewardPrices[i] (token i per 1e18
+    reward units) with no price impact.
+    """
+
+    _refs = ("pair", "strategies")
+
+    def __init__(
+        self,
+        pair,
+        lpPooled=0,
+        debtJoint=(0, 0),
+        oraclePrices=(10 ** 18, 10 ** 18),
+        token0TotalSupply=10 ** 27,
+        lpUnpooled=0,
+        balances=(0, 0),
+    ):
+        self.pair = pair
+        self.lpPooled = lpPooled
+        self.lpUnpooled = lpUnpooled
+        self.debtJoint = list(debtJoint)
+        self.oraclePrices = list(oraclePrices)
+        self.token0TotalSupply = token0TotalSupply
+        self.balances = list(balances)
+
+        self.doPriceCheck = True
+        self.slippageAdj = 9900
+        self.rebalancePercent = 10000
+        self.bpsRebalanceDiff = 50
+        self.debtUpper = 10250
+        self.priceSourceDiff = 250
+        self.lpDust = 10 ** 4
+
+        self.strategies = []
+        self.timestamp = 0
+        self.lastRewardSale = 0
+        self.minRewardSaleTime = 3600
+        self.pendingRewards = 0
+        self.rewardPrices = [10 ** 18, 10 ** 18]
+        # not contract state: swapExactFromTo calls and their running slippage per output token
+        self.swapSlippage = [0, 0]
+        self.swapCount = 0
+
+    def _models(self):
+        models = [self.pair, self]
+        for strategy in self.strategies:
+            models += [strategy, strategy.vault, strategy.insurance]
+            if strategy.lendMarket is not None:
+                models.append(strategy.lendMarket)
+        return models
+
+    def initaliseStrategies(self, strategies):
+        require(not self.strategies)
+        self.strategies = list(strategies)
+
+    def setPriceSource(self, doPriceCheck, priceSourceDiff):
+        self.doPriceCheck = doPriceCheck
+        self.priceSourceDiff = priceSourceDiff
+
+    def setParamaters(self, slippageAdj, bpsRebalanceDiff, rebalancePercent, debtUpper):
+        self.slippageAdj = slippageAdj
+        self.bpsRebalanceDiff = bpsRebalanceDiff
+        self.rebalancePercent = rebalancePercent
+        self.debtUpper = debtUpper
+
+    # views
+
+    def getLpReserves(self, index):
+        return self.pair.getReserve(index)
+
+    def lpBalance(self):
+        return add(self.lpUnpooled, self.lpPooled)
+
+    def debtOutstanding(self, tokenIndex):
+        return self.debtJoint[tokenIndex]
+
+    def convertAtoB(self, tokenA, tokenB, amountIn):
+        token0Amt = self.getLpReserves(0)
+        token1Amt = self.getLpReserves(1)
+        if tokenA == 0:
+            return div(mul(amountIn, token1Amt), token0Amt)
+        return div(mul(amountIn, token0Amt), token1Amt)
+
+    def convertAtoBOracle(self, tokenA, tokenB, amountIn):
+        priceA = self.oraclePrices[tokenA]
+        priceB = self.oraclePrices[tokenB]
+        return div(mul(priceA, amountIn), priceB)
+
+    def calcPriceDiff(self):
+        amountIn = self.token0TotalSupply
+        lpPrice = self.convertAtoB(0, 1, amountIn)
+        oraclePrice = self.convertAtoBOracle(0, 1, amountIn)
+        return div(mul(lpPrice, BASIS_PRECISION), oraclePrice)
+
+    def _testPriceSource(self):
+        if self.doPriceCheck:
+            priceSourceRatio = self.calcPriceDiff()
+            return priceSourceRatio > sub(
+                BASIS_PRECISION, self.priceSourceDiff
+            ) and priceSourceRatio < add(BASIS_PRECISION, self.priceSourceDiff)
+        return True
+
+    def balanceToken(self, tokenIndex):
+        lpAmount = self.getLpReserves(tokenIndex)
+        return div(mul(self.lpBalance(), lpAmount), self.pair.totalSupply)
+
+    def calcDebtRatioToken(self, tokenIndex):
+        return div(
+            mul(self.debtOutstanding(tokenIndex), BASIS_PRECISION),
+            self.balanceToken(tokenIndex),
+        )
+
+    def calcDebtRatio(self):
+        return (self.calcDebtRatioToken(0), self.calcDebtRatioToken(1))
+
+    def balanceTokenWithRebalance(self, tokenIndex):
+        tokenBalance0 = self.balanceToken(0)
+        tokenBalance1 = self.balanceToken(1)
+        debtRatio0 = self.calcDebtRatioToken(0)
+        debtRatio1 = self.calcDebtRatioToken(1)
+
+        if debtRatio0 > debtRatio1:
+            swapPct = div(sub(debtRatio0, debtRatio1), 2)
+            swapAmount = div(mul(tokenBalance1, swapPct), BASIS_PRECISION)
+            amountIn = self.convertAtoB(1, 0, swapAmount)
+            tokenBalance0 = add(tokenBalance0, amountIn)
+            tokenBalance1 = sub(tokenBalance1, swapAmount)
+        else:
+            swapPct = div(sub(debtRatio1, debtRatio0), 2)
+            swapAmount = div(mul(tokenBalance0, swapPct), BASIS_PRECISION)
+            amountIn = self.convertAtoB(0, 1, swapAmount)
+            tokenBalance0 = sub(tokenBalance0, swapAmount)
+            tokenBalance1 = add(tokenBalance1, amountIn)
+
+        if tokenIndex == 0:
+            return tokenBalance0
+        return tokenBalance1
+
+    def calculateProfit(self, tokenIndex):
+        """Returns (loss, profit) for the provider of tokens[tokenIndex]."""
+        debt = self.debtOutstanding(tokenIndex)
+        balance = self.balanceTokenWithRebalance(tokenIndex)
+        if balance >= debt:
+            return (0, sub(balance, debt))
+        return (sub(debt, balance), 0)
+
+    # internals
+
+    def _withdrawFromFarm(self, amount):
+        if amount > 0 and amount > self.lpUnpooled:
+            pull = sub(amount, self.lpUnpooled)
+            self.lpPooled = sub(self.lpPooled, pull)
+            self.lpUnpooled = add(self.lpUnpooled, pull)
+
+    def _removeAllLp(self, amount):
+        amount0 = self.getLpReserves(0)
+        amount1 = self.getLpReserves(1)
+        lpIssued = self.pair.totalSupply
+
+        amount0Min = div(
+            div(mul(mul(amount, amount0), self.slippageAdj), BASIS_PRECISION), lpIssued
+        )
+        amount1Min = div(
+            div(mul(mul(amount, amount1), self.slippageAdj), BASIS_PRECISION), lpIssued
+        )
+        self.lpUnpooled = sub(self.lpUnpooled, amount)
+        out0, out1 = self.pair.removeLiquidity(amount, amount0Min, amount1Min)
+        self.balances[0] = add(self.balances[0], out0)
+        self.balances[1] = add(self.balances[1], out1)
+
+    def _withdrawLp(self, debtProportion):
+        lpOut = div(mul(self.lpBalance(), debtProportion), BASIS_PRECISION)
+        self._withdrawFromFarm(lpOut)
+        self._removeAllLp(lpOut)
+
+    def swapExactFromTo(self, swapFrom, swapTo, amountIn):
+        """Swaps through the pair, returns the slippage against the LP spot price."""
+        fromBalance = self.balances[swapFrom]
+        expectedAmountOut = self.convertAtoB(swapFrom, swapTo, amountIn)
+        if fromBalance < 1 or expectedAmountOut < 1:
+            return 0
+        amountOut = self._routerSwap(swapFrom, swapTo, amountIn)
+        self.balances[swapFrom] = sub(self.balances[swapFrom], amountIn)
+        self.balances[swapTo] = add(self.balances[swapTo], amountOut)
+        slippage = sub(expectedAmountOut, amountOut)
+        self.swapSlippage[swapTo] += slippage
+        self.swapCount += 1
+        return slippage
+
+    def _routerSwap(self, swapFrom, swapTo, amountIn):
+        # getTokenOutPath: one of the pair's tokens is WETH, so the path is the pair itself
+        return self.pair.swap(amountIn, swapFrom)
+
+    def _rebalanceDebtInternal(self, rebalancePercent):
+        debtRatio0 = self.calcDebtRatioToken(0)
+        debtRatio1 = self.calcDebtRatioToken(1)
+
+        if debtRatio0 > add(debtRatio1, self.bpsRebalanceDiff):
+            lpRemovePercent = div(
+                mul(div(sub(debtRatio0, debtRatio1), 2), rebalancePercent),
+                BASIS_PRECISION,
+            )
+            self._withdrawLp(lpRemovePercent)
+            self.swapExactFromTo(1, 0, self.balances[1])
+
+        if debtRatio1 > add(debtRatio0, self.bpsRebalanceDiff):
+            lpRemovePercent = div(
+                mul(div(sub(debtRatio1, debtRatio0), 2), rebalancePercent),
+                BASIS_PRECISION,
+            )
+            self._withdrawLp(lpRemovePercent)
+            self.swapExactFromTo(0, 1, self.balances[0])
+
+    def _adjustJointDebtOnWithdraw(self, tokenIndex, debtProportion):
+        # Strategy.adjustJointDebtOnWithdraw
+        self.debtJoint[tokenIndex] = div(
+            mul(self.debtJoint[tokenIndex], sub(BASIS_PRECISION, debtProportion)),
+            BASIS_PRECISION,
+        )
+
+    def _transferBalances(self):
+        sent = tuple(self.balances)
+        self.balances = [0, 0]
+        for strategy, amount in zip(self.strategies, sent):
+            strategy.wantBalance = add(strategy.wantBalance, amount)
+        return sent
+
+    def _adjustDebtOnRebalance(self):
+        bal0, bal1 = self._transferBalances()
+        proportion0 = div(mul(bal0, BASIS_PRECISION), self.debtOutstanding(0))
+        self._adjustJointDebtOnWithdraw(0, proportion0)
+        proportion1 = div(mul(bal1, BASIS_PRECISION), self.debtOutstanding(1))
+        self._adjustJointDebtOnWithdraw(1, proportion1)
+        return (bal0, bal1)
+
+    def _depositLp(self):
+        amount0, amount1 = self.balances
+        if amount0 > 0 and amount1 > 0:
+            used0, used1, liquidity = self.pair.addLiquidity(
+                amount0,
+                amount1,
+                div(mul(amount0, self.slippageAdj), BASIS_PRECISION),
+                div(mul(amount1, self.slippageAdj), BASIS_PRECISION),
+            )
+            self.balances = [sub(amount0, used0), sub(amount1, used1)]
+            self.lpUnpooled = add(self.lpUnpooled, liquidity)
+
+    def _depositToFarm(self):
+        if self.lpUnpooled > 0:
+            self.lpPooled = add(self.lpPooled, self.lpUnpooled)
+            self.lpUnpooled = 0
+
+    def _processWantFromProviders(self, lpBalancePull):
+        for i in range(2):
+            amountInLp = self.getLpReserves(i)
+            wantAmount = min(
+                self.strategies[i].wantAvailable(),
+                div(mul(amountInLp, lpBalancePull), STD_PRECISION),
+            )
+            self.strategies[i].provideWant(wantAmount)
+
+        self._depositLp()
+        self._depositToFarm()
+
+    def canHarvestJoint(self):
+        timeSinceSale = sub(self.timestamp, self.lastRewardSale)
+        return timeSinceSale >= self.minRewardSaleTime and self.lpBalance() > 0
+
+    def getDebtProportion(self, tokenIndex):
+        return div(BASIS_PRECISION, 2)
+
+    def sellReward(self, tokenIndex, amount):
+        """Router swap of reward tokens into tokens[tokenIndex], returns the amount out."""
+        return div(mul(amount, self.rewardPrices[tokenIndex]), 10 ** 18)
+
+    def _sellRewardTokens(self, farmAmount):
+        balance = farmAmount
+        for i in range(2):
+            saleAmount = min(
+                div(mul(farmAmount, self.getDebtProportion(i)), BASIS_PRECISION),
+                balance,
+            )
+            balance = sub(balance, saleAmount)
+            self.balances[i] = add(self.balances[i], self.sellReward(i, saleAmount))
+            # the whole token balance is sent, including dust addLiquidity left behind
+            strategy = self.strategies[i]
+            strategy.wantBalance = add(strategy.wantBalance, self.balances[i])
+            self.balances[i] = 0
+
+    def _harvestInternal(self):
+        farmAmount = self.pendingRewards
+        self.pendingRewards = 0
+        self._sellRewardTokens(farmAmount)
+        self.lastRewardSale = self.timestamp
+
+    # external entry points, each returns the token amounts sent back to the providers
+
+    @transaction
+    def addToJoint(self):
+        lpBalancePull = MAX_UINT256
+        for i in range(2):
+            amountInLp = self.getLpReserves(i)
+            wantAmount = self.strategies[i].wantAvailable()
+            lpBalancePull = min(
+                lpBalancePull, div(mul(wantAmount, STD_PRECISION), amountInLp)
+            )
+
+        if lpBalancePull > self.lpDust:
+            self._processWantFromProviders(lpBalancePull)
+
+    @transaction
+    def harvestRewards(self):
+        self._harvestInternal()
+
+    @transaction
+    def harvestFromProvider(self):
+        self._harvestInternal()
+
+    @transaction
+    def rebalanceDebt(self):
+        require(self._testPriceSource())
+        require(
+            self.calcDebtRatioToken(0) > self.debtUpper
+            or self.calcDebtRatioToken(1) > self.debtUpper
+        )
+        self._rebalanceDebtInternal(self.rebalancePercent)
+        return self._adjustDebtOnRebalance()
+
+    @transaction
+    def withdraw(self, debtProportion):
+        debtProportion = max(debtProportion, 50)
+        require(self._testPriceSource())
+        self._rebalanceDebtInternal(debtProportion)
+        self._withdrawLp(debtProportion)
+        sent = self._transferBalances()
+        for i in range(2):
+            self._adjustJointDebtOnWithdraw(i, debtProportion)
+        return sent
+
+    @transaction
+    def withdrawAllFromJoint(self):
+        self._rebalanceDebtInternal(BASIS_PRECISION)
+        self._withdrawLp(BASIS_PRECISION)
+        sent = self._transferBalances()
+        for i in range(2):
+            self._adjustJointDebtOnWithdraw(i, BASIS_PRECISION)
+        return sent
+
+    @transaction
+    def withdrawAllFromJointNoRebalance(self):
+        self._withdrawLp(BASIS_PRECISION)
+        sent = self._transferBalances()
+        for i in range(2):
+            self._adjustJointDebtOnWithdraw(i, BASIS_PRECISION)
+        return sent
@@ -0,0 +1,52 @@
+"""Offline model of contracts/StrategyInsurance.sol."""
+
+from jointsim.safemath import Model, add, div, mul, sub
+
+BPS_MAX = 10000
+
+
+class StrategyInsurance(Model):
+    """balance stands in for want.balanceOf(insurance). Payouts are credited to `strategy`."""
+
+    _refs = ("strategy",)
+
+    def __init__(
+        self, targetFundSize=50, profitTakeRate=1000, maximumCompenstionRate=5
+    ):
+        self.strategy = None
+        self.balance = 0
+        self.lossSum = 0
+        self.targetFundSize = targetFundSize
+        self.profitTakeRate = profitTakeRate
+        self.maximumCompenstionRate = maximumCompenstionRate
+
+    def reportProfit(self, totalDebt, profit):
+        if self.lossSum > profit:
+            self.lossSum = sub(self.lossSum, profit)
+            self.compensate(totalDebt)
+            return 0
+
+        self.lossSum = 0
+
+        targetBalance = div(mul(totalDebt, self.targetFundSize), BPS_MAX)
+        if self.balance >= targetBalance:
+            return 0
+
+        return div(mul(profit, self.profitTakeRate), BPS_MAX)
+
+    def reportLoss(self, totalDebt, loss):
+        self.lossSum = add(self.lossSum, loss)
+        return self.compensate(totalDebt)
+
+    def compensate(self, totalDebt):
+        if self.balance == 0:
+            self.lossSum = 0
+            return 0
+
+        maxComp = div(mul(self.maximumCompenstionRate, totalDebt), BPS_MAX)
+        compensation = min(self.balance, self.lossSum, maxComp)
+
+        if compensation > 0:
+            self.balance = sub(self.balance, compensation)
+            self.strategy.wantBalance = add(self.strategy.wantBalance, compensation)
+        return compensation
@@ -0,0 +1,176 @@
+"""Batched NumPy replay of StrategyInsurance over many harvest histories.
+
+Each history is a row of harvest results (profit > 0, loss < 0) as the provider reports
+them after its own accounting. The harvests of a row run in order, the rows run side by
+side, so thousands of histories cost one pass over the harvest axis. Insurance parameters
+may be scalars or one value per history, which turns the same pass into a parameter sweep.
+
+Amounts are float64 with the contract's truncating divisions kept, as in jointsim.sweep.
+Note that compensate() doesn't reduce lossSum: the fund keeps paying up to
+maximumCompenstionRate per harvest until profits have covered lossSum, so the
+compensation paid can exceed the loss reported.
+
+    python -m jointsim.insurancesweep -n 10000 --harvests 365 --volatility 0.002
+"""
+
+import argparse
+
+import numpy as np
+
+from jointsim.insurance import BPS_MAX
+from jointsim.sweep import _div
+
+
+def simulateInsurance(
+    pnl,
+    totalDebt,
+    targetFundSize=50,
+    profitTakeRate=1000,
+    maximumCompenstionRate=5,
+    balance=0,
+):
+    """Replays reportProfit / reportLoss for every harvest of every history.
+
+    pnl is (histories, harvests). totalDebt broadcasts against pnl, the parameters and
+    the starting balance against the history axis. Returns a dict of per history arrays:
+    balance, lossSum, payments, compensation, losses (totals over the history),
+    harvestsToTarget (first harvest, 1 based, that ends with the fund at target, -1 if
+    never) and absorbed (compensation / losses).
+    """
+    pnl = np.atleast_2d(np.asarray(pnl, dtype=np.float64))
+    histories, harvests = pnl.shape
+    totalDebt = np.broadcast_to(np.asarray(totalDebt, dtype=np.float64), pnl.shape)
+    targetFundSize = np.broadcast_to(
+        np.asarray(targetFundSize, dtype=np.float64), (histories,)
+    )
+    profitTakeRate = np.broadcast_to(
+        np.asarray(profitTakeRate, dtype=np.float64), (histories,)
+    )
+    maximumCompenstionRate = np.broadcast_to(
+        np.asarray(maximumCompenstionRate, dtype=np.float64), (histories,)
+    )
+
+    balance = np.array(
+        np.broadcast_to(np.asarray(balance, dtype=np.float64), (histories,))
+    )
+    lossSum = np.zeros(histories)
+    payments = np.zeros(histories)
+    compensation = np.zeros(histories)
+    losses = np.zeros(histories)
+    harvestsToTarget = np.full(histories, -1)
+
+    for h in range(harvests):
+        debt = totalDebt[:, h]
+        profit = np.maximum(pnl[:, h], 0)
+        loss = np.maximum(-pnl[:, h], 0)
+        isProfit = profit > 0
+        losses += loss
+
+        # reportProfit while earlier losses are still outstanding
+        paysDown = isProfit & (lossSum > profit)
+        # reportProfit with nothing outstanding, lossSum resets
+        takes = isProfit & ~paysDown
+        lossSum = np.where(
+            paysDown, lossSum - profit, np.where(takes, 0, lossSum + loss)
+        )
+
+        target = _div(debt * targetFundSize, BPS_MAX)
+        payment = np.where(
+            takes & (balance < target), _div(profit * profitTakeRate, BPS_MAX), 0
+        )
+        # the strategy only transfers when 0 < payment < profit - payment
+        payment = np.where(payment < profit - payment, payment, 0)
+        balance = balance + payment
+        payments += payment
+
+        # compensate(), on reportLoss and on reportProfit with losses outstanding
+        compensating = ~takes
+        empty = compensating & (balance == 0)
+        lossSum = np.where(empty, 0, lossSum)
+        maxComp = _div(maximumCompenstionRate * debt, BPS_MAX)
+        paid = np.where(
+            compensating, np.minimum(np.minimum(balance, lossSum), maxComp), 0
+        )
+        balance = balance - paid
+        compensation += paid
+
+        reached = (harvestsToTarget < 0) & (balance >= target)
+        harvestsToTarget = np.where(reached, h + 1, harvestsToTarget)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        absorbed = np.where(losses > 0, compensation / losses, 0)
+    return {
+        "balance": balance,
+        "lossSum": lossSum,
+        "payments": payments,
+        "compensation": compensation,
+        "losses": losses,
+        "harvestsToTarget": harvestsToTarget,
+        "absorbed": absorbed,
+    }
+
+
+def randomHarvests(
+    histories, harvests, totalDebt, meanReturn=0.0005, volatility=0.002, seed=0
+):
+    """Normal per harvest returns on a fixed totalDebt, shape (histories, harvests)."""
+    rng = np.random.default_rng(seed)
+    return np.floor(
+        rng.normal(meanReturn, volatility, (histories, harvests)) * totalDebt
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-n", "--histories", type=int, default=10_000)
+    parser.add_argument("--harvests", type=int, default=365)
+    parser.add_argument("--totalDebt", type=float, default=1e24)
+    parser.add_argument("--meanReturn", type=float, default=0.0005)
+    parser.add_argument("--volatility", type=float, default=0.002)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--targetFundSize", type=int, default=50)
+    parser.add_argument("--profitTakeRate", type=int, default=1000)
+    parser.add_argument("--maximumCompenstionRate", type=int, default=5)
+    args = parser.parse_args()
+
+    pnl = randomHarvests(
+        args.histories,
+        args.harvests,
+        args.totalDebt,
+        args.meanReturn,
+        args.volatility,
+        args.seed,
+    )
+    result = simulateInsurance(
+        pnl,
+        args.totalDebt,
+        args.targetFundSize,
+        args.profitTakeRate,
+        args.maximumCompenstionRate,
+    )
+    reached = result["harvestsToTarget"][result["harvestsToTarget"] > 0]
+    print("{0} histories of {1} harvests".format(args.histories, args.harvests))
+    print("reached target    {0:.2%}".format(len(reached) / args.histories))
+    if len(reached):
+        print(
+            "harvests to target  p50 {0:.0f}  p95 {1:.0f}".format(
+                *np.percentile(reached, (50, 95))
+            )
+        )
+    for key in ("balance", "payments", "compensation", "losses"):
+        print(
+            "{0:>16}  mean {1:.4%} of totalDebt".format(
+                key, result[key].mean() / args.totalDebt
+            )
+        )
+    print(
+        "{0:>16}  mean {1:.4f}  p5 {2:.4f}  p95 {3:.4f}".format(
+            "absorbed",
+            result["absorbed"].mean(),
+            *np.percentile(result["absorbed"], (5, 95)),
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+"""Lending markets behind the providers: a Compound cToken (providerStrategy's cTokenLend)
+and an Aave v3 reserve (providerStrategyAAVE's pool / aToken).
+
+Both accrue interest from their own rate model when accrueInterest(timestamp) is called,
+so a simulator that pokes them every step sees exchangeRateStored / the liquidity index
+move the way a busy market's would. The rest of the market (other lenders and borrowers)
+is aggregated into cash and borrows; providers only supply and withdraw.
+
+Each market exposes the same four calls the Strategy model needs:
+  supply(amount) -> shares        cTokens minted / aToken scaled balance added
+  withdraw(amount) -> shares      shares burnt for exactly amount of want
+  balanceOf(shares) -> amount     balanceLend for that many shares
+  accrueInterest(timestamp)
+"""
+
+from jointsim.safemath import Model, add, div, mul, require, sub, transaction
+
+WAD = 10 ** 18
+RAY = 10 ** 27
+HALF_RAY = RAY // 2
+PERCENTAGE_FACTOR = 10_000
+# Aave v3 MathUtils.SECONDS_PER_YEAR, Compound rate models are built from the same year
+SECONDS_PER_YEAR = 365 * 86400
+
+
+class JumpRateModel:
+    """JumpRateModelV2 with rates per second (timestamp based forks such as Hundred).
+
+    Rates are wad per year, kink is a wad utilisation.
+    """
+
+    def __init__(
+        self,
+        baseRatePerYear,
+        multiplierPerYear,
+        jumpMultiplierPerYear,
+        kink,
+        periodsPerYear=SECONDS_PER_YEAR,
+    ):
+        self.baseRatePerPeriod = div(baseRatePerYear, periodsPerYear)
+        self.multiplierPerPeriod = div(
+            mul(multiplierPerYear, WAD), mul(periodsPerYear, kink)
+        )
+        self.jumpMultiplierPerPeriod = div(jumpMultiplierPerYear, periodsPerYear)
+        self.kink = kink
+
+    @staticmethod
+    def utilizationRate(cash, borrows, reserves):
+        if borrows == 0:
+            return 0
+        return div(mul(borrows, WAD), sub(add(cash, borrows), reserves))
+
+    def getBorrowRate(self, cash, borrows, reserves):
+        util = self.utilizationRate(cash, borrows, reserves)
+        if util <= self.kink:
+            return add(
+                div(mul(util, self.multiplierPerPeriod), WAD), self.baseRatePerPeriod
+            )
+        normalRate = add(
+            div(mul(self.kink, self.multiplierPerPeriod), WAD), self.baseRatePerPeriod
+        )
+        excessUtil = sub(util, self.kink)
+        return add(div(mul(excessUtil, self.jumpMultiplierPerPeriod), WAD), normalRate)
+
+    def getSupplyRate(self, cash, borrows, reserves, reserveFactorMantissa):
+        oneMinusReserveFactor = sub(WAD, reserveFactorMantissa)
+        borrowRate = self.getBorrowRate(cash, borrows, reserves)
+        rateToPool = div(mul(borrowRate, oneMinusReserveFactor), WAD)
+        return div(mul(self.utilizationRate(cash, borrows, reserves), rateToPool), WAD)
+
+
+class CTokenMarket(Model):
+    """CToken accounting: cash, totalBorrows, totalReserves and cToken totalSupply.
+
+    The market starts with cash + borrows of underlying at exchangeRate (wad), all of it
+    owned by other lenders.
+    """
+
+    _refs = ("model",)
+
+    def __init__(
+        self,
+        cash,
+        borrows,
+        model,
+        reserveFactorMantissa=WAD // 10,
+        exchangeRate=WAD,
+        timestamp=0,
+    ):
+        self.model = model
+        self.cash = cash
+        self.totalBorrows = borrows
+        self.totalReserves = 0
+        self.totalSupply = div(mul(add(cash, borrows), WAD), exchangeRate)
+        self.reserveFactorMantissa = reserveFactorMantissa
+        self.borrowIndex = WAD
+        self.accrualBlockTimestamp = timestamp
+
+    def exchangeRateStored(self):
+        if self.totalSupply == 0:
+            return WAD
+        cashPlusBorrowsMinusReserves = sub(
+            add(self.cash, self.totalBorrows), self.totalReserves
+        )
+        return div(mul(cashPlusBorrowsMinusReserves, WAD), self.totalSupply)
+
+    def supplyRatePerYear(self):
+        rate = self.model.getSupplyRate(
+            self.cash, self.totalBorrows, self.totalReserves, self.reserveFactorMantissa
+        )
+        return mul(rate, SECONDS_PER_YEAR)
+
+    @transaction
+    def accrueInterest(self, timestamp):
+        delta = sub(timestamp, self.accrualBlockTimestamp)
+        if delta == 0:
+            return
+        borrowRate = self.model.getBorrowRate(
+            self.cash, self.totalBorrows, self.totalReserves
+        )
+        simpleInterestFactor = mul(borrowRate, delta)
+        interestAccumulated = div(mul(simpleInterestFactor, self.totalBorrows), WAD)
+        self.totalBorrows = add(interestAccumulated, self.totalBorrows)
+        self.totalReserves = add(
+            div(mul(self.reserveFactorMantissa, interestAccumulated), WAD),
+            self.totalReserves,
+        )
+        self.borrowIndex = add(
+            div(mul(simpleInterestFactor, self.borrowIndex), WAD), self.borrowIndex
+        )
+        self.accrualBlockTimestamp = timestamp
+
+    def supply(self, amount):
+        """mint(amount), returns the cTokens minted."""
+        mintTokens = div(mul(amount, WAD), self.exchangeRateStored())
+        self.cash = add(self.cash, amount)
+        self.totalSupply = add(self.totalSupply, mintTokens)
+        return mintTokens
+
+    def withdraw(self, amount):
+        """redeemUnderlying(amount), returns the cTokens burnt."""
+        redeemTokens = div(mul(amount, WAD), self.exchangeRateStored())
+        require(self.cash >= amount, "redeem transfer out not possible")
+        self.cash = sub(self.cash, amount)
+        self.totalSupply = sub(self.totalSupply, redeemTokens)
+        return redeemTokens
+
+    def balanceOf(self, shares):
+        return div(mul(shares, self.exchangeRateStored()), WAD)
+
+
+def rayMul(a, b):
+    return div(add(mul(a, b), HALF_RAY), RAY)
+
+
+def rayDiv(a, b):
+    return div(add(mul(a, RAY), b // 2), b)
+
+
+def percentMul(value, percentage):
+    return div(add(mul(value, percentage), PERCENTAGE_FACTOR // 2), PERCENTAGE_FACTOR)
+
+
+def calculateLinearInterest(rate, lastUpdateTimestamp, currentTimestamp):
+    return add(
+        RAY,
+        div(mul(rate, sub(currentTimestamp, lastUpdateTimestamp)), SECONDS_PER_YEAR),
+    )
+
+
+def calculateCompoundedInterest(rate, lastUpdateTimestamp, currentTimestamp):
+    """MathUtils.calculateCompoundedInterest, the three term binomial approximation."""
+    exp = sub(currentTimestamp, lastUpdateTimestamp)
+    if exp == 0:
+        return RAY
+    expMinusOne = exp - 1
+    expMinusTwo = exp - 2 if exp > 2 else 0
+    basePowerTwo = div(rayMul(rate, rate), SECONDS_PER_YEAR * SECONDS_PER_YEAR)
+    basePowerThree = div(rayMul(basePowerTwo, rate), SECONDS_PER_YEAR)
+    secondTerm = div(mul(mul(exp, expMinusOne), basePowerTwo), 2)
+    thirdTerm = div(mul(mul(mul(exp, expMinusOne), expMinusTwo), basePowerThree), 6)
+    return add(
+        add(add(RAY, div(mul(rate, exp), SECONDS_PER_YEAR)), secondTerm), thirdTerm
+    )
+
+
+class AaveRateStrategy:
+    """DefaultReserveInterestRateStrategy (v3) without stable debt or unbacked supply.
+
+    optimalUsageRatio and the rates are ray, rates per year.
+    """
+
+    def __init__(
+        self,
+        optimalUsageRatio,
+        baseVariableBorrowRate,
+        variableRateSlope1,
+        variableRateSlope2,
+    ):
+        self.optimalUsageRatio = optimalUsageRatio
+        self.maxExcessUsageRatio = sub(RAY, optimalUsageRatio)
+        self.baseVariableBorrowRate = baseVariableBorrowRate
+        self.variableRateSlope1 = variableRateSlope1
+        self.variableRateSlope2 = variableRateSlope2
+
+    def calculateInterestRates(
+        self, availableLiquidity, totalVariableDebt, reserveFactor
+    ):
+        """Returns (liquidityRate, variableBorrowRate)."""
+        variableBorrowRate = self.baseVariableBorrowRate
+        if totalVariableDebt == 0:
+            return 0, variableBorrowRate
+        usageRatio = rayDiv(
+            totalVariableDebt, add(availableLiquidity, totalVariableDebt)
+        )
+        if usageRatio > self.optimalUsageRatio:
+            excessUsageRatio = rayDiv(
+                sub(usageRatio, self.optimalUsageRatio), self.maxExcessUsageRatio
+            )
+            variableBorrowRate = add(
+                variableBorrowRate,
+                add(
+                    self.variableRateSlope1,
+                    rayMul(self.variableRateSlope2, excessUsageRatio),
+                ),
+            )
+        else:
+            variableBorrowRate = add(
+                variableBorrowRate,
+                rayDiv(
+                    rayMul(self.variableRateSlope1, usageRatio), self.optimalUsageRatio
+                ),
+            )
+        # _getOverallBorrowRate with only variable debt
+        debtRay = mul(totalVariableDebt, RAY // WAD)
+        overallBorrowRate = rayDiv(rayMul(debtRay, variableBorrowRate), debtRay)
+        liquidityRate = percentMul(
+            rayMul(overallBorrowRate, usageRatio), sub(PERCENTAGE_FACTOR, reserveFactor)
+        )
+        return liquidityRate, variableBorrowRate
+
+
+class AaveReserve(Model):
+    """ReserveData of one asset in an Aave v3 pool: indexes, current rates and the
+    liquidity sitting in the aToken. Shares are aToken scaled balances.
+
+    The market starts with availableLiquidity + borrows supplied by other lenders.
+    reserveFactor is in bps.
+    """
+
+    _refs = ("strategy",)
+
+    def __init__(
+        self, availableLiquidity, borrows, strategy, reserveFactor=1000, timestamp=0
+    ):
+        self.strategy = strategy
+        self.reserveFactor = reserveFactor
+        self.availableLiquidity = availableLiquidity
+        self.liquidityIndex = RAY
+        self.variableBorrowIndex = RAY
+        self.scaledVariableDebt = borrows
+        self.scaledTotalSupply = add(availableLiquidity, borrows)
+        self.accruedToTreasury = 0
+        self.lastUpdateTimestamp = timestamp
+        self._updateInterestRates()
+
+    def totalVariableDebt(self):
+        return rayMul(self.scaledVariableDebt, self.variableBorrowIndex)
+
+    def supplyRatePerYear(self):
+        return self.currentLiquidityRate // (RAY // WAD)
+
+    def _updateInterestRates(self):
+        (
+            self.currentLiquidityRate,
+            self.currentVariableBorrowRate,
+        ) = self.strategy.calculateInterestRates(
+            self.availableLiquidity, self.totalVariableDebt(), self.reserveFactor
+        )
+
+    @transaction
+    def accrueInterest(self, timestamp):
+        """ReserveLogic.updateState: _updateIndexes then _accrueToTreasury."""
+        if timestamp == self.lastUpdateTimestamp:
+            return
+        previousVariableBorrowIndex = self.variableBorrowIndex
+        if self.currentLiquidityRate != 0:
+            cumulatedLiquidityInterest = calculateLinearInterest(
+                self.currentLiquidityRate, self.lastUpdateTimestamp, timestamp
+            )
+            self.liquidityIndex = rayMul(
+                cumulatedLiquidityInterest, self.liquidityIndex
+            )
+        if self.scaledVariableDebt != 0:
+            cumulatedVariableBorrowInterest = calculateCompoundedInterest(
+                self.currentVariableBorrowRate, self.lastUpdateTimestamp, timestamp
+            )
+            self.variableBorrowIndex = rayMul(
+                cumulatedVariableBorrowInterest, self.variableBorrowIndex
+            )
+
+        previousVariableDebt = rayMul(
+            self.scaledVariableDebt, previousVariableBorrowIndex
+        )
+        totalDebtAccrued = sub(self.totalVariableDebt(), previousVariableDebt)
+        amountToMint = percentMul(totalDebtAccrued, self.reserveFactor)
+        if amountToMint != 0:
+            self.accruedToTreasury = add(
+                self.accruedToTreasury, rayDiv(amountToMint, self.liquidityIndex)
+            )
+        self.lastUpdateTimestamp = timestamp
+        self._updateInterestRates()
+
+    def supply(self, amount):
+        """Pool.supply, returns the scaled balance minted."""
+        amountScaled = rayDiv(amount, self.liquidityIndex)
+        require(amountScaled != 0, "INVALID_MINT_AMOUNT")
+        self.availableLiquidity = add(self.availableLiquidity, amount)
+        self.scaledTotalSupply = add(self.scaledTotalSupply, amountScaled)
+        self._updateInterestRates()
+        return amountScaled
+
+    def withdraw(self, amount):
+        """Pool.withdraw, returns the scaled balance burnt."""
+        amountScaled = rayDiv(amount, self.liquidityIndex)
+        require(amountScaled != 0, "INVALID_BURN_AMOUNT")
+        self.availableLiquidity = sub(self.availableLiquidity, amount)
+        self.scaledTotalSupply = sub(self.scaledTotalSupply, amountScaled)
+        self._updateInterestRates()
+        return amountScaled
+
+    def balanceOf(self, shares):
+        return rayMul(shares, self.liquidityIndex)
+
+
+def compoundMarket(underlying, utilisation, timestamp=0):
+    """A cToken market holding underlying of which utilisation is borrowed, on a typical
+    stablecoin JumpRateModelV2 (0% base, 4% at the 80% kink, 109% jump)."""
+    model = JumpRateModel(0, 4 * WAD // 100, 109 * WAD // 100, 8 * WAD // 10)
+    borrows = int(underlying * utilisation)
+    return CTokenMarket(underlying - borrows, borrows, model, timestamp=timestamp)
+
+
+def aaveReserve(underlying, utilisation, timestamp=0):
+    """An Aave v3 reserve holding underlying of which utilisation is borrowed, on the
+    stablecoin strategy of the Optimism pool (90% optimal, 4% slope1, 60% slope2)."""
+    strategy = AaveRateStrategy(9 * RAY // 10, 0, 4 * RAY // 100, 60 * RAY // 100)
+    borrows = int(underlying * utilisation)
+    return AaveReserve(underlying - borrows, borrows, strategy, timestamp=timestamp)
+
+
+LEND_MARKETS = {
+    "compound": compoundMarket,
+    "aave": aaveReserve,
+}
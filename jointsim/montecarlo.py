@@ -0,0 +1,409 @@
+"""Monte Carlo returns of a provider pair: two vaults, two Strategy providers, their
+StrategyInsurance and the joint holder, driven by a random price path.
+
+Each scenario deploys the same stack the conftest fixtures do, harvests both providers,
+then steps through time:
+  - arbitrageurs swap the pair to a GBM price path, along x^3 * y + y^3 * x = k for stable
+    Solidly pairs; the oracle follows the same path with optional relative noise
+    (oracleNoise) so priceSourceDiff can block rebalances
+  - swap volume accrues fees to the pair
+  - the farm accrues rewards, sold 50/50 to the providers when they harvest
+  - the lend market accrues interest on each provider's cToken, at lendApr or, with
+    lendModel 'compound' / 'aave', from the rate model of a jointsim.lending market of
+    lendMarketValue at lendUtilisation that the provider supplies into
+  - a keeper calls rebalanceDebt once a debt ratio crosses debtUpper
+  - keeper gas of every harvest, reward sale and rebalance (jointsim.gas) is charged at
+    gasPrice gwei in the native token; netReturn is return less each provider's share
+
+    python -m jointsim.montecarlo FRAXFTMSpiritLQDR -n 20000 --volatility 0.9
+"""
+
+import argparse
+import math
+import multiprocessing
+import os
+import random
+
+from jointsim.gas import TX_GAS, gasCost, keeperGas
+from jointsim.holder import JointLPHolderUniV2
+from jointsim.insurance import StrategyInsurance
+from jointsim.lending import LEND_MARKETS
+from jointsim.pair import UniV2Pair
+from jointsim.pairs import PAIRS
+from jointsim.provider import Strategy
+from jointsim.safemath import Revert
+from jointsim.solidly import SolidlyPair, _get_y
+from jointsim.velo import JointLPHolderVelo
+from jointsim.vault import SECS_PER_YEAR, Vault
+
+DAY = 86400
+
+DEFAULT_SCENARIO = {
+    "days": 365,
+    "stepsPerDay": 1,
+    # price of token0 in whole token1, annualised log drift and volatility
+    "price": 1.0,
+    "drift": 0.0,
+    "volatility": 0.8,
+    # std of the oracle price's relative deviation from the pool price
+    "oracleNoise": 0.0,
+    # pool size and the amount each vault deposits, in whole token1
+    "poolValue": 10_000_000,
+    "deposit": 10_000,
+    # share of the pool value traded per day, farm and lend APRs
+    "dailyVolume": 0.1,
+    "rewardApr": 0.2,
+    "lendApr": (0.02, 0.02),
+    # None for a flat lendApr, or a jointsim.lending.LEND_MARKETS rate model
+    "lendModel": None,
+    "lendMarketValue": 5_000_000,
+    "lendUtilisation": (0.7, 0.7),
+    "harvestInterval": 1,
+    # setParamaters(slippageAdj, bpsRebalanceDiff, rebalancePercent, debtUpper)
+    "jointParams": (9900, 50, 10000, 10250),
+    # setPriceSource(doPriceCheck, priceSourceDiff)
+    "priceSource": (True, 250),
+    "debtDifferenceFee": 2000,
+    # targetFundSize, profitTakeRate, maximumCompenstionRate
+    "insurance": (50, 1000, 5),
+    # keeper gas price in gwei of the native token, 0 leaves gas out of netReturn
+    "gasPrice": 0.0,
+    # keeper gas from the jointsim.gas estimates for actions the pair wasn't benchmarked on,
+    # otherwise those raise UnmeasuredGas
+    "gasEstimates": False,
+}
+
+
+def deploy(pairName, scenario):
+    """Builds pair, holder, vaults, insurance and providers and makes the first harvests."""
+    pairConf = PAIRS[pairName]
+    decimals0, decimals1 = pairConf["decimals"]
+    price = scenario["price"] * 10 ** decimals1 / 10 ** decimals0
+
+    reserve1 = int(scenario["poolValue"] / 2 * 10 ** decimals1)
+    reserve0 = int(reserve1 / price)
+    totalSupply = math.isqrt(reserve0 * reserve1)
+    oraclePrices = (int(price * 10 ** 18), 10 ** 18)
+    if pairConf["lpType"] == "solid":
+        pair = SolidlyPair(
+            reserve0,
+            reserve1,
+            totalSupply,
+            pairConf["stable"],
+            pairConf["swapFee"],
+            pairConf["decimals"],
+        )
+        holder = JointLPHolderVelo(
+            pair, pairConf["tokens"], pairConf["weth"], oraclePrices=oraclePrices
+        )
+    else:
+        pair = UniV2Pair(reserve0, reserve1, totalSupply, pairConf["swapFee"])
+        holder = JointLPHolderUniV2(pair, oraclePrices=oraclePrices)
+    holder.setParamaters(*scenario["jointParams"])
+    holder.setPriceSource(*scenario["priceSource"])
+    holder.rewardPrices = [int(10 ** 18 / price), 10 ** 18]
+
+    strategies = []
+    deposit1 = int(scenario["deposit"] * 10 ** decimals1)
+    deposits = (int(deposit1 / price), deposit1)
+    for i in range(2):
+        vault = Vault()
+        lendMarket = None
+        if scenario["lendModel"] is not None:
+            underlying = int(
+                scenario["lendMarketValue"] * deposits[i] / scenario["deposit"]
+            )
+            lendMarket = LEND_MARKETS[scenario["lendModel"]](
+                underlying, scenario["lendUtilisation"][i], holder.timestamp
+            )
+        strategy = Strategy(
+            vault,
+            holder,
+            i,
+            StrategyInsurance(*scenario["insurance"]),
+            lendMarket=lendMarket,
+        )
+        strategy.debtDifferenceFee = scenario["debtDifferenceFee"]
+        vault.addStrategy(strategy, 10_000, 1_000)
+        vault.deposit(deposits[i])
+        strategies.append(strategy)
+    holder.initaliseStrategies(strategies)
+
+    holder.timestamp += 1
+    for strategy in strategies:
+        strategy.harvest()
+    return holder, strategies, deposits
+
+
+def _stableReserves(pair, reserve0, xy):
+    """Reserves on the stable curve _k(x, y) = xy with reserve0 of token0."""
+    x = reserve0 * 10 ** 18 // pair._scale(0)
+    y = _get_y(x, xy, pair.reserve1 * 10 ** 18 // pair._scale(1))
+    return reserve0, y * pair._scale(1) // 10 ** 18
+
+
+def _moveStablePrice(pair, price):
+    """_movePrice on a stable Solidly pair: bisects reserve0 along the curve through the
+    current reserves for the point whose spotPrice is `price`."""
+    xy = pair._k(pair.reserve0, pair.reserve1)
+    probe = pair.copy()
+
+    def priceAt(reserve0):
+        probe.reserve0, probe.reserve1 = _stableReserves(pair, reserve0, xy)
+        return probe.spotPrice()
+
+    # spotPrice falls as token0 is added
+    lo = hi = pair.reserve0
+    if pair.spotPrice() > price:
+        while priceAt(hi) > price:
+            hi *= 2
+    else:
+        while priceAt(lo) < price:
+            lo //= 2
+    while hi - lo > max(lo >> 40, 1):
+        mid = (lo + hi) // 2
+        if priceAt(mid) > price:
+            lo = mid
+        else:
+            hi = mid
+
+    target0, target1 = _stableReserves(pair, hi, xy)
+    # the fee comes off amountIn before it reaches the reserves
+    feeAdj = 10000 / (10000 - pair.swapFee)
+    if target0 > pair.reserve0:
+        amountIn = int((target0 - pair.reserve0) * feeAdj)
+        if amountIn > 0:
+            pair.swap(amountIn, 0)
+    else:
+        amountIn = int((target1 - pair.reserve1) * feeAdj)
+        if amountIn > 0:
+            pair.swap(amountIn, 1)
+
+
+def _movePrice(pair, price):
+    """Arbitrage swap that brings the pair price (token1 per token0) to `price`."""
+    if isinstance(pair, SolidlyPair) and pair.stable:
+        _moveStablePrice(pair, price)
+        return
+    k = pair.reserve0 * pair.reserve1
+    feeAdj = 10000 / (10000 - pair.swapFee)
+    target1 = math.sqrt(k * price)
+    if target1 > pair.reserve1:
+        amountIn = int((target1 - pair.reserve1) * feeAdj)
+        if amountIn > 0:
+            pair.swap(amountIn, 1)
+    else:
+        amountIn = int((k / target1 - pair.reserve0) * feeAdj)
+        if amountIn > 0:
+            pair.swap(amountIn, 0)
+
+
+def _chargeGas(gasCosts, gas, split, gasPrice, nativeIndex, price):
+    """Adds gas at gasPrice to each provider's cost by the `split` shares, in its own want.
+    price is the pair price, token1 per token0."""
+    wei = gasCost(gas, gasPrice)
+    for i, share in enumerate(split):
+        if i == nativeIndex:
+            gasCosts[i] += wei * share
+        elif nativeIndex == 0:
+            gasCosts[i] += wei * share * price
+        else:
+            gasCosts[i] += wei * share / price
+
+
+def runScenario(pairName, scenario, seed):
+    rng = random.Random(seed)
+    holder, strategies, deposits = deploy(pairName, scenario)
+    pair = holder.pair
+    shares = [strategy.vault.totalSupply for strategy in strategies]
+
+    dt = DAY // scenario["stepsPerDay"]
+    years = dt / SECS_PER_YEAR
+    drift = (scenario["drift"] - scenario["volatility"] ** 2 / 2) * years
+    shock = scenario["volatility"] * math.sqrt(years)
+    harvestSteps = max(int(scenario["harvestInterval"] * scenario["stepsPerDay"]), 1)
+    price = startPrice = pair.spotPrice()
+
+    rebalances = blockedRebalances = failedHarvests = 0
+    lendYield = [0, 0]
+    gas = {
+        action: keeperGas(pairName, action, estimate=scenario["gasEstimates"])
+        for action in ("harvest", "rebalanceDebt", "harvestRewards")
+    }
+    nativeIndex = PAIRS[pairName]["tokens"].index(PAIRS[pairName]["weth"])
+    totalGas = 0
+    gasCosts = [0, 0]
+    for step in range(1, scenario["days"] * scenario["stepsPerDay"] + 1):
+        holder.timestamp += dt
+
+        price *= math.exp(drift + shock * rng.gauss(0, 1))
+        _movePrice(pair, price)
+        oraclePrice = price
+        if scenario["oracleNoise"]:
+            oraclePrice *= 1 + scenario["oracleNoise"] * rng.gauss(0, 1)
+        holder.oraclePrices[0] = int(oraclePrice * 10 ** 18)
+        holder.rewardPrices[0] = int(10 ** 18 / price)
+
+        # swap fees, half of the volume's fee lands on each side of the pool. Solidly pairs
+        # move fees out of the reserves and the gauge passes staked LPs' fees to voters
+        if not isinstance(pair, SolidlyPair):
+            feeValue = (
+                2
+                * pair.reserve1
+                * scenario["dailyVolume"]
+                / scenario["stepsPerDay"]
+                * pair.swapFee
+                / 10000
+            )
+            pair.reserve1 += int(feeValue / 2)
+            pair.reserve0 += int(feeValue / 2 / price)
+
+        holder.pendingRewards += int(
+            2 * holder.balanceToken(1) * scenario["rewardApr"] * years
+        )
+        for i, strategy in enumerate(strategies):
+            balanceLend = strategy.balanceLend()
+            if strategy.lendMarket is not None:
+                strategy.lendMarket.accrueInterest(holder.timestamp)
+            else:
+                strategy.exchangeRate += int(
+                    strategy.exchangeRate * scenario["lendApr"][i] * years
+                )
+            lendYield[i] += strategy.balanceLend() - balanceLend
+
+        debtUpper = holder.debtUpper
+        if (
+            holder.calcDebtRatioToken(0) > debtUpper
+            or holder.calcDebtRatioToken(1) > debtUpper
+        ):
+            try:
+                holder.rebalanceDebt()
+                rebalances += 1
+                totalGas += gas["rebalanceDebt"]
+                _chargeGas(
+                    gasCosts,
+                    gas["rebalanceDebt"],
+                    (0.5, 0.5),
+                    scenario["gasPrice"],
+                    nativeIndex,
+                    price,
+                )
+            except Revert:
+                blockedRebalances += 1
+
+        if step % harvestSteps == 0:
+            for i, strategy in enumerate(strategies):
+                lastRewardSale = holder.lastRewardSale
+                try:
+                    strategy.harvest()
+                except Revert:
+                    failedHarvests += 1
+                    continue
+                totalGas += gas["harvest"]
+                _chargeGas(
+                    gasCosts,
+                    gas["harvest"],
+                    (i == 0, i == 1),
+                    scenario["gasPrice"],
+                    nativeIndex,
+                    price,
+                )
+                if holder.lastRewardSale != lastRewardSale:
+                    saleGas = gas["harvestRewards"] - TX_GAS
+                    totalGas += saleGas
+                    _chargeGas(
+                        gasCosts,
+                        saleGas,
+                        (0.5, 0.5),
+                        scenario["gasPrice"],
+                        nativeIndex,
+                        price,
+                    )
+
+    result = {
+        "seed": seed,
+        "priceMove": price / startPrice - 1,
+        "rebalances": rebalances,
+        "blockedRebalances": blockedRebalances,
+        "failedHarvests": failedHarvests,
+        "keeperGas": totalGas,
+        "rebalanceGas": rebalances * gas["rebalanceDebt"],
+    }
+    for i, strategy in enumerate(strategies):
+        vault = strategy.vault
+        result["return{0}".format(i)] = vault.shareValue(shares[i]) / deposits[i] - 1
+        result["insurance{0}".format(i)] = strategy.insurance.balance / deposits[i]
+        result["totalLoss{0}".format(i)] = vault.totalLoss / deposits[i]
+        result["lendYield{0}".format(i)] = lendYield[i] / deposits[i]
+        result["gasCost{0}".format(i)] = gasCosts[i] / deposits[i]
+        result["netReturn{0}".format(i)] = (
+            result["return{0}".format(i)] - result["gasCost{0}".format(i)]
+        )
+    return result
+
+
+def _runSeed(args):
+    return runScenario(*args)
+
+
+def runMonteCarlo(pairName, scenario=None, nScenarios=10_000, seed=0, processes=None):
+    """Runs nScenarios seeds (seed, seed + 1, ...) across a multiprocessing pool."""
+    params = dict(DEFAULT_SCENARIO)
+    params.update(scenario or {})
+    jobs = [(pairName, params, seed + i) for i in range(nScenarios)]
+    processes = processes or os.cpu_count()
+    chunksize = max(len(jobs) // (processes * 8), 1)
+    with multiprocessing.Pool(processes) as pool:
+        return pool.map(_runSeed, jobs, chunksize)
+
+
+def summarize(results, percentiles=(5, 25, 50, 75, 95)):
+    """Mean and percentiles of every numeric result key across scenarios."""
+    summary = {}
+    for key in results[0]:
+        if key == "seed":
+            continue
+        values = sorted(result[key] for result in results)
+        stats = {"mean": sum(values) / len(values)}
+        for pct in percentiles:
+            stats["p{0}".format(pct)] = values[
+                min(int(pct / 100 * len(values)), len(values) - 1)
+            ]
+        summary[key] = stats
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("pair", choices=sorted(PAIRS))
+    parser.add_argument("-n", "--scenarios", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--processes", type=int, default=None)
+    for key, value in DEFAULT_SCENARIO.items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            parser.add_argument("--" + key, type=type(value), default=value)
+    parser.add_argument("--lendModel", choices=sorted(LEND_MARKETS), default=None)
+    parser.add_argument("--gasEstimates", action="store_true")
+    args = vars(parser.parse_args())
+
+    scenario = {key: args[key] for key in DEFAULT_SCENARIO if key in args}
+    results = runMonteCarlo(
+        args["pair"], scenario, args["scenarios"], args["seed"], args["processes"]
+    )
+    tokens = PAIRS[args["pair"]]["tokens"]
+    print(
+        "{0} scenarios, {1} provider = return0, {2} provider = return1".format(
+            len(results), *tokens
+        )
+    )
+    for key, stats in summarize(results).items():
+        print(
+            "{0:>18}  ".format(key)
+            + "  ".join(
+                "{0} {1:+.4f}".format(name, value) for name, value in stats.items()
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
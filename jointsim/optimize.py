@@ -0,0 +1,140 @@
+"""Grid search over the joint's keeper parameters on Monte Carlo scenarios.
+
+Every candidate sets setParamaters(slippageAdj, bpsRebalanceDiff, rebalancePercent,
+debtUpper) and setPriceSource(True, priceSourceDiff) and runs the same seeds through
+jointsim.montecarlo, so candidates are scored on identical price paths. Scenarios for all
+candidates are spread over one multiprocessing pool.
+
+Each candidate gets two costs to minimise:
+  - rebalanceGas: mean gas of the keeper's rebalanceDebt calls per scenario, priced by
+    jointsim.gas for the pair; the parameters only move the rebalances, harvests and reward
+    sales cost the same for every candidate
+  - ilDrift: mean loss of the worse off provider, -min(return0, return1)
+and the candidates no other candidate beats on both make up the Pareto frontier. keeperGas,
+all keeper gas including the harvests, is reported alongside.
+
+    python -m jointsim.optimize FRAXFTMSpiritLQDR -n 64 --debtUpper 10150 10250 10400
+"""
+
+import argparse
+import itertools
+import multiprocessing
+import os
+
+from jointsim.montecarlo import DEFAULT_SCENARIO, _runSeed
+from jointsim.pairs import PAIRS
+
+DEFAULT_GRID = {
+    "slippageAdj": (9900,),
+    "bpsRebalanceDiff": (25, 50, 100),
+    "rebalancePercent": (5000, 10000),
+    "debtUpper": (10100, 10150, 10250, 10400, 10600),
+    "priceSourceDiff": (250,),
+}
+
+PARAMETERS = tuple(DEFAULT_GRID)
+
+
+def candidates(grid=None):
+    """Every combination of the grid values, as dicts keyed by PARAMETERS."""
+    values = dict(DEFAULT_GRID)
+    values.update(grid or {})
+    return [
+        dict(zip(PARAMETERS, combo))
+        for combo in itertools.product(*(values[key] for key in PARAMETERS))
+    ]
+
+
+def candidateScenario(candidate, scenario=None):
+    params = dict(DEFAULT_SCENARIO)
+    params.update(scenario or {})
+    params["jointParams"] = tuple(candidate[key] for key in PARAMETERS[:4])
+    params["priceSource"] = (True, candidate["priceSourceDiff"])
+    return params
+
+
+def score(candidate, results):
+    n = len(results)
+    return dict(
+        candidate,
+        rebalanceGas=sum(result["rebalanceGas"] for result in results) / n,
+        keeperGas=sum(result["keeperGas"] for result in results) / n,
+        ilDrift=-sum(min(result["return0"], result["return1"]) for result in results)
+        / n,
+        meanReturn=sum(result["return0"] + result["return1"] for result in results)
+        / (2 * n),
+        blockedRebalances=sum(result["blockedRebalances"] for result in results) / n,
+    )
+
+
+def paretoFrontier(scores, keys=("rebalanceGas", "ilDrift")):
+    """Scores not dominated on `keys` (lower is better), sorted by the first key."""
+    frontier = []
+    for candidate in sorted(scores, key=lambda s: tuple(s[key] for key in keys)):
+        if not frontier or candidate[keys[1]] < frontier[-1][keys[1]]:
+            frontier.append(candidate)
+    return frontier
+
+
+def optimize(pairName, grid=None, scenario=None, nScenarios=64, seed=0, processes=None):
+    """Scores every grid candidate on nScenarios seeds. Returns (scores, frontier)."""
+    grid = candidates(grid)
+    jobs = [
+        (pairName, candidateScenario(candidate, scenario), seed + i)
+        for candidate in grid
+        for i in range(nScenarios)
+    ]
+    processes = processes or os.cpu_count()
+    chunksize = max(len(jobs) // (processes * 8), 1)
+    with multiprocessing.Pool(processes) as pool:
+        results = pool.map(_runSeed, jobs, chunksize)
+
+    scores = [
+        score(candidate, results[i * nScenarios : (i + 1) * nScenarios])
+        for i, candidate in enumerate(grid)
+    ]
+    return scores, paretoFrontier(scores)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("pair", choices=sorted(PAIRS))
+    parser.add_argument("-n", "--scenarios", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--days", type=int, default=DEFAULT_SCENARIO["days"])
+    parser.add_argument(
+        "--volatility", type=float, default=DEFAULT_SCENARIO["volatility"]
+    )
+    parser.add_argument(
+        "--oracleNoise", type=float, default=DEFAULT_SCENARIO["oracleNoise"]
+    )
+    parser.add_argument("--gasEstimates", action="store_true")
+    for key, values in DEFAULT_GRID.items():
+        parser.add_argument("--" + key, type=int, nargs="+", default=list(values))
+    args = vars(parser.parse_args())
+
+    grid = {key: args[key] for key in PARAMETERS}
+    scenario = {
+        key: args[key] for key in ("days", "volatility", "oracleNoise", "gasEstimates")
+    }
+    scores, frontier = optimize(
+        args["pair"], grid, scenario, args["scenarios"], args["seed"], args["processes"]
+    )
+    print(
+        "{0} candidates, Pareto frontier of rebalance gas vs IL drift:".format(
+            len(scores)
+        )
+    )
+    for entry in frontier:
+        print(
+            "  ".join("{0} {1}".format(key, entry[key]) for key in PARAMETERS)
+            + "  rebalanceGas {0:,.0f}  keeperGas {1:,.0f}  ilDrift {2:+.4%}".format(
+                entry["rebalanceGas"], entry["keeperGas"], entry["ilDrift"]
+            )
+            + "  meanReturn {0:+.4%}".format(entry["meanReturn"])
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Constant product pair + router maths (UniswapV2 / Spirit / Spooky forks)."""
+
+from jointsim.safemath import MAX_UINT112, Model, add, div, mul, require, sub
+
+MINIMUM_LIQUIDITY = 10 ** 3
+
+
+class UniV2Pair(Model):
+    """Reserves and LP supply of a UniswapV2 style pair.
+
+    swapFee is in bps: 30 for UniswapV2 / Spirit (997 / 1000), 20 for Spooky.
+    The protocol fee (kLast / feeTo) is not modelled.
+    """
+
+    def __init__(self, reserve0, reserve1, totalSupply, swapFee=30):
+        self.reserve0 = reserve0
+        self.reserve1 = reserve1
+        self.totalSupply = totalSupply
+        self.swapFee = swapFee
+
+    def copy(self):
+        return UniV2Pair(self.reserve0, self.reserve1, self.totalSupply, self.swapFee)
+
+    def getReserves(self):
+        return (self.reserve0, self.reserve1)
+
+    def getReserve(self, index):
+        if index == 0:
+            return self.reserve0
+        return self.reserve1
+
+    def spotPrice(self):
+        """Marginal price of token0 in token1, raw units."""
+        return self.reserve1 / self.reserve0
+
+    def _update(self, balance0, balance1):
+        require(
+            balance0 <= MAX_UINT112 and balance1 <= MAX_UINT112, "UniswapV2: OVERFLOW"
+        )
+        self.reserve0 = balance0
+        self.reserve1 = balance1
+
+    def getAmountOut(self, amountIn, indexIn):
+        require(amountIn > 0, "UniswapV2Library: INSUFFICIENT_INPUT_AMOUNT")
+        reserveIn = self.getReserve(indexIn)
+        reserveOut = self.getReserve(1 - indexIn)
+        require(
+            reserveIn > 0 and reserveOut > 0, "UniswapV2Library: INSUFFICIENT_LIQUIDITY"
+        )
+        amountInWithFee = mul(amountIn, 10000 - self.swapFee)
+        numerator = mul(amountInWithFee, reserveOut)
+        denominator = add(mul(reserveIn, 10000), amountInWithFee)
+        return numerator // denominator
+
+    def swap(self, amountIn, indexIn):
+        """Router swapExactTokensForTokens over this single pair, returns amountOut."""
+        amountOut = self.getAmountOut(amountIn, indexIn)
+        require(amountOut > 0, "UniswapV2: INSUFFICIENT_OUTPUT_AMOUNT")
+        if indexIn == 0:
+            self._update(add(self.reserve0, amountIn), sub(self.reserve1, amountOut))
+        else:
+            self._update(sub(self.reserve0, amountOut), add(self.reserve1, amountIn))
+        return amountOut
+
+    def quote(self, amountA, reserveA, reserveB):
+        require(amountA > 0, "UniswapV2Library: INSUFFICIENT_AMOUNT")
+        require(
+            reserveA > 0 and reserveB > 0, "UniswapV2Library: INSUFFICIENT_LIQUIDITY"
+        )
+        return div(mul(amountA, reserveB), reserveA)
+
+    def addLiquidity(self, amount0Desired, amount1Desired, amount0Min, amount1Min):
+        """Router addLiquidity, returns (amount0, amount1, liquidity)."""
+        amount1Optimal = self.quote(amount0Desired, self.reserve0, self.reserve1)
+        if amount1Optimal <= amount1Desired:
+            require(
+                amount1Optimal >= amount1Min, "UniswapV2Router: INSUFFICIENT_B_AMOUNT"
+            )
+            amount0, amount1 = amount0Desired, amount1Optimal
+        else:
+            amount0Optimal = self.quote(amount1Desired, self.reserve1, self.reserve0)
+            assert amount0Optimal <= amount0Desired
+            require(
+                amount0Optimal >= amount0Min, "UniswapV2Router: INSUFFICIENT_A_AMOUNT"
+            )
+            amount0, amount1 = amount0Optimal, amount1Desired
+
+        liquidity = min(
+            div(mul(amount0, self.totalSupply), self.reserve0),
+            div(mul(amount1, self.totalSupply), self.reserve1),
+        )
+        require(liquidity > 0, "UniswapV2: INSUFFICIENT_LIQUIDITY_MINTED")
+        self._update(add(self.reserve0, amount0), add(self.reserve1, amount1))
+        self.totalSupply = add(self.totalSupply, liquidity)
+        return (amount0, amount1, liquidity)
+
+    def removeLiquidity(self, liquidity, amount0Min, amount1Min):
+        """Router removeLiquidity, returns (amount0, amount1)."""
+        amount0 = div(mul(liquidity, self.reserve0), self.totalSupply)
+        amount1 = div(mul(liquidity, self.reserve1), self.totalSupply)
+        require(amount0 > 0 and amount1 > 0, "UniswapV2: INSUFFICIENT_LIQUIDITY_BURNED")
+        require(amount0 >= amount0Min, "UniswapV2Router: INSUFFICIENT_A_AMOUNT")
+        require(amount1 >= amount1Min, "UniswapV2Router: INSUFFICIENT_B_AMOUNT")
+        self.totalSupply = sub(self.totalSupply, liquidity)
+        self._update(sub(self.reserve0, amount0), sub(self.reserve1, amount1))
+        return (amount0, amount1)
@@ -0,0 +1,56 @@
+"""Pair metadata for the CONFIG entries in tests/Fantom and tests/Optimism conftest.py.
+
+Tokens and decimals are listed in pair order (token0 has the lower address), which is not
+always the order used in CONFIG['tokens']. swapFee is in bps. weth is the router's WETH (the
+chain's wrapped native token) and farm / reward name the jointsim.rewards farm and its reward
+token. Solidly pairs ('solid') also list whether the pair is stable.
+"""
+
+PAIRS = {
+    "USDCFTMSpookyBOO": {
+        "tokens": ("USDC", "WFTM"),
+        "decimals": (6, 18),
+        "swapFee": 20,
+        "lpType": "uniV2",
+        "weth": "WFTM",
+        "farm": "SpookyMasterChef",
+        "reward": "BOO",
+    },
+    "USDCFTMSpookyLQDR": {
+        "tokens": ("USDC", "WFTM"),
+        "decimals": (6, 18),
+        "swapFee": 20,
+        "lpType": "uniV2",
+        "weth": "WFTM",
+        "farm": "LQDRMasterChef",
+        "reward": "LQDR",
+    },
+    "WETHFTMSpookyLQDR": {
+        "tokens": ("WFTM", "WETH"),
+        "decimals": (18, 18),
+        "swapFee": 20,
+        "lpType": "uniV2",
+        "weth": "WFTM",
+        "farm": "LQDRMasterChef",
+        "reward": "LQDR",
+    },
+    "FRAXFTMSpiritLQDR": {
+        "tokens": ("WFTM", "FRAX"),
+        "decimals": (18, 18),
+        "swapFee": 30,
+        "lpType": "uniV2",
+        "weth": "WFTM",
+        "farm": "LQDRMasterChef",
+        "reward": "LQDR",
+    },
+    "USDCWETHVELO": {
+        "tokens": ("WETH", "USDC"),
+        "decimals": (18, 6),
+        "swapFee": 2,
+        "lpType": "solid",
+        "stable": False,
+        "weth": "WETH",
+        "farm": "VelodromeGauge",
+        "reward": "VELO",
+    },
+}
@@ -0,0 +1,285 @@
+"""Offline model of contracts/providerStrategy.sol (Strategy) on top of the holder model.
+
+Lending goes to a cToken: lend balance is cTokenBalance * exchangeRate / 1e18, and the
+simulator grows exchangeRate to accrue interest. With a lendMarket from jointsim.lending
+the market's rate model does that instead and cTokenBalance holds its shares (cTokens, or
+the aToken scaled balance for providerStrategyAAVE). debtJoint is stored on the holder
+(holder.debtJoint[tokenIndex]) so both models always agree on it.
+"""
+
+from jointsim.holder import BASIS_PRECISION
+from jointsim.safemath import Model, add, div, mul, require, sub, transaction
+
+STD_PRECISION = 10 ** 18
+
+
+class Strategy(Model):
+    _refs = ("vault", "holder", "insurance", "lendMarket")
+
+    def __init__(
+        self,
+        vault,
+        holder,
+        tokenIndex,
+        insurance,
+        exchangeRate=10 ** 18,
+        lendMarket=None,
+    ):
+        self.vault = vault
+        self.holder = holder
+        self.tokenIndex = tokenIndex
+        self.insurance = insurance
+        insurance.strategy = self
+
+        self.wantBalance = 0
+        self.cTokenBalance = 0
+        self.exchangeRate = exchangeRate
+        self.lendMarket = lendMarket
+
+        self.debtJointMin = 500
+        self.debtJointMax = 9500
+        self.lendDustPercent = 10
+        self.sellJointRewardsAtHarvest = True
+        self.debtDifferenceFee = 2000
+        # not contract state: times _withdraw rounded debtProportion above 9500 up to a full exit
+        self.jointExits = 0
+
+    def _models(self):
+        return self.holder._models()
+
+    @property
+    def debtJoint(self):
+        return self.holder.debtJoint[self.tokenIndex]
+
+    @debtJoint.setter
+    def debtJoint(self, value):
+        self.holder.debtJoint[self.tokenIndex] = value
+
+    # views
+
+    def balanceOfWant(self):
+        return self.wantBalance
+
+    def balanceLend(self):
+        if self.lendMarket is not None:
+            return self.lendMarket.balanceOf(self.cTokenBalance)
+        return div(mul(self.cTokenBalance, self.exchangeRate), STD_PRECISION)
+
+    def balanceJoint(self):
+        if self.debtJoint == 0:
+            return 0
+        loss, profit = self.holder.calculateProfit(self.tokenIndex)
+        return sub(add(self.debtJoint, profit), loss)
+
+    def estimatedTotalAssets(self):
+        return add(add(self.balanceLend(), self.balanceJoint()), self.balanceOfWant())
+
+    def calcDebtRatio(self):
+        if self.debtJoint == 0:
+            return 0
+        return self.holder.calcDebtRatioToken(self.tokenIndex)
+
+    def wantAvailable(self):
+        wantFree = add(self.balanceOfWant(), self.balanceLend())
+        assets = self.estimatedTotalAssets()
+        jointMin = div(mul(self.debtJointMin, assets), BASIS_PRECISION)
+        if wantFree > mul(jointMin, 2):
+            return sub(wantFree, jointMin)
+        return 0
+
+    def getOraclePrice(self):
+        return self.holder.oraclePrices[self.tokenIndex]
+
+    def isInProfit(self):
+        return self.estimatedTotalAssets() > self._getTotalDebt()
+
+    def _getTotalDebt(self):
+        return self.vault.totalDebt
+
+    # lending
+
+    def _lendWant(self, amount):
+        if amount > 0:
+            self.wantBalance = sub(self.wantBalance, amount)
+            if self.lendMarket is not None:
+                mintTokens = self.lendMarket.supply(amount)
+            else:
+                mintTokens = div(mul(amount, STD_PRECISION), self.exchangeRate)
+            self.cTokenBalance = add(self.cTokenBalance, mintTokens)
+
+    def _redeemWant(self, redeemAmount):
+        redeemDust = div(
+            mul(self._getTotalDebt(), self.lendDustPercent), BASIS_PRECISION
+        )
+        if redeemAmount > redeemDust:
+            if self.lendMarket is not None:
+                redeemTokens = self.lendMarket.withdraw(redeemAmount)
+            else:
+                redeemTokens = div(mul(redeemAmount, STD_PRECISION), self.exchangeRate)
+            require(redeemTokens <= self.cTokenBalance, "redeem tokens exceed balance")
+            self.cTokenBalance = sub(self.cTokenBalance, redeemTokens)
+            self.wantBalance = add(self.wantBalance, redeemAmount)
+
+    # joint callbacks
+
+    def provideWant(self, wantAmount):
+        balanceWant = self.balanceOfWant()
+        if balanceWant < wantAmount:
+            self._redeemWant(sub(wantAmount, balanceWant))
+
+        transferAmount = min(wantAmount, self.wantBalance)
+        self.wantBalance = sub(self.wantBalance, transferAmount)
+        self.holder.balances[self.tokenIndex] = add(
+            self.holder.balances[self.tokenIndex], transferAmount
+        )
+        self.debtJoint = add(self.debtJoint, transferAmount)
+
+    # BaseStrategy hooks
+
+    def _harvestRewards(self):
+        if self.sellJointRewardsAtHarvest and self.holder.canHarvestJoint():
+            self.holder.harvestFromProvider()
+
+    def _withdraw(self, amountNeeded):
+        jointDebtRatio = self.calcDebtRatio()
+        amountFromJoint = 0
+        if jointDebtRatio > BASIS_PRECISION:
+            debtRatioDiff = sub(jointDebtRatio, BASIS_PRECISION)
+        else:
+            debtRatioDiff = sub(BASIS_PRECISION, jointDebtRatio)
+
+        balanceWant = self.balanceOfWant()
+        if amountNeeded <= balanceWant:
+            return (amountNeeded, 0)
+
+        self._redeemWant(self.balanceLend())
+        balanceWant = self.balanceOfWant()
+
+        if amountNeeded <= balanceWant:
+            self._lendWant(sub(balanceWant, amountNeeded))
+            return (amountNeeded, 0)
+        elif self.debtJoint > 0:
+            amountFromJoint = sub(amountNeeded, balanceWant)
+            debtProportion = min(
+                div(mul(amountFromJoint, BASIS_PRECISION), self.debtJoint),
+                BASIS_PRECISION,
+            )
+            if debtProportion > 9500:
+                debtProportion = BASIS_PRECISION
+                self.jointExits += 1
+            self.holder.withdraw(debtProportion)
+
+        loss = 0
+        liquidatedAmount = self.balanceOfWant()
+        if liquidatedAmount < amountNeeded:
+            loss = sub(amountNeeded, liquidatedAmount)
+
+        if amountFromJoint > 0:
+            jointFee = div(
+                mul(
+                    div(mul(amountFromJoint, debtRatioDiff), BASIS_PRECISION),
+                    self.debtDifferenceFee,
+                ),
+                BASIS_PRECISION,
+            )
+            loss = add(loss, jointFee)
+
+        return (liquidatedAmount, loss)
+
+    def prepareReturn(self, debtOutstanding):
+        profit = loss = debtPayment = 0
+        self._harvestRewards()
+
+        totalAssets = self.estimatedTotalAssets()
+        totalDebt = self._getTotalDebt()
+
+        if totalAssets > totalDebt:
+            profit = sub(totalAssets, totalDebt)
+            self._withdraw(add(debtOutstanding, profit))
+            balanceWant = self.balanceOfWant()
+            if debtOutstanding > balanceWant:
+                debtPayment = balanceWant
+                profit = 0
+            else:
+                debtPayment = debtOutstanding
+                profit = min(profit, sub(balanceWant, debtPayment))
+        else:
+            self._withdraw(debtOutstanding)
+            loss = sub(totalDebt, totalAssets)
+            debtPayment = self.balanceOfWant()
+
+        self.debtJoint = self.balanceJoint()
+
+        if loss >= profit:
+            profit = 0
+            self.insurance.reportLoss(totalDebt, loss)
+        else:
+            profit = sub(profit, loss)
+            loss = 0
+            insurancePayment = self.insurance.reportProfit(totalDebt, profit)
+            profit = sub(profit, insurancePayment)
+            if insurancePayment > 0 and insurancePayment < profit:
+                self.wantBalance = sub(self.wantBalance, insurancePayment)
+                self.insurance.balance = add(self.insurance.balance, insurancePayment)
+
+        return (profit, loss, debtPayment)
+
+    def adjustPosition(self, debtOutstanding):
+        if debtOutstanding >= self.balanceOfWant():
+            return
+
+        stratPercentFree = div(
+            mul(self.wantAvailable(), BASIS_PRECISION), self.estimatedTotalAssets()
+        )
+        if stratPercentFree > self.debtJointMin:
+            self.holder.addToJoint()
+
+        wantAfter = self.balanceOfWant()
+        if wantAfter > 0:
+            self._lendWant(wantAfter)
+
+    def liquidatePosition(self, amountNeeded):
+        totalAssets = self.estimatedTotalAssets()
+
+        newAmount = amountNeeded
+        loss = 0
+        totalDebt = self._getTotalDebt()
+        if totalDebt > totalAssets:
+            ratio = div(mul(totalAssets, STD_PRECISION), totalDebt)
+            newAmount = div(mul(amountNeeded, ratio), STD_PRECISION)
+            loss = sub(amountNeeded, newAmount)
+
+        _, slippage = self._withdraw(newAmount)
+        loss = add(loss, slippage)
+
+        liquidatedAmount = self.balanceOfWant()
+        if add(liquidatedAmount, loss) > amountNeeded:
+            liquidatedAmount = sub(amountNeeded, loss)
+        else:
+            loss = sub(amountNeeded, liquidatedAmount)
+        return (liquidatedAmount, loss)
+
+    def liquidateAllPositions(self):
+        self._redeemWant(self.balanceLend())
+        if self.debtJoint > 0:
+            self.holder.withdraw(BASIS_PRECISION)
+        return self.balanceOfWant()
+
+    # external entry points
+
+    @transaction
+    def withdraw(self, amountNeeded):
+        """BaseStrategy.withdraw, the freed amount goes to the vault. Returns (amountFreed, loss)."""
+        amountFreed, loss = self.liquidatePosition(amountNeeded)
+        self.wantBalance = sub(self.wantBalance, amountFreed)
+        return (amountFreed, loss)
+
+    @transaction
+    def harvest(self):
+        """BaseStrategy.harvest outside of emergency exit."""
+        self.vault.timestamp = self.holder.timestamp
+        debtOutstanding = self.vault.debtOutstanding()
+        profit, loss, debtPayment = self.prepareReturn(debtOutstanding)
+        debtOutstanding = self.vault.report(profit, loss, debtPayment)
+        self.adjustPosition(debtOutstanding)
+        return (profit, loss)
@@ -0,0 +1,254 @@
+"""Reward sale schedule of the joint: canHarvestJoint, minRewardSaleTime and _sellRewardTokens.
+
+Providers call harvestFromProvider on their own cadence, but the joint only sells when
+canHarvestJoint allows it (minRewardSaleTime since lastRewardSale). Each sale splits the
+farmed amount 50/50 (getDebtProportion) and makes two router swaps, one per token, along
+getTokenOutPath: reward -> WETH -> token, or reward -> WETH when the token is WETH. The
+second swap sees the price impact of the first. WETH is router.WETH(), the chain's wrapped
+native token, so gas is charged in the same unit proceeds are valued in.
+
+Between sales arbitrage is assumed to bring the reward pool back to its reference price.
+All amounts are wei of WETH / reward / token, maths is the integer router maths of
+jointsim.pair.
+
+    python -m jointsim.rewards LQDRMasterChef --dailyRewards 50 --gasPrice 300
+"""
+
+import argparse
+
+from jointsim.gas import TX_GAS, gasCost, gasUsed
+from jointsim.pair import UniV2Pair
+from jointsim.safemath import div, mul, sub
+
+BASIS_PRECISION = 10000
+HOUR = 3600
+DAY = 86400
+
+# Ballpark liquidity of each farm's reward / WETH pool, in whole tokens. Override them with
+# live reserves before relying on the result. Sale gas comes from jointsim.gas.
+FARMS = {
+    "LQDRMasterChef": {
+        "reward": "LQDR",
+        "weth": "WFTM",
+        # LQDR / WFTM on Spooky
+        "rewardPool": (150_000, 600_000),
+        "swapFee": 20,
+        # defaults for the CLI: rewards per day in whole WETH, gas price in gwei
+        "dailyRewards": 50,
+        "gasPrice": 300,
+    },
+    "SpookyMasterChef": {
+        "reward": "BOO",
+        "weth": "WFTM",
+        # BOO / WFTM on Spooky
+        "rewardPool": (400_000, 2_500_000),
+        "swapFee": 20,
+        "dailyRewards": 50,
+        "gasPrice": 300,
+    },
+    "VelodromeGauge": {
+        "reward": "VELO",
+        "weth": "WETH",
+        # VELO / WETH volatile pool on Velodrome
+        "rewardPool": (20_000_000, 1_200),
+        "swapFee": 2,
+        "dailyRewards": 0.05,
+        "gasPrice": 0.01,
+    },
+}
+
+DEFAULT_INTERVALS = (
+    HOUR,
+    4 * HOUR,
+    12 * HOUR,
+    DAY,
+    2 * DAY,
+    4 * DAY,
+    7 * DAY,
+    14 * DAY,
+)
+
+
+def rewardPool(farmName, rewardLiquidity=None):
+    """UniV2Pair with the reward token as index 0 and WETH as index 1."""
+    farm = FARMS[farmName]
+    reserveReward, reserveWeth = rewardLiquidity or farm["rewardPool"]
+    reserveReward, reserveWeth = int(reserveReward * 10 ** 18), int(
+        reserveWeth * 10 ** 18
+    )
+    return UniV2Pair(reserveReward, reserveWeth, 0, farm["swapFee"])
+
+
+def sellRewardTokens(farmAmount, rewardPool, tokenPools=(None, None)):
+    """_sellRewardTokens on copies of the pools. Returns (proceeds, value).
+
+    tokenPools[i] is None when tokens[i] is WETH, otherwise a UniV2Pair with WETH as index 0
+    and tokens[i] as index 1 for the second hop. proceeds[i] is the amount of tokens[i]
+    sent to its provider, value[i] the same amount valued in WETH at the pre-sale spot price.
+    """
+    pool = rewardPool.copy()
+    balance = farmAmount
+    proceeds = [0, 0]
+    value = [0, 0]
+    for i in range(2):
+        saleAmount = min(
+            div(mul(farmAmount, BASIS_PRECISION // 2), BASIS_PRECISION), balance
+        )
+        balance = sub(balance, saleAmount)
+        if saleAmount == 0:
+            continue
+        amountOut = pool.swap(saleAmount, 0)
+        hop = tokenPools[i]
+        if hop is None:
+            proceeds[i] = value[i] = amountOut
+        else:
+            spot = hop.copy()
+            proceeds[i] = spot.swap(amountOut, 0)
+            value[i] = div(mul(proceeds[i], hop.reserve0), hop.reserve1)
+    return proceeds, value
+
+
+def saleTimes(harvestTimes, minRewardSaleTime=HOUR, lastRewardSale=0):
+    """Which provider harvests actually sell: canHarvestJoint gates on minRewardSaleTime."""
+    sales = []
+    for timestamp in sorted(harvestTimes):
+        if timestamp - lastRewardSale >= minRewardSaleTime:
+            sales.append(timestamp)
+            lastRewardSale = timestamp
+    return sales
+
+
+def simulateSchedule(
+    farmName,
+    interval,
+    dailyRewards,
+    gasPrice,
+    days=30,
+    minRewardSaleTime=HOUR,
+    providerOffset=None,
+    rewardLiquidity=None,
+    tokenPools=(None, None),
+):
+    """Both providers harvest every `interval` seconds, the second `providerOffset` later
+    (default half an interval). Rewards accrue at dailyRewards whole WETH of value per day.
+
+    Returns per sale figures and totals, all in WETH wei: sales, harvests, spotValue (value
+    of the rewards sold at the reference price), proceeds, gas, net, netPerDay, impactBps.
+    Rewards still unsold at the end are left out, netPerDay is over the time up to the last
+    sale.
+    """
+    pool = rewardPool(farmName, rewardLiquidity)
+    # harvestRewards gas, minus the transaction cost the provider harvest pays anyway
+    hops = 3 if any(pool is not None for pool in tokenPools) else 2
+    harvestGas = gasUsed("harvestRewards", farmName, hops) - TX_GAS
+    if providerOffset is None:
+        providerOffset = interval // 2
+    end = days * DAY
+    harvests = [t for t in range(interval, end + 1, interval)]
+    harvests += [t + providerOffset for t in harvests if t + providerOffset <= end]
+    sales = saleTimes(harvests, minRewardSaleTime)
+
+    # reward tokens per day worth dailyRewards WETH per day at the pool price
+    rewardsPerDay = int(dailyRewards * 10 ** 18) * pool.reserve0 // pool.reserve1
+    saleCost = gasCost(harvestGas, gasPrice)
+
+    spotValue = proceedsValue = 0
+    last = 0
+    for timestamp in sales:
+        farmAmount = rewardsPerDay * (timestamp - last) // DAY
+        last = timestamp
+        if farmAmount == 0:
+            continue
+        _, value = sellRewardTokens(farmAmount, pool, tokenPools)
+        spotValue += div(mul(farmAmount, pool.reserve1), pool.reserve0)
+        proceedsValue += sum(value)
+
+    # provider harvests that don't sell still pay for the harvest itself, that cost is the
+    # same for every schedule so only the sales are charged
+    gas = saleCost * len(sales)
+    net = proceedsValue - gas
+    return {
+        "interval": interval,
+        "sales": len(sales),
+        "harvests": len(harvests),
+        "spotValue": spotValue,
+        "proceeds": proceedsValue,
+        "gas": gas,
+        "net": net,
+        "netPerDay": net * DAY / last if last else 0,
+        "impactBps": (spotValue - proceedsValue) * BASIS_PRECISION / spotValue
+        if spotValue
+        else 0,
+    }
+
+
+def optimalInterval(
+    farmName, dailyRewards, gasPrice, intervals=DEFAULT_INTERVALS, **kwargs
+):
+    """Runs simulateSchedule for every interval, returns (best, table), best by netPerDay."""
+    table = [
+        simulateSchedule(farmName, interval, dailyRewards, gasPrice, **kwargs)
+        for interval in intervals
+    ]
+    return max(table, key=lambda row: row["netPerDay"]), table
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("farm", choices=sorted(FARMS))
+    parser.add_argument(
+        "--dailyRewards",
+        type=float,
+        default=None,
+        help="rewards per day, in whole WETH",
+    )
+    parser.add_argument("--gasPrice", type=float, default=None, help="gwei")
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--minRewardSaleTime", type=int, default=HOUR)
+    parser.add_argument(
+        "--rewardLiquidity",
+        type=float,
+        nargs=2,
+        default=None,
+        help="reward and WETH reserves",
+    )
+    parser.add_argument(
+        "--intervals",
+        type=int,
+        nargs="+",
+        default=list(DEFAULT_INTERVALS),
+        help="seconds",
+    )
+    args = parser.parse_args()
+
+    farm = FARMS[args.farm]
+    best, table = optimalInterval(
+        args.farm,
+        farm["dailyRewards"] if args.dailyRewards is None else args.dailyRewards,
+        farm["gasPrice"] if args.gasPrice is None else args.gasPrice,
+        args.intervals,
+        days=args.days,
+        minRewardSaleTime=args.minRewardSaleTime,
+        rewardLiquidity=args.rewardLiquidity,
+    )
+    weth = farm["weth"]
+    print(
+        "{0:>10} {1:>6} {2:>10} {3:>14} {4:>14}".format(
+            "interval", "sales", "impactBps", "gas " + weth, "net/day " + weth
+        )
+    )
+    for row in table:
+        print(
+            "{0:>9.1f}h {1:>6} {2:>10.2f} {3:>14.4f} {4:>14.4f}".format(
+                row["interval"] / HOUR,
+                row["sales"],
+                row["impactBps"],
+                row["gas"] / 1e18,
+                row["netPerDay"] / 1e18,
+            )
+        )
+    print("optimal interval: {0:.1f}h".format(best["interval"] / HOUR))
+
+
+if __name__ == "__main__":
+    main()
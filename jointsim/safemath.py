@@ -0,0 +1,76 @@
+"""uint256 arithmetic with the same revert rules as OpenZeppelin SafeMath 3.1."""
+
+MAX_UINT256 = 2 ** 256 - 1
+MAX_UINT112 = 2 ** 112 - 1
+
+
+class Revert(Exception):
+    """Raised wherever the contract would revert."""
+
+
+def add(a, b):
+    c = a + b
+    if c > MAX_UINT256:
+        raise Revert("SafeMath: addition overflow")
+    return c
+
+
+def sub(a, b):
+    if b > a:
+        raise Revert("SafeMath: subtraction overflow")
+    return a - b
+
+
+def mul(a, b):
+    c = a * b
+    if c > MAX_UINT256:
+        raise Revert("SafeMath: multiplication overflow")
+    return c
+
+
+def div(a, b):
+    if b == 0:
+        raise Revert("SafeMath: division by zero")
+    return a // b
+
+
+def require(condition, message=""):
+    if not condition:
+        raise Revert(message)
+
+
+class Model:
+    """Base for contract models. _refs names attributes that point at other models."""
+
+    _refs = ()
+
+    def _state(self):
+        return {
+            key: list(value) if isinstance(value, list) else value
+            for key, value in self.__dict__.items()
+            if key not in self._refs
+        }
+
+    def _setState(self, state):
+        self.__dict__.update(state)
+
+    def _models(self):
+        return [self]
+
+
+def transaction(fn):
+    """Rolls back every model reachable through _models() when the call reverts."""
+
+    def wrapper(self, *args, **kwargs):
+        models = self._models()
+        snapshot = [model._state() for model in models]
+        try:
+            return fn(self, *args, **kwargs)
+        except Exception:
+            for model, state in zip(models, snapshot):
+                model._setState(state)
+            raise
+
+    wrapper.__name__ = fn.__name__
+    wrapper.__doc__ = fn.__doc__
+    return wrapper
@@ -0,0 +1,267 @@
+"""Sandwich stress of the joint's withdraw / rebalanceDebt against _testPriceSource.
+
+An attacker swaps into the pair, the holder action runs on the moved reserves, then the
+attacker swaps back. With doPriceCheck on the action reverts once calcPriceDiff leaves
+(10000 - priceSourceDiff, 10000 + priceSourceDiff); with it off (setPriceSource(False, ...)
+as the tests do) the action goes through and the holder leaks value to the attacker.
+
+Everything is NumPy broadcast over attack sizes x position shares (the holder's LP as a
+share of the pair's supply, i.e. pool depth relative to the position). The holder flow is
+the float version of jointsim.holder: rebalance by half the debt ratio gap scaled by
+rebalancePercent / debtProportion, swap the whole removed short side, then withdraw.
+Values are in token1 at the oracle price, which is the pair price before the attack.
+
+    python -m jointsim.sandwich USDCFTMSpookyLQDR FRAXFTMSpiritLQDR --action withdraw
+"""
+
+import argparse
+
+import numpy as np
+
+from jointsim.holder import BASIS_PRECISION
+from jointsim.pairs import PAIRS
+
+DEFAULT_ATTACKS = np.concatenate(
+    [-np.geomspace(0.5, 0.001, 28), np.geomspace(0.001, 0.5, 28)]
+)
+DEFAULT_SHARES = np.geomspace(0.0001, 0.2, 12)
+
+
+def _swap(reserveIn, reserveOut, amountIn, swapFee):
+    amountInWithFee = amountIn * (BASIS_PRECISION - swapFee) / BASIS_PRECISION
+    amountOut = amountInWithFee * reserveOut / (reserveIn + amountInWithFee)
+    return reserveIn + amountIn, reserveOut - amountOut, amountOut
+
+
+def _attack(reserve0, reserve1, attack, swapFee):
+    """attack > 0 sells attack * reserve0 of token0 into the pair, < 0 sells token1.
+    Returns the new reserves and what the attacker holds (amount of the other token)."""
+    in0 = attack > 0
+    amount = np.abs(attack) * np.where(in0, reserve0, reserve1)
+    a0, a1, out1 = _swap(reserve0, reserve1, amount, swapFee)
+    b1, b0, out0 = _swap(reserve1, reserve0, amount, swapFee)
+    return (
+        np.where(in0, a0, b0),
+        np.where(in0, a1, b1),
+        amount,
+        np.where(in0, out1, out0),
+    )
+
+
+def _holderAction(
+    reserve0,
+    reserve1,
+    totalSupply,
+    lp,
+    debt0,
+    debt1,
+    rebalancePercent,
+    withdrawPercent,
+    bpsRebalanceDiff,
+    swapFee,
+):
+    """_rebalanceDebtInternal(rebalancePercent) then _withdrawLp(withdrawPercent)."""
+    ratio0 = debt0 * BASIS_PRECISION / (lp * reserve0 / totalSupply)
+    ratio1 = debt1 * BASIS_PRECISION / (lp * reserve1 / totalSupply)
+    short0 = ratio0 > ratio1 + bpsRebalanceDiff
+    short1 = ratio1 > ratio0 + bpsRebalanceDiff
+    removePercent = (
+        np.where(short0 | short1, np.abs(ratio0 - ratio1) / 2, 0)
+        * rebalancePercent
+        / BASIS_PRECISION
+    )
+
+    lpOut = lp * removePercent / BASIS_PRECISION
+    x0 = lpOut * reserve0 / totalSupply
+    x1 = lpOut * reserve1 / totalSupply
+    reserve0, reserve1, totalSupply, lp = (
+        reserve0 - x0,
+        reserve1 - x1,
+        totalSupply - lpOut,
+        lp - lpOut,
+    )
+
+    # short0: the token1 removed is sold for token0, short1 the other way round
+    s1, s0, got0 = _swap(reserve1, reserve0, x1, swapFee)
+    t0, t1, got1 = _swap(reserve0, reserve1, x0, swapFee)
+    balance0 = np.where(short0, x0 + got0, np.where(short1, 0, x0))
+    balance1 = np.where(short0, 0, np.where(short1, x1 + got1, x1))
+    reserve0 = np.where(short0, s0, np.where(short1, t0, reserve0))
+    reserve1 = np.where(short0, s1, np.where(short1, t1, reserve1))
+
+    lpOut = lp * withdrawPercent / BASIS_PRECISION
+    balance0 = balance0 + lpOut * reserve0 / totalSupply
+    balance1 = balance1 + lpOut * reserve1 / totalSupply
+    reserve0 = reserve0 - lpOut * reserve0 / totalSupply
+    reserve1 = reserve1 - lpOut * reserve1 / totalSupply
+    return (
+        balance0,
+        balance1,
+        reserve0,
+        reserve1,
+        totalSupply - lpOut,
+        lp - lpOut,
+        np.maximum(ratio0, ratio1),
+    )
+
+
+def stress(
+    attackSizes=DEFAULT_ATTACKS,
+    positionShares=DEFAULT_SHARES,
+    action="withdraw",
+    priceSourceDiff=250,
+    doPriceCheck=True,
+    debtProportion=5000,
+    jointParams=(9900, 50, 10000, 10250),
+    swapFee=30,
+    entryMove=0.0,
+):
+    """Returns arrays of shape (len(attackSizes), len(positionShares)):
+
+    priceDiff     calcPriceDiff seen by the action, in bps
+    blocked       _testPriceSource (when doPriceCheck) or the debtUpper require reverted
+    leakBps       holder value lost to the attack, bps of the position value (0 if blocked)
+    attackerBps   attacker profit after both swaps, bps of the position value (0 if blocked)
+
+    The position entered at a price entryMove away from the current one, so debt ratios
+    start off balanced when entryMove is 0. action is 'withdraw' (withdraw(debtProportion))
+    or 'rebalanceDebt'.
+    """
+    _, bpsRebalanceDiff, rebalancePercent, debtUpper = jointParams
+    attack = np.asarray(attackSizes, dtype=np.float64)[:, None]
+    share = np.asarray(positionShares, dtype=np.float64)[None, :]
+
+    # unit pool at price 1, the position holds `share` of the LP
+    reserve0 = reserve1 = totalSupply = np.ones_like(attack * share)
+    lp = share * totalSupply
+    price = reserve1 / reserve0
+    entryPrice = price / (1 + entryMove)
+    # debts of an entry at entryPrice with the same LP value (constant product)
+    debt0 = lp / totalSupply * reserve0 * np.sqrt(price / entryPrice)
+    debt1 = lp / totalSupply * reserve1 * np.sqrt(entryPrice / price)
+    positionValue = debt0 * price + debt1
+
+    if action == "withdraw":
+        actionPercents = (max(debtProportion, 50), max(debtProportion, 50))
+    else:
+        actionPercents = (rebalancePercent, 0)
+
+    def run(attacked):
+        r0, r1, spent, got = _attack(
+            reserve0, reserve1, attack if attacked else 0 * attack, swapFee
+        )
+        priceDiff = (r1 / r0) / price * BASIS_PRECISION
+        b0, b1, r0, r1, supply, left, maxRatio = _holderAction(
+            r0,
+            r1,
+            totalSupply,
+            lp,
+            debt0,
+            debt1,
+            *actionPercents,
+            bpsRebalanceDiff,
+            swapFee
+        )
+        # attacker swaps what it got back into the token it sold
+        in0 = attack > 0
+        back0 = _swap(r1, r0, got, swapFee)
+        back1 = _swap(r0, r1, got, swapFee)
+        r0 = np.where(in0, back0[1], back1[0])
+        r1 = np.where(in0, back0[0], back1[1])
+        returned = np.where(in0, back0[2], back1[2]) if attacked else 0 * attack
+        attackerValue = (
+            np.where(in0, (returned - spent) * price, returned - spent)
+            if attacked
+            else 0 * attack
+        )
+        holderValue = (b0 + left * r0 / supply) * price + b1 + left * r1 / supply
+        return priceDiff, holderValue, attackerValue, maxRatio
+
+    priceDiff, holderValue, attackerValue, maxRatio = run(True)
+    _, cleanValue, _, _ = run(False)
+
+    blocked = np.zeros(priceDiff.shape, dtype=bool)
+    if doPriceCheck:
+        blocked |= ~(
+            (priceDiff > BASIS_PRECISION - priceSourceDiff)
+            & (priceDiff < BASIS_PRECISION + priceSourceDiff)
+        )
+    if action == "rebalanceDebt":
+        blocked |= maxRatio <= debtUpper
+    return {
+        "priceDiff": priceDiff,
+        "blocked": blocked,
+        "leakBps": np.where(
+            blocked, 0, (cleanValue - holderValue) / positionValue * BASIS_PRECISION
+        ),
+        "attackerBps": np.where(
+            blocked, 0, attackerValue / positionValue * BASIS_PRECISION
+        ),
+    }
+
+
+def recommendPriceSourceDiff(
+    attackSizes=DEFAULT_ATTACKS, positionShares=DEFAULT_SHARES, step=25, **kwargs
+):
+    """Widest priceSourceDiff (a multiple of step) that still blocks every attack that is
+    profitable with the price check off. Returns (priceSourceDiff, stress result unchecked).
+
+    0 means some attack pays without moving the price at all, typically a rebalanceDebt whose
+    own swap is large enough to sandwich; no priceSourceDiff protects that."""
+    result = stress(attackSizes, positionShares, doPriceCheck=False, **kwargs)
+    profitable = (result["attackerBps"] > 0) & ~result["blocked"]
+    if not profitable.any():
+        return None, result
+    # blocked when |priceDiff - 10000| >= priceSourceDiff
+    tightest = np.abs(result["priceDiff"][profitable] - BASIS_PRECISION).min()
+    return int(tightest // step * step), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "pairs", nargs="*", help="pairs from jointsim.pairs, all of them by default"
+    )
+    parser.add_argument(
+        "--action", choices=("withdraw", "rebalanceDebt"), default="withdraw"
+    )
+    parser.add_argument("--debtProportion", type=int, default=5000)
+    parser.add_argument("--entryMove", type=float, default=0.0)
+    parser.add_argument("--priceSourceDiff", type=int, default=250)
+    args = parser.parse_args()
+    for pairName in args.pairs:
+        if pairName not in PAIRS:
+            parser.error("unknown pair {0}".format(pairName))
+
+    print(
+        "position share of pool {0:.2%} - {1:.2%}, attacks up to {2:.0%} of a reserve".format(
+            DEFAULT_SHARES[0], DEFAULT_SHARES[-1], DEFAULT_ATTACKS.max()
+        )
+    )
+    print(
+        "{0:>20} {1:>8} {2:>14} {3:>14} {4:>12}".format(
+            "pair", "blocked", "worst leak on", "worst leak off", "recommended"
+        )
+    )
+    for pairName in args.pairs or sorted(PAIRS):
+        kwargs = dict(
+            action=args.action,
+            swapFee=PAIRS[pairName]["swapFee"],
+            debtProportion=args.debtProportion,
+            entryMove=args.entryMove,
+        )
+        checked = stress(priceSourceDiff=args.priceSourceDiff, **kwargs)
+        recommended, unchecked = recommendPriceSourceDiff(**kwargs)
+        print(
+            "{0:>20} {1:>8.1%} {2:>10.1f} bps {3:>10.1f} bps {4:>12}".format(
+                pairName,
+                checked["blocked"].mean(),
+                checked["leakBps"].max(),
+                unchecked["leakBps"].max(),
+                "any" if recommended is None else recommended,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Solidly pair + router maths (Velodrome v1 BaseV1Pair / Router).
+
+Volatile pairs price on x * y = k, stable pairs on x^3 * y + y^3 * x = k with reserves
+scaled to 18 decimals. The swap fee is taken from amountIn before pricing and moved out of
+the pair to its fee contract, so unlike UniswapV2 it doesn't accrue to LPs through the
+reserves. Maths follows the 0.8 contracts, where every operation is checked.
+"""
+
+from collections import namedtuple
+
+from jointsim.pair import UniV2Pair
+from jointsim.safemath import add, div, mul, require, sub
+
+Route = namedtuple("Route", ["from_", "to", "stable"])
+
+
+class SolidlyPair(UniV2Pair):
+    """Reserves and LP supply of a BaseV1Pair.
+
+    swapFee is in bps of amountIn (PairFactory.getFee, 2 = 0.02%). decimals are the token
+    decimals in pair order, only the stable curve uses them. Liquidity is added and removed
+    exactly like UniswapV2 (Router.quoteLiquidity, pro rata mint / burn).
+    """
+
+    def __init__(
+        self,
+        reserve0,
+        reserve1,
+        totalSupply,
+        stable=False,
+        swapFee=2,
+        decimals=(18, 18),
+    ):
+        super().__init__(reserve0, reserve1, totalSupply, swapFee)
+        self.stable = stable
+        self.decimals = tuple(decimals)
+
+    def copy(self):
+        return SolidlyPair(
+            self.reserve0,
+            self.reserve1,
+            self.totalSupply,
+            self.stable,
+            self.swapFee,
+            self.decimals,
+        )
+
+    def _scale(self, index):
+        return 10 ** self.decimals[index]
+
+    def spotPrice(self):
+        """Marginal price of token0 in token1, raw units: -dy/dx of the stable curve, the
+        reserve ratio for volatile pairs."""
+        if not self.stable:
+            return super().spotPrice()
+        x = self.reserve0 / self._scale(0)
+        y = self.reserve1 / self._scale(1)
+        slope = (3 * x * x * y + y ** 3) / (x ** 3 + 3 * x * y * y)
+        return slope * self._scale(1) / self._scale(0)
+
+    def _k(self, x, y):
+        if self.stable:
+            x = div(mul(x, 10 ** 18), self._scale(0))
+            y = div(mul(y, 10 ** 18), self._scale(1))
+            a = div(mul(x, y), 10 ** 18)
+            b = add(div(mul(x, x), 10 ** 18), div(mul(y, y), 10 ** 18))
+            return div(mul(a, b), 10 ** 18)
+        return mul(x, y)
+
+    def _getAmountOut(self, amountIn, indexIn):
+        reserve0, reserve1 = self.reserve0, self.reserve1
+        if self.stable:
+            xy = self._k(reserve0, reserve1)
+            reserve0 = div(mul(reserve0, 10 ** 18), self._scale(0))
+            reserve1 = div(mul(reserve1, 10 ** 18), self._scale(1))
+            reserveA, reserveB = (
+                (reserve0, reserve1) if indexIn == 0 else (reserve1, reserve0)
+            )
+            amountIn = div(mul(amountIn, 10 ** 18), self._scale(indexIn))
+            y = sub(reserveB, _get_y(add(amountIn, reserveA), xy, reserveB))
+            return div(mul(y, self._scale(1 - indexIn)), 10 ** 18)
+        reserveA, reserveB = (
+            (reserve0, reserve1) if indexIn == 0 else (reserve1, reserve0)
+        )
+        return div(mul(amountIn, reserveB), add(reserveA, amountIn))
+
+    def getAmountOut(self, amountIn, indexIn):
+        """BaseV1Pair.getAmountOut, amountIn net of the fee."""
+        amountIn = sub(amountIn, div(mul(amountIn, self.swapFee), 10000))
+        return self._getAmountOut(amountIn, indexIn)
+
+    def swap(self, amountIn, indexIn):
+        """Router swapExactTokensForTokens over this single pair, returns amountOut."""
+        amountOut = self.getAmountOut(amountIn, indexIn)
+        require(amountOut > 0, "BaseV1Router: INSUFFICIENT_OUTPUT_AMOUNT")
+        # fees are sent to the pair's fee contract before the reserves sync
+        amountIn = sub(amountIn, div(mul(amountIn, self.swapFee), 10000))
+        if indexIn == 0:
+            self._update(add(self.reserve0, amountIn), sub(self.reserve1, amountOut))
+        else:
+            self._update(sub(self.reserve0, amountOut), add(self.reserve1, amountIn))
+        return amountOut
+
+
+def _f(x0, y):
+    return add(
+        div(mul(x0, div(mul(div(mul(y, y), 10 ** 18), y), 10 ** 18)), 10 ** 18),
+        div(mul(div(mul(div(mul(x0, x0), 10 ** 18), x0), 10 ** 18), y), 10 ** 18),
+    )
+
+
+def _d(x0, y):
+    return add(
+        div(mul(mul(3, x0), div(mul(y, y), 10 ** 18)), 10 ** 18),
+        div(mul(div(mul(x0, x0), 10 ** 18), x0), 10 ** 18),
+    )
+
+
+def _get_y(x0, xy, y):
+    """Newton's method for y on the stable curve, as BaseV1Pair._get_y."""
+    for _ in range(255):
+        yPrev = y
+        k = _f(x0, y)
+        if k < xy:
+            dy = div(mul(sub(xy, k), 10 ** 18), _d(x0, y))
+            y = add(y, dy)
+        else:
+            dy = div(mul(sub(k, xy), 10 ** 18), _d(x0, y))
+            y = sub(y, dy)
+        if y > yPrev:
+            if y - yPrev <= 1:
+                return y
+        elif yPrev - y <= 1:
+            return y
+    return y
+
+
+def getTokenOutPath(tokenIn, tokenOut, weth):
+    """lpHolderVelo.getTokenOutPath before the route conversion: direct when either side
+    is WETH, through WETH otherwise."""
+    if tokenIn == weth or tokenOut == weth:
+        return [tokenIn, tokenOut]
+    return [tokenIn, weth, tokenOut]
+
+
+def convertPathRoutes(path):
+    """lpHolderVelo.convertPathRoutes, every hop goes through the volatile pair."""
+    routes = [Route(path[0], path[1], False)]
+    if len(path) == 3:
+        routes.append(Route(path[1], path[2], False))
+    return routes
@@ -0,0 +1,96 @@
+"""Batched NumPy evaluation of the holder's debt ratio and P&L views.
+
+Same formulas as jointsim.holder, broadcast over arrays of states. The maths is done in
+float64 with the contract's truncating divisions kept (floor after every div). A debt ratio
+that sits on a truncation boundary can land 1 bps away from the integer model, which moves
+the notional rebalance in the P&L by about 1 bps of the balance; everything else agrees to
+float rounding.
+"""
+
+import numpy as np
+
+from jointsim.holder import BASIS_PRECISION
+
+
+def _div(a, b):
+    # nudge up by a few ulps so quotients that are exact integers in uint256 maths
+    # don't get floored one below after float rounding
+    return np.floor(a / b * (1 + 1e-12))
+
+
+def sweep(reserve0, reserve1, lpBalance, debtJoint0, debtJoint1, totalSupply):
+    """calcDebtRatioToken and calculateProfit for both tokens over arrays of states.
+
+    All arguments broadcast against each other. Returns a dict of float64 arrays keyed
+    debtRatio0, debtRatio1, loss0, profit0, loss1, profit1.
+    """
+    reserve0 = np.asarray(reserve0, dtype=np.float64)
+    reserve1 = np.asarray(reserve1, dtype=np.float64)
+    lpBalance = np.asarray(lpBalance, dtype=np.float64)
+    debtJoint0 = np.asarray(debtJoint0, dtype=np.float64)
+    debtJoint1 = np.asarray(debtJoint1, dtype=np.float64)
+    totalSupply = np.asarray(totalSupply, dtype=np.float64)
+
+    # balanceToken
+    balance0 = _div(lpBalance * reserve0, totalSupply)
+    balance1 = _div(lpBalance * reserve1, totalSupply)
+
+    # calcDebtRatioToken
+    debtRatio0 = _div(debtJoint0 * BASIS_PRECISION, balance0)
+    debtRatio1 = _div(debtJoint1 * BASIS_PRECISION, balance1)
+
+    # balanceTokenWithRebalance, both branches evaluated then selected
+    swapPct = _div(np.abs(debtRatio0 - debtRatio1), 2)
+    short0 = debtRatio0 > debtRatio1
+
+    swapAmount1 = _div(balance1 * swapPct, BASIS_PRECISION)
+    swapAmount0 = _div(balance0 * swapPct, BASIS_PRECISION)
+    rebalanced0 = np.where(
+        short0,
+        balance0 + _div(swapAmount1 * reserve0, reserve1),
+        balance0 - swapAmount0,
+    )
+    rebalanced1 = np.where(
+        short0,
+        balance1 - swapAmount1,
+        balance1 + _div(swapAmount0 * reserve1, reserve0),
+    )
+
+    # calculateProfit
+    return {
+        "debtRatio0": debtRatio0,
+        "debtRatio1": debtRatio1,
+        "loss0": np.maximum(debtJoint0 - rebalanced0, 0),
+        "profit0": np.maximum(rebalanced0 - debtJoint0, 0),
+        "loss1": np.maximum(debtJoint1 - rebalanced1, 0),
+        "profit1": np.maximum(rebalanced1 - debtJoint1, 0),
+    }
+
+
+def priceMoveSurface(holder, priceMoves):
+    """Evaluates sweep() after moving the pair price of token0 by each factor in priceMoves.
+
+    Reserves move along the pair's constant product curve (arbitrage, no fees), debts and
+    LP held are taken from the holder. Also returns priceDiff, the calcPriceDiff ratio in
+    bps against the holder's current oracle prices, to size priceSourceDiff.
+    """
+    priceMoves = np.asarray(priceMoves, dtype=np.float64)
+    root = np.sqrt(priceMoves)
+    reserve0 = holder.getLpReserves(0) / root
+    reserve1 = holder.getLpReserves(1) * root
+
+    result = sweep(
+        reserve0,
+        reserve1,
+        holder.lpBalance(),
+        holder.debtOutstanding(0),
+        holder.debtOutstanding(1),
+        holder.pair.totalSupply,
+    )
+    amountIn = float(holder.token0TotalSupply)
+    lpPrice = _div(amountIn * reserve1, reserve0)
+    oraclePrice = _div(
+        float(holder.oraclePrices[0]) * amountIn, float(holder.oraclePrices[1])
+    )
+    result["priceDiff"] = _div(lpPrice * BASIS_PRECISION, oraclePrice)
+    return result
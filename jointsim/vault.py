@@ -0,0 +1,172 @@
+"""Single strategy model of the yearn Vault 0.4.3 accounting the providers report to.
+
+Covers deposits, withdrawals through the strategy, debtOutstanding / creditAvailable,
+report() with _reportLoss and _assessFees. Locked profit degradation and the withdrawal queue are not modelled.
+"""
+
+from jointsim.safemath import Model, add, div, mul, require, sub, transaction
+
+MAX_BPS = 10000
+SECS_PER_YEAR = 31_556_952
+
+
+class Vault(Model):
+    _refs = ("strategy",)
+
+    def __init__(self, performanceFee=1000, managementFee=200):
+        self.strategy = None
+        self.timestamp = 0
+        self.totalIdle = 0
+        self.totalSupply = 0
+        self.performanceFee = performanceFee
+        self.managementFee = managementFee
+
+        # StrategyParams of the one strategy
+        self.debtRatio = 0
+        self.totalDebt = 0
+        self.totalGain = 0
+        self.totalLoss = 0
+        self.strategyPerformanceFee = 0
+        self.activation = 0
+        self.lastReport = 0
+
+    def _models(self):
+        if self.strategy is None:
+            return [self]
+        return self.strategy._models()
+
+    def addStrategy(self, strategy, debtRatio, performanceFee):
+        require(self.strategy is None)
+        self.strategy = strategy
+        self.debtRatio = debtRatio
+        self.strategyPerformanceFee = performanceFee
+        self.activation = self.timestamp
+        self.lastReport = self.timestamp
+
+    def updateStrategyDebtRatio(self, debtRatio):
+        self.debtRatio = debtRatio
+
+    def totalAssets(self):
+        return add(self.totalIdle, self.totalDebt)
+
+    def _sharesForAmount(self, amount):
+        totalAssets = self.totalAssets()
+        if self.totalSupply == 0 or totalAssets == 0:
+            return amount
+        return div(mul(amount, self.totalSupply), totalAssets)
+
+    def deposit(self, amount):
+        shares = self._sharesForAmount(amount)
+        self.totalSupply = add(self.totalSupply, shares)
+        self.totalIdle = add(self.totalIdle, amount)
+        return shares
+
+    @transaction
+    def withdraw(self, shares, maxLoss=1):
+        """Vault._withdraw with the one strategy as the withdrawal queue. Returns (value, loss)."""
+        value = self.shareValue(shares)
+        vaultBalance = self.totalIdle
+        if value > vaultBalance:
+            totalLoss = 0
+            amountNeeded = min(sub(value, vaultBalance), self.totalDebt)
+            if amountNeeded > 0:
+                withdrawn, loss = self.strategy.withdraw(amountNeeded)
+                vaultBalance = add(vaultBalance, withdrawn)
+                if loss > 0:
+                    value = sub(value, loss)
+                    totalLoss = add(totalLoss, loss)
+                    self._reportLoss(loss)
+                self.totalDebt = sub(self.totalDebt, withdrawn)
+
+            self.totalIdle = vaultBalance
+            if value > vaultBalance:
+                value = vaultBalance
+                shares = self._sharesForAmount(add(value, totalLoss))
+            require(totalLoss <= div(mul(maxLoss, add(value, totalLoss)), MAX_BPS))
+        else:
+            totalLoss = 0
+
+        self.totalSupply = sub(self.totalSupply, shares)
+        self.totalIdle = sub(self.totalIdle, value)
+        return (value, totalLoss)
+
+    def shareValue(self, shares):
+        if self.totalSupply == 0:
+            return shares
+        return div(mul(shares, self.totalAssets()), self.totalSupply)
+
+    def debtOutstanding(self):
+        if self.debtRatio == 0:
+            return self.totalDebt
+        debtLimit = div(mul(self.debtRatio, self.totalAssets()), MAX_BPS)
+        if self.totalDebt <= debtLimit:
+            return 0
+        return sub(self.totalDebt, debtLimit)
+
+    def creditAvailable(self):
+        debtLimit = div(mul(self.debtRatio, self.totalAssets()), MAX_BPS)
+        if debtLimit <= self.totalDebt:
+            return 0
+        return min(sub(debtLimit, self.totalDebt), self.totalIdle)
+
+    def _reportLoss(self, loss):
+        require(self.totalDebt >= loss)
+        if self.debtRatio != 0:
+            ratioChange = min(
+                div(mul(loss, self.debtRatio), self.totalDebt), self.debtRatio
+            )
+            self.debtRatio = sub(self.debtRatio, ratioChange)
+        self.totalLoss = add(self.totalLoss, loss)
+        self.totalDebt = sub(self.totalDebt, loss)
+
+    def _assessFees(self, gain):
+        if self.activation == self.timestamp or gain == 0:
+            return 0
+        duration = sub(self.timestamp, self.lastReport)
+        require(duration != 0)
+
+        managementFee = div(
+            div(mul(mul(self.totalDebt, duration), self.managementFee), MAX_BPS),
+            SECS_PER_YEAR,
+        )
+        strategistFee = div(mul(gain, self.strategyPerformanceFee), MAX_BPS)
+        performanceFee = div(mul(gain, self.performanceFee), MAX_BPS)
+        totalFee = min(managementFee + strategistFee + performanceFee, gain)
+        if totalFee > 0:
+            self.totalSupply = add(self.totalSupply, self._sharesForAmount(totalFee))
+        return totalFee
+
+    def report(self, gain, loss, debtPayment):
+        strategy = self.strategy
+        require(strategy.wantBalance >= add(gain, debtPayment))
+
+        if loss > 0:
+            self._reportLoss(loss)
+
+        totalFees = self._assessFees(gain)
+        self.totalGain = add(self.totalGain, gain)
+
+        credit = self.creditAvailable()
+        debt = self.debtOutstanding()
+        debtPayment = min(debtPayment, debt)
+
+        if debtPayment > 0:
+            self.totalDebt = sub(self.totalDebt, debtPayment)
+            debt = sub(debt, debtPayment)
+
+        if credit > 0:
+            self.totalDebt = add(self.totalDebt, credit)
+
+        totalAvail = add(gain, debtPayment)
+        if totalAvail < credit:
+            self.totalIdle = sub(self.totalIdle, sub(credit, totalAvail))
+            strategy.wantBalance = add(strategy.wantBalance, sub(credit, totalAvail))
+        elif totalAvail > credit:
+            self.totalIdle = add(self.totalIdle, sub(totalAvail, credit))
+            strategy.wantBalance = sub(strategy.wantBalance, sub(totalAvail, credit))
+
+        self.lastReport = self.timestamp
+
+        if self.debtRatio == 0:
+            return self.totalDebt
+        return debt
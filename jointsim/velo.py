@@ -0,0 +1,63 @@
+"""Offline model of contracts/lpHolderVelo.sol.
+
+jointLPHolderVelo is lpHolderUniV2.sol with a Solidly router and a Velodrome gauge in
+place of the MasterChef. The differences that change state are:
+  - liquidity is added / removed on the volatile pair (stable = false)
+  - swaps follow convertPathRoutes(getTokenOutPath(...)), every hop through a volatile pair
+  - _withdrawFromFarm calls farm.withdraw(_amount) for the whole amount, not the shortfall
+    over the LP already held, so any unpooled LP stays unpooled on top of it
+"""
+
+from jointsim.holder import JointLPHolderUniV2
+from jointsim.safemath import add, require, sub
+from jointsim.solidly import convertPathRoutes, getTokenOutPath
+
+
+class JointLPHolderVelo(JointLPHolderUniV2):
+    """State of a jointLPHolderVelo, see JointLPHolderUniV2 for the shared state.
+
+    tokens are names (or addresses) of the pair's tokens in pair order and weth is
+    router.weth(). routePairs maps (tokenA, tokenB, stable) to a SolidlyPair for hops that
+    don't go through the joint's own pair, which is always registered for its tokens.
+    """
+
+    _refs = JointLPHolderUniV2._refs + ("routePairs",)
+
+    def __init__(
+        self, pair, tokens=("WETH", "USDC"), weth="WETH", routePairs=None, **kwargs
+    ):
+        super().__init__(pair, **kwargs)
+        self.tokens = tuple(tokens)
+        self.weth = weth
+        self.routePairs = dict(routePairs or {})
+        self.routePairs[(self.tokens[0], self.tokens[1], pair.stable)] = pair
+
+    def _models(self):
+        models = super()._models()
+        return models + [
+            pair for pair in self.routePairs.values() if pair is not self.pair
+        ]
+
+    def _routePair(self, route):
+        """Pair and input index for a route, in either token order."""
+        for (token0, token1, stable), pair in self.routePairs.items():
+            if stable == route.stable and (token0, token1) == (route.from_, route.to):
+                return pair, 0
+            if stable == route.stable and (token1, token0) == (route.from_, route.to):
+                return pair, 1
+        require(False, "BaseV1Router: no pair for route {0}".format(route))
+
+    def _routerSwap(self, swapFrom, swapTo, amountIn):
+        routes = convertPathRoutes(
+            getTokenOutPath(self.tokens[swapFrom], self.tokens[swapTo], self.weth)
+        )
+        amount = amountIn
+        for route in routes:
+            pair, indexIn = self._routePair(route)
+            amount = pair.swap(amount, indexIn)
+        return amount
+
+    def _withdrawFromFarm(self, amount):
+        if amount > 0 and amount > self.lpUnpooled:
+            self.lpPooled = sub(self.lpPooled, amount)
+            self.lpUnpooled = add(self.lpUnpooled, amount)
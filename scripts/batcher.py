@@ -0,0 +1,46 @@
+"""Scripted test actions sent through ActionBatcher in one transaction.
+
+    batch = ActionBatch(batcher)
+    for token, vault, amount in zip(tokens, vaults, amounts):
+        batch.deposit(user, token, vault, amount)
+    for strategy in strategies:
+        batch.harvest(strategy)
+    batch.execute({'from': user})
+
+Deposits pull the tokens from the depositor, who must have approved the batcher, and mint
+the vault shares to them. Harvests and keeper calls need the batcher set as keeper.
+"""
+
+
+class ActionBatch:
+    def __init__(self, batcher):
+        self.batcher = batcher
+        self.targets = []
+        self.data = []
+
+    def call(self, contract, method, *args, signature=None):
+        """Queues contract.method(*args); signature picks an overload, e.g. 'uint256,address'."""
+        fn = getattr(contract, method)
+        if signature is not None:
+            fn = fn[signature]
+        self.targets.append(contract.address)
+        self.data.append(fn.encode_input(*args))
+        return self
+
+    def deposit(self, depositor, token, vault, amount):
+        self.call(token, 'transferFrom', depositor, self.batcher, amount)
+        self.call(token, 'approve', vault, amount)
+        return self.call(vault, 'deposit', amount, depositor, signature='uint256,address')
+
+    def withdraw(self, vault, shares, recipient):
+        """Withdraws shares the batcher holds."""
+        return self.call(vault, 'withdraw', shares, recipient, signature='uint256,address')
+
+    def harvest(self, strategy):
+        return self.call(strategy, 'harvest')
+
+    def execute(self, tx):
+        """Sends the queued calls as one transaction and clears the queue."""
+        receipt = self.batcher.execute(self.targets, self.data, tx)
+        self.targets, self.data = [], []
+        return receipt
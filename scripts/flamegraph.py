@@ -0,0 +1,154 @@
+"""Gas flamegraphs of transactions from their brownie call traces.
+
+collapse() walks a transaction's trace (TransactionReceipt.trace, the structLogs brownie
+expands with the contract and function of every step) and charges the gas of each step to
+the stack of functions it ran in, external calls and internal calls alike:
+
+    Strategy.harvest;Strategy._harvestRewards;jointLPHolderUniV2.harvestFromProvider;jointLPHolderUniV2._sellRewardTokens;UniswapV2Router02.swapExactTokensForTokens 182345
+
+flamegraph.pl, inferno or speedscope draw these collapsed stacks. A call's own cost (access,
+value, memory) is charged to the caller and the gas spent inside the callee to the callee,
+so the stacks add up to the execution gas before refunds; intrinsic gas (21000 plus
+calldata) is a [intrinsic] frame under the root.
+
+The gas benchmarks write one folded file per path with GAS_FLAMEGRAPH set to a directory,
+and the command line merges folded files and prints the gas by contract and by function:
+
+    GAS_FLAMEGRAPH=reports/flame brownie test tests/Fantom/test_gasbench.py --network development
+    python scripts/flamegraph.py reports/flame/FRAXFTMSpiritLQDR-harvestWithRewards.folded --top 15
+"""
+
+import argparse
+import os
+from collections import Counter
+
+INTRINSIC = '[intrinsic]'
+
+
+def _label(step):
+    return step.get('fn') or step.get('contractName') or step.get('address') or '?'
+
+
+def stepCosts(trace):
+    """Gas each step spent itself, without what the frames it called spent."""
+    costs = [0] * len(trace)
+    calls = []
+    for i, step in enumerate(trace):
+        nxt = trace[i + 1] if i + 1 < len(trace) else None
+        if nxt is None or nxt['depth'] < step['depth']:
+            # last step of a frame, STOP / RETURN / REVERT
+            costs[i] = step['gasCost']
+            if calls and nxt is not None:
+                call = calls.pop()
+                childUsed = trace[call + 1]['gas'] - (step['gas'] - step['gasCost'])
+                costs[call] = trace[call]['gas'] - nxt['gas'] - childUsed
+        elif nxt['depth'] > step['depth']:
+            # CALL / STATICCALL / DELEGATECALL / CREATE into a contract, settled on return
+            calls.append(i)
+        else:
+            costs[i] = step['gas'] - nxt['gas']
+    return costs
+
+
+def collapse(trace, gasUsed=None):
+    """Counter of 'fn;fn;fn' stacks to the gas spent in them. With gasUsed, what the
+    trace doesn't account for is charged to the root's [intrinsic] frame."""
+    stacks = Counter()
+    frames = []
+    for step, cost in zip(trace, stepCosts(trace)):
+        key = (step['depth'], step.get('jumpDepth', 0))
+        while frames and frames[-1][0] >= key:
+            frames.pop()
+        frames.append((key, _label(step)))
+        stacks[';'.join(label for _, label in frames)] += cost
+    if gasUsed is not None and trace:
+        intrinsic = gasUsed - sum(stacks.values())
+        if intrinsic > 0:
+            stacks[_label(trace[0]) + ';' + INTRINSIC] += intrinsic
+    return stacks
+
+
+def txStacks(tx):
+    """Collapsed stacks of a brownie TransactionReceipt."""
+    return collapse(tx.trace, tx.gas_used)
+
+
+def writeFolded(stacks, path):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as f:
+        for stack, gas in sorted(stacks.items()):
+            if gas > 0:
+                f.write('{0} {1}\n'.format(stack, gas))
+
+
+def readFolded(path):
+    stacks = Counter()
+    with open(path) as f:
+        for line in f:
+            stack, _, gas = line.rstrip('\n').rpartition(' ')
+            if stack:
+                stacks[stack] += int(gas)
+    return stacks
+
+
+def _contract(label):
+    return label.split('.')[0]
+
+
+def byContract(stacks):
+    """Gas per contract, inclusive of everything it called and spent in its own code."""
+    inclusive = Counter()
+    own = Counter()
+    for stack, gas in stacks.items():
+        labels = stack.split(';')
+        for contract in set(_contract(label) for label in labels if label != INTRINSIC):
+            inclusive[contract] += gas
+        own[_contract(labels[-1]) if labels[-1] != INTRINSIC else INTRINSIC] += gas
+    return inclusive, own
+
+
+def byFunction(stacks):
+    """Gas spent in each function's own code."""
+    own = Counter()
+    for stack, gas in stacks.items():
+        own[stack.split(';')[-1]] += gas
+    return own
+
+
+def byFunctionInclusive(stacks):
+    """Gas per function, inclusive of everything it called."""
+    inclusive = Counter()
+    for stack, gas in stacks.items():
+        for label in set(stack.split(';')):
+            inclusive[label] += gas
+    return inclusive
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('folded', nargs='+', help='collapsed stack files, merged')
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--out', help='write the merged stacks here')
+    args = parser.parse_args()
+
+    stacks = Counter()
+    for path in args.folded:
+        stacks.update(readFolded(path))
+    if args.out:
+        writeFolded(stacks, args.out)
+
+    total = sum(stacks.values())
+    inclusive, own = byContract(stacks)
+    print('{0:,} gas in {1} file(s)'.format(total, len(args.folded)))
+    print('{0:>28} {1:>12} {2:>12}'.format('contract', 'inclusive', 'own'))
+    for contract, gas in inclusive.most_common(args.top):
+        print('{0:>28} {1:>12,} {2:>12,}'.format(contract, gas, own[contract]))
+    print('{0:>52} {1:>12} {2:>7}'.format('function', 'own', 'share'))
+    for function, gas in byFunction(stacks).most_common(args.top):
+        print('{0:>52} {1:>12,} {2:>6.1%}'.format(function, gas, gas / total))
+
+
+if __name__ == '__main__':
+    main()
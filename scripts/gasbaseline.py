@@ -0,0 +1,104 @@
+"""Committed gas baseline of the keeper and vault hot paths.
+
+tests/Fantom/test_gasbench.py and tests/Optimism/test_gasbench.py measure gasUsed of each
+benchmarked path on the suite's holder and compare it with tests/gas_baseline.json, keyed by
+holder, pair and network. A path fails when it uses more than GAS_REGRESSION above its
+baseline. A path with no baseline yet only warns, the committed file has no recorded runs
+so far; GAS_BASELINE_STRICT=1 fails it instead, which becomes the default once the numbers
+are committed. The file is only written with GAS_BASELINE_UPDATE=1, which records every path
+measured; commit the file with the change that moved the numbers.
+Run the benchmarks without xdist when updating, the workers would overwrite each other's
+entries.
+
+    GAS_BASELINE_UPDATE=1 brownie test tests/Fantom/test_gasbench.py --network development
+    python scripts/gasbaseline.py
+"""
+
+import argparse
+import json
+import os
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests', 'gas_baseline.json')
+GAS_REGRESSION = 0.02
+
+
+def regressed(expected, gasUsed, tolerance=GAS_REGRESSION):
+    """True when gasUsed is more than tolerance above expected."""
+    return gasUsed > expected * (1 + tolerance)
+
+
+def _load(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+class GasBaseline:
+    def __init__(self, path=BASELINE_PATH, update=False, strict=False):
+        self.path = path
+        self.update = update
+        self.strict = strict
+        self.entries = _load(path)
+        # (holder, pair, network, path) -> gasUsed to write back
+        self.measured = {}
+
+    def expected(self, key, name):
+        holder, pairName, network = key
+        return self.entries.get(holder, {}).get(pairName, {}).get(network, {}).get(name)
+
+    def record(self, key, name, gasUsed):
+        """Baseline gas of path `name` under key (holder, pair, network), None for a new
+        path. When updating, gasUsed is kept for save()."""
+        if self.update:
+            self.measured[key + (name,)] = gasUsed
+        return self.expected(key, name)
+
+    def missing(self, key, name):
+        """Why path `name` can't be checked, None once it has a baseline."""
+        if self.expected(key, name) is None:
+            return '{0} has no baseline for {1}, record it with GAS_BASELINE_UPDATE=1'.format(name, key)
+        return None
+
+    def check(self, key, name, gasUsed):
+        """Records gasUsed and returns why it fails against the baseline, None if it
+        doesn't. Nothing fails while updating, a missing baseline only when strict."""
+        expected = self.record(key, name, gasUsed)
+        if self.update:
+            return None
+        if expected is None:
+            return self.missing(key, name) if self.strict else None
+        if regressed(expected, gasUsed):
+            return '{0} uses {1} gas, more than {2:.0%} above {3}'.format(name, gasUsed, GAS_REGRESSION, expected)
+        return None
+
+    def save(self):
+        """Merges the kept paths into the file as it is on disk now, so separate suites
+        can update it one after the other. Only writes when updating."""
+        if not self.update or not self.measured:
+            return
+        entries = _load(self.path)
+        for (holder, pairName, network, name), gasUsed in self.measured.items():
+            entries.setdefault(holder, {}).setdefault(pairName, {}).setdefault(network, {})[name] = gasUsed
+        with open(self.path, 'w') as f:
+            json.dump(entries, f, indent=2, sort_keys=True)
+            f.write('\n')
+        self.entries = entries
+        self.measured = {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--path', default=BASELINE_PATH)
+    args = parser.parse_args()
+
+    for holder, pairs in sorted(_load(args.path).items()):
+        for pairName, networks in sorted(pairs.items()):
+            for network, paths in sorted(networks.items()):
+                print('{0} {1} on {2}'.format(holder, pairName, network))
+                for name, gasUsed in sorted(paths.items()):
+                    print('{0:>24} {1:>10,}'.format(name, gasUsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Keeper and vault hot paths of a joint, benchmarked against the committed gas baseline.
+
+Both suites' test_gasbench.py run these flows on their own fixtures; the only difference
+between the suites, how a swap offsets the debt ratios, comes in as a callable. Every path
+starts from invest(), the providers' first harvests putting both deposits in the joint, and
+check() compares its gasUsed with tests/gas_baseline.json through scripts/gasbaseline.py.
+With GAS_FLAMEGRAPH set to a directory each transaction's collapsed stacks are written there
+as <pair>-<path>.folded, see scripts/flamegraph.py.
+
+    GAS_BASELINE_UPDATE=1 brownie test tests/Fantom/test_gasbench.py --network development
+"""
+
+import os
+import warnings
+
+from brownie import accounts, interface, network
+
+from scripts.flamegraph import txStacks, writeFolded
+
+
+def check(gasBaseline, jointLP, pairName, name, tx):
+    key = (jointLP._name, pairName, network.show_active())
+    print('{0} gasUsed {1} baseline {2}'.format(name, tx.gas_used, gasBaseline.expected(key, name)))
+    if os.environ.get('GAS_FLAMEGRAPH'):
+        writeFolded(txStacks(tx), os.path.join(os.environ['GAS_FLAMEGRAPH'], '{0}-{1}.folded'.format(pairName, name)))
+    failure = gasBaseline.check(key, name, tx.gas_used)
+    assert failure is None, failure
+    missing = gasBaseline.missing(key, name)
+    if missing and not gasBaseline.update:
+        warnings.warn(missing)
+
+
+def addRewards(jointLP, conf):
+    for i in range(len(conf['harvest_tokens'])):
+        harvest = interface.ERC20(conf['harvest_tokens'][i])
+        harvestWhale = accounts.at(conf['harvestWhales'][i], True)
+        harvest.transfer(jointLP, int(harvest.balanceOf(harvestWhale) / 10000), {'from': harvestWhale})
+
+
+def invest(chain, tokens, vaults, strategies, user, amounts):
+    """Deposits amounts into the vaults and returns both providers' first harvests."""
+    for i in range(len(tokens)):
+        tokens[i].approve(vaults[i].address, amounts[i], {'from': user})
+        vaults[i].deposit(amounts[i], {'from': user})
+    chain.sleep(5)
+    chain.mine(5)
+    return [strategy.harvest() for strategy in strategies]
+
+
+def harvestSteady(chain, strategies):
+    # inside minRewardSaleTime, so the harvest doesn't sell
+    chain.sleep(5)
+    chain.mine(5)
+    return strategies[0].harvest()
+
+
+def harvestWithRewards(chain, strategies, jointLP, conf):
+    chain.sleep(jointLP.minRewardSaleTime() + 1)
+    addRewards(jointLP, conf)
+    chain.mine(1)
+    return strategies[0].harvest()
+
+
+def addToJoint(tokens, strategies, jointLP, whales, amounts):
+    for i in range(len(tokens)):
+        whale = accounts.at(whales[i], force=True)
+        tokens[i].transfer(strategies[i], amounts[i] // 10, {'from': whale})
+    return jointLP.addToJoint({'from': accounts.at(strategies[0], force=True)})
+
+
+def withdraw(gov, user, vaults, jointLP, proportion):
+    """user withdrawing proportion (bps) of their shares of the first vault, which the
+    provider pays out of its lend position and a withdraw from the joint."""
+    jointLP.setPriceSource(False, 500, {'from': gov})
+    vault = vaults[0]
+    shares = vault.balanceOf(user) * proportion // 10_000
+    return vault.withdraw(shares, user, 10_000, {'from': user})
+
+
+def rebalanceDebt(gov, jointLP, offSetDebtRatio):
+    """offSetDebtRatio() swaps the pair far enough off the debt ratios to need a rebalance."""
+    offSetDebtRatio()
+    return jointLP.rebalanceDebt({'from': gov})
+
+
+def harvestRewards(chain, gov, jointLP, conf):
+    chain.sleep(4000)
+    addRewards(jointLP, conf)
+    chain.mine(1)
+    return jointLP.harvestRewards({'from': gov})
+
+
+def withdrawAllFromJoint(gov, jointLP):
+    jointLP.setPriceSource(False, 500, {'from': gov})
+    return jointLP.withdrawAllFromJoint({'from': gov})
@@ -0,0 +1,131 @@
+"""Storage reads and external calls made by one top-level call, from its debug trace.
+
+A view is sent as a transaction (ContractCall.transact) on a local chain so the node keeps
+its trace, and analyze() walks the brownie trace counting every SLOAD by contract and slot
+and every CALL / STATICCALL / DELEGATECALL by target and calldata. Reads of a slot already
+read and calls identical to an earlier one in the same top-level call are redundant: their
+results could have been passed along, e.g. estimatedTotalAssets reaching calcDebtRatioToken
+twice through calculateProfit, each time calling debtOutstanding back into the strategy and
+lp.getReserves() again. Traces with the steps' gas also get each function's self and total
+gas (scripts/flamegraph.py), the total of the top-level call being its gasUsed.
+
+tests/Fantom/test_hotspots.py and tests/Optimism/test_hotspots.py profile the views keepers
+and UIs poll; run them with -s for the report, HOTSPOT_REPORT=<path> also writes it as JSON:
+
+    HOTSPOT_REPORT=reports/hotspots.json brownie test tests/Fantom/test_hotspots.py --network development -s
+"""
+
+from collections import Counter
+
+from scripts.flamegraph import byFunction, byFunctionInclusive, collapse
+
+# stack position, from the top, of argsOffset; argsLength is the next one down
+CALL_ARGS = {'CALL': 4, 'CALLCODE': 4, 'STATICCALL': 3, 'DELEGATECALL': 3}
+
+
+def _int(word):
+    return int(word, 16) if isinstance(word, str) else int(word)
+
+
+def _hex(word):
+    word = word.hex() if isinstance(word, (bytes, bytearray)) else word
+    return word[2:] if word.startswith('0x') else word
+
+
+def _address(word):
+    return '0x' + '{0:040x}'.format(_int(word) % 2 ** 160)
+
+
+def _memory(step):
+    return ''.join(_hex(word) for word in step.get('memory') or [])
+
+
+def _callData(step):
+    stack = step['stack']
+    argsAt = CALL_ARGS[step['op']]
+    offset, length = _int(stack[-argsAt]), _int(stack[-argsAt - 1])
+    return _memory(step)[offset * 2:(offset + length) * 2]
+
+
+def _args(data):
+    words = [data[i:i + 64] for i in range(8, len(data), 64)]
+    return ','.join(hex(int(word, 16)) for word in words if word)
+
+
+def analyze(trace, gasUsed=None):
+    """Counts of the SLOADs and external calls in trace, with the repeated ones. With gasUsed
+    the intrinsic gas is charged to the top-level call, see flamegraph.collapse."""
+    names = {}
+    slots = Counter()
+    sloadsByFunction = Counter()
+    calls = Counter()
+    callLabels = {}
+    for i, step in enumerate(trace):
+        address = step.get('address')
+        names.setdefault(address, step.get('contractName') or address)
+        if step['op'] == 'SLOAD':
+            slots[(address, _int(step['stack'][-1]))] += 1
+            sloadsByFunction[step.get('fn') or names[address]] += 1
+        elif step['op'] in CALL_ARGS:
+            target = _address(step['stack'][-2])
+            data = _callData(step)
+            calls[(target, data)] += 1
+            nxt = trace[i + 1] if i + 1 < len(trace) else None
+            if nxt is not None and nxt['depth'] > step['depth'] and nxt.get('fn'):
+                callee = nxt['fn']
+            else:
+                # no code at the target, or a precompile
+                callee = '{0}.0x{1}'.format(target, data[:8])
+            callLabels.setdefault((target, data), '{0}({1})'.format(callee, _args(data)))
+
+    sloads = sum(slots.values())
+    callCount = sum(calls.values())
+    report = {
+        'sloads': sloads,
+        'uniqueSlots': len(slots),
+        'redundantSloads': sloads - len(slots),
+        'calls': callCount,
+        'uniqueCalls': len(calls),
+        'redundantCalls': callCount - len(calls),
+        'sloadsByFunction': dict(sloadsByFunction.most_common()),
+        'repeatedSlots': [
+            {'contract': names.get(address, address), 'address': address, 'slot': hex(slot), 'count': count}
+            for (address, slot), count in slots.most_common() if count > 1
+        ],
+        'repeatedCalls': [
+            {'call': callLabels[key], 'target': key[0], 'count': count}
+            for key, count in calls.most_common() if count > 1
+        ],
+    }
+    if trace and 'gasCost' in trace[0]:
+        stacks = collapse(trace, gasUsed)
+        own = byFunction(stacks)
+        report['gasByFunction'] = {
+            fn: {'self': own.get(fn, 0), 'total': total}
+            for fn, total in byFunctionInclusive(stacks).most_common()
+        }
+    return report
+
+
+def profileCall(fn, *args, sender):
+    """Sends the view / call fn(*args) as a transaction from sender and analyzes its trace."""
+    tx = fn.transact(*args, {'from': sender})
+    report = analyze(tx.trace, tx.gas_used)
+    report['gasUsed'] = tx.gas_used
+    return report
+
+
+def formatReport(name, report, top=10):
+    lines = [
+        '{0}: {1:,} gas, {2} SLOAD ({3} redundant), {4} external calls ({5} redundant)'.format(
+            name, report.get('gasUsed', 0), report['sloads'], report['redundantSloads'],
+            report['calls'], report['redundantCalls'])
+    ]
+    for call in report['repeatedCalls'][:top]:
+        lines.append('  {count:4d}x call  {call}'.format(**call))
+    for slot in report['repeatedSlots'][:top]:
+        lines.append('  {count:4d}x SLOAD {contract} slot {slot}'.format(**slot))
+    bySelf = sorted(report.get('gasByFunction', {}).items(), key=lambda item: -item[1]['self'])
+    for fn, gas in bySelf[:top]:
+        lines.append('  {0:>9,} self {1:>9,} total  {2}'.format(gas['self'], gas['total'], fn))
+    return lines
@@ -0,0 +1,278 @@
+"""Per-test profile of a test run, loaded as a pytest plugin through brownie_hooks.py.
+
+For every test it records the wall time of setup / call / teardown, the time each fixture
+took to set up (module fixtures show up on the first test of their module), the JSON-RPC
+calls made to the node by method with their time, and the transactions the test sent with
+the gas they used. On a fork the node's own upstream fetches aren't visible here, they show
+as slow eth_call / eth_getTransactionReceipt time; evm_increaseTime / evm_mine count the
+chain.sleep and chain.mine calls.
+
+The report is written as JSON to the given path and as one CSV row per test next to it, and
+the slowest tests, RPC methods and fixtures are printed at the end of the run. Under xdist
+each worker writes its own report, suffixed with the worker id.
+
+    brownie test tests/Fantom -p brownie_hooks --profile-report reports/profile.json
+"""
+
+import csv
+import json
+import os
+import time
+from collections import defaultdict
+
+import pytest
+
+SEND_METHODS = ('eth_sendTransaction', 'eth_sendRawTransaction')
+CSV_FIELDS = (
+    'nodeid', 'outcome', 'duration', 'setup', 'call', 'teardown', 'fixtureSeconds',
+    'rpcCalls', 'rpcSeconds', 'transactions', 'gasUsed',
+)
+
+
+def _record(nodeid):
+    return {
+        'nodeid': nodeid,
+        'outcome': None,
+        'duration': 0.0,
+        'setup': 0.0,
+        'call': 0.0,
+        'teardown': 0.0,
+        'fixtures': {},
+        'rpc': defaultdict(lambda: [0, 0.0]),
+        'transactions': 0,
+        'gasUsed': 0,
+    }
+
+
+def _history():
+    """brownie's transaction history, empty outside a brownie run."""
+    try:
+        from brownie.network import history
+    except ImportError:
+        return []
+    return history
+
+
+class Profiler:
+    def __init__(self, path, slowest=10):
+        self.path = path
+        self.slowest = slowest
+        self.tests = {}
+        self.current = None
+        # RPC calls and fixtures set up outside any test, i.e. at session start and end
+        self.session = _record('<session>')
+        self.fixtures = defaultdict(lambda: [0, 0.0])
+        # length of the transaction history when the current test started
+        self._mined = 0
+        self._restore = None
+
+    def _target(self):
+        return self.current if self.current is not None else self.session
+
+    # recording, called from the hooks below
+
+    def startTest(self, nodeid, mined=0):
+        """mined is the number of transactions in history before the test's setup."""
+        self.current = self.tests.setdefault(nodeid, _record(nodeid))
+        self._mined = mined
+
+    def endTest(self):
+        self.current = None
+
+    def rpcCall(self, method, seconds):
+        target = self._target()
+        target['rpc'][method][0] += 1
+        target['rpc'][method][1] += seconds
+        if method in SEND_METHODS:
+            target['transactions'] += 1
+
+    def fixtureSetup(self, name, scope, seconds):
+        fixtures = self._target()['fixtures']
+        fixtures[name] = fixtures.get(name, 0.0) + seconds
+        self.fixtures[(name, scope)][0] += 1
+        self.fixtures[(name, scope)][1] += seconds
+
+    def phase(self, nodeid, when, duration, outcome):
+        record = self.tests.setdefault(nodeid, _record(nodeid))
+        record[when] += duration
+        record['duration'] += duration
+        # a failed setup or teardown decides the outcome, as pytest reports it
+        if when == 'call' or outcome != 'passed':
+            record['outcome'] = outcome
+        elif record['outcome'] is None:
+            record['outcome'] = outcome
+
+    def gasUsed(self, transactions):
+        """Adds the transactions mined since the current test started. The isolation
+        fixtures revert them out of history afterwards, so the next test replaying the
+        same calls gets the same txids and is charged for them again."""
+        for tx in list(transactions)[self._mined:]:
+            self._target()['gasUsed'] += tx.gas_used or 0
+
+    # RPC interception
+
+    def instrument(self, providerClass):
+        """Times every make_request of providerClass until restore()."""
+        original = providerClass.make_request
+        profiler = self
+
+        def make_request(provider, method, params):
+            start = time.perf_counter()
+            try:
+                return original(provider, method, params)
+            finally:
+                profiler.rpcCall(method, time.perf_counter() - start)
+
+        providerClass.make_request = make_request
+
+        def restore():
+            providerClass.make_request = original
+
+        self._restore = restore
+
+    def restore(self):
+        if self._restore is not None:
+            self._restore()
+            self._restore = None
+
+    # report
+
+    def rows(self):
+        rows = []
+        for record in self.tests.values():
+            rows.append({
+                'nodeid': record['nodeid'],
+                'outcome': record['outcome'],
+                'duration': round(record['duration'], 4),
+                'setup': round(record['setup'], 4),
+                'call': round(record['call'], 4),
+                'teardown': round(record['teardown'], 4),
+                'fixtureSeconds': round(sum(record['fixtures'].values()), 4),
+                'rpcCalls': sum(count for count, _ in record['rpc'].values()),
+                'rpcSeconds': round(sum(seconds for _, seconds in record['rpc'].values()), 4),
+                'transactions': record['transactions'],
+                'gasUsed': record['gasUsed'],
+            })
+        return sorted(rows, key=lambda row: row['duration'], reverse=True)
+
+    def rpcTotals(self):
+        totals = defaultdict(lambda: [0, 0.0])
+        for record in list(self.tests.values()) + [self.session]:
+            for method, (count, seconds) in record['rpc'].items():
+                totals[method][0] += count
+                totals[method][1] += seconds
+        return {
+            method: {'count': count, 'seconds': round(seconds, 4)}
+            for method, (count, seconds) in sorted(totals.items(), key=lambda item: -item[1][1])
+        }
+
+    def report(self):
+        def perTest(record):
+            return dict(
+                record,
+                rpc={method: {'count': count, 'seconds': round(seconds, 4)} for method, (count, seconds) in record['rpc'].items()},
+            )
+
+        return {
+            'tests': self.rows(),
+            'perTest': {nodeid: perTest(record) for nodeid, record in self.tests.items()},
+            'session': perTest(self.session),
+            'rpc': self.rpcTotals(),
+            'fixtures': [
+                {'name': name, 'scope': scope, 'count': count, 'seconds': round(seconds, 4)}
+                for (name, scope), (count, seconds) in sorted(self.fixtures.items(), key=lambda item: -item[1][1])
+            ],
+        }
+
+    def write(self):
+        """Writes the JSON report and the CSV next to it, returns both paths."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+        csvPath = os.path.splitext(self.path)[0] + '.csv'
+        with open(csvPath, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+            writer.writeheader()
+            writer.writerows(self.rows())
+        return self.path, csvPath
+
+    def summary(self):
+        """Lines of the slowest tests, RPC methods and fixtures."""
+        lines = ['slowest {0} tests:'.format(self.slowest)]
+        for row in self.rows()[:self.slowest]:
+            lines.append(
+                '{duration:9.2f}s  setup {setup:7.2f}s  fixtures {fixtureSeconds:7.2f}s  '
+                'rpc {rpcCalls:6d} {rpcSeconds:7.2f}s  tx {transactions:4d}  gas {gasUsed:>12,}  {nodeid}'.format(**row)
+            )
+        lines.append('slowest rpc methods:')
+        for method, total in list(self.rpcTotals().items())[:self.slowest]:
+            lines.append('{seconds:9.2f}s  {count:8d}  {0}'.format(method, **total))
+        lines.append('slowest fixtures:')
+        for fixture in self.report()['fixtures'][:self.slowest]:
+            lines.append('{seconds:9.2f}s  {count:8d}  {name} ({scope})'.format(**fixture))
+        return lines
+
+    # pytest hooks
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item, nextitem):
+        self.startTest(item.nodeid, len(_history()))
+        yield
+        self.endTest()
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_teardown(self, item, nextitem):
+        # before the isolation fixtures revert the test's transactions out of history
+        self.gasUsed(_history())
+        yield
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_fixture_setup(self, fixturedef, request):
+        start = time.perf_counter()
+        yield
+        self.fixtureSetup(fixturedef.argname, fixturedef.scope, time.perf_counter() - start)
+
+    def pytest_runtest_logreport(self, report):
+        self.phase(report.nodeid, report.when, report.duration, report.outcome)
+
+    def pytest_sessionstart(self, session):
+        try:
+            from web3 import HTTPProvider
+        except ImportError:
+            return
+        self.instrument(HTTPProvider)
+
+    def pytest_sessionfinish(self, session):
+        self.restore()
+        self.write()
+
+    def pytest_terminal_summary(self, terminalreporter):
+        terminalreporter.section('profile')
+        for line in self.summary():
+            terminalreporter.write_line(line)
+        terminalreporter.write_line('profile written to {0}'.format(self.path))
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('profile')
+    group.addoption(
+        '--profile-report', metavar='PATH', default=None,
+        help='write a per-test profile as JSON to PATH and as CSV next to it',
+    )
+    group.addoption(
+        '--profile-slowest', metavar='N', type=int, default=10,
+        help='number of tests, RPC methods and fixtures in the profile summary',
+    )
+
+
+def pytest_configure(config):
+    path = config.getoption('--profile-report')
+    if not path:
+        return
+    worker = os.environ.get('PYTEST_XDIST_WORKER')
+    if worker:
+        stem, ext = os.path.splitext(path)
+        path = '{0}.{1}{2}'.format(stem, worker, ext)
+    config.pluginmanager.register(Profiler(path, config.getoption('--profile-slowest')), 'profiler')
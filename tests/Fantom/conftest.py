@@ -1,7 +1,8 @@
 import pytest
 from brownie import config
 from brownie import Contract
-from brownie import interface, project
+from brownie import chain, interface, network, project, ZERO_ADDRESS
+from brownie.convert import to_address
 
 SPIRIT_ROUTER = '0x16327E3FbDaCA3bcF7E38F5Af2599D2DDc33aE52'
 SPOOKY_ROUTER = '0xF491e7B69E4244ad4002BC14e878a34207E38c29'
@@ -159,50 +160,183 @@ CONFIG = {
 }
 
 
-@pytest.fixture
-def conf():
-    yield CONFIG['FRAXFTMSpiritLQDR']
+# ABIs from contracts/interfaces for the addresses the suite looks up, so Contract()
+# resolves them offline and only goes to the explorer for anything else
+INTERFACES = {
+    SPIRIT_ROUTER : 'IUniswapV2Router02',
+    SPOOKY_ROUTER : 'IUniswapV2Router02',
+}
+for pairConf in CONFIG.values() :
+    INTERFACES[pairConf['LP']] = 'IUniswapV2Pair'
+INTERFACES = {to_address(address): name for address, name in INTERFACES.items()}
 
-@pytest.fixture
+
+def lookupContract(address, interfaces=INTERFACES):
+    # Contract(address) without the explorer for addresses in interfaces
+    address = to_address(address)
+    if address in interfaces :
+        return getattr(interface, interfaces[address])(address)
+    return Contract(address)
+
+
+# pairs the conf matrix can't run, with the reason they're skipped
+SKIP_PAIRS = {
+    'USDCFTMSpookyBOO': 'SpookyMasterChef is a MasterChef v1, jointLPHolderUniV2 needs IMasterChefv2',
+}
+
+
+def pairParams(config, skipPairs):
+    params = []
+    for pair in config :
+        marks = []
+        if pair in skipPairs :
+            marks = [pytest.mark.skip(reason=skipPairs[pair])]
+        params = params + [pytest.param(pair, marks=marks, id=pair)]
+    return params
+
+
+# networks without a fork, where conf is replaced by the mock stack from localConf
+LOCAL_NETWORKS = ['development']
+# the pair localConf rebuilds from mocks, the only one run on LOCAL_NETWORKS
+LOCAL_PAIR = 'FRAXFTMSpiritLQDR'
+
+# USD prices and per side pool liquidity of the local stack
+LOCAL_PRICES = {'FRAX': 1, 'WFTM': 0.25, 'LQDR': 2.5, 'SCREAM': 0.5}
+LOCAL_POOL_VALUE = 5_000_000
+LOCAL_LQDR_PER_SECOND = 10 ** 17
+
+
+@pytest.fixture(scope="session")
+def local():
+    yield network.show_active() in LOCAL_NETWORKS
+
+
+@pytest.fixture(scope="module")
+def localConf(accounts, gov, MockERC20, MockUniswapV2Factory, MockUniswapV2Router, MockMasterChef, MockPriceOracle, MockComptroller, MockCToken):
+    # FRAXFTMSpiritLQDR rebuilt from mocks: FRAX / WFTM on a 0.3% UniswapV2 fork, LQDR and
+    # SCREAM paired with WFTM for sales, an LQDR MasterChef and Iron Bank style lending
+    whale = accounts[9]
+    mocks = {}
+    for symbol in LOCAL_PRICES :
+        mocks[symbol] = MockERC20.deploy(symbol, symbol, 18, {'from' : gov})
+        mocks[symbol].mint(whale, 10 ** 9 * 10 ** 18, {'from' : gov})
+
+    wftm = mocks['WFTM']
+    factory = MockUniswapV2Factory.deploy(30, {'from' : gov})
+    router = MockUniswapV2Router.deploy(factory, wftm, {'from' : gov})
+    for symbol in ['FRAX', 'LQDR', 'SCREAM'] :
+        token = mocks[symbol]
+        amount = int(LOCAL_POOL_VALUE / LOCAL_PRICES[symbol]) * 10 ** 18
+        amountWftm = int(LOCAL_POOL_VALUE / LOCAL_PRICES['WFTM']) * 10 ** 18
+        token.mint(gov, amount, {'from' : gov})
+        wftm.mint(gov, amountWftm, {'from' : gov})
+        token.approve(router, amount, {'from' : gov})
+        wftm.approve(router, amountWftm, {'from' : gov})
+        router.addLiquidity(token, wftm, amount, amountWftm, 0, 0, gov, 2 ** 256 - 1, {'from' : gov})
+    lp = factory.getPair(mocks['FRAX'], wftm)
+
+    farm = MockMasterChef.deploy(mocks['LQDR'], LOCAL_LQDR_PER_SECOND, {'from' : gov})
+    farm.add(100, lp, {'from' : gov})
+
+    oracle = MockPriceOracle.deploy(ZERO_ADDRESS, {'from' : gov})
+    comptroller = MockComptroller.deploy(oracle, mocks['SCREAM'], {'from' : gov})
+    lendTokens = []
+    for symbol in ['FRAX', 'WFTM'] :
+        cToken = MockCToken.deploy(mocks[symbol], comptroller, 2 * 10 ** 26, {'from' : gov})
+        oracle.setUnderlyingPrice(cToken, int(LOCAL_PRICES[symbol] * 10 ** 18), {'from' : gov})
+        lendTokens = lendTokens + [cToken]
+
+    # nothing deployed on a development chain is in brownie's deployment map, so
+    # Contract(address) has no ABI for the mocks either. A copy, the live pairs of the
+    # session keep looking up the global INTERFACES
+    interfaces = dict(INTERFACES, **{
+        to_address(router.address): 'IUniswapV2Router02',
+        to_address(lp): 'IUniswapV2Pair',
+    })
+
+    yield dict(
+        CONFIG[LOCAL_PAIR],
+        LP = lp,
+        tokens = [mocks['FRAX'].address, wftm.address],
+        farm = farm.address,
+        farmPID = 0,
+        comptroller = comptroller.address,
+        harvest_tokens = [mocks['LQDR'].address],
+        harvestWhales = [whale.address],
+        compToken = mocks['SCREAM'].address,
+        router = router.address,
+        lendTokens = [cToken.address for cToken in lendTokens],
+        whale = whale.address,
+        interfaces = interfaces,
+    )
+
+
+@pytest.fixture(scope="module", params=pairParams(CONFIG, SKIP_PAIRS))
+def pairName(local, request):
+    if local and request.param != LOCAL_PAIR :
+        pytest.skip('only {0} is mocked on {1}'.format(LOCAL_PAIR, network.show_active()))
+    yield request.param
+    # module_isolation resets the chain once per module, the next pair of the module
+    # deploys on a clean chain too rather than on top of this one
+    chain.reset()
+
+
+@pytest.fixture(scope="module")
+def conf(local, pairName, request):
+    if local :
+        yield request.getfixturevalue('localConf')
+    else :
+        yield CONFIG[pairName]
+
+@pytest.fixture(scope="module")
 def gov(accounts):
     yield accounts.at("0x7601630eC802952ba1ED2B6e4db16F699A0a5A87", force=True)
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def user(accounts):
     yield accounts[0]
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def rewards(accounts):
     yield accounts[1]
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def guardian(accounts):
     yield accounts[2]
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def management(accounts):
     yield accounts[3]
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def strategist(accounts):
     yield accounts[4]
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def keeper(accounts):
     yield accounts[5]
 
-@pytest.fixture
-def router(conf):
-    yield Contract(conf['router'])
+@pytest.fixture(scope="module")
+def contractAt(conf):
+    # lookupContract with the ABIs of the conf in use, localConf adds the mocks'
+    interfaces = conf.get('interfaces', INTERFACES)
+    def contractAt(address):
+        return lookupContract(address, interfaces)
+    yield contractAt
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
+def router(conf, contractAt):
+    yield contractAt(conf['router'])
+
+
+@pytest.fixture(scope="module")
 def amounts(accounts, tokens, user, whales):
     amounts = []
     i = 0 
@@ -218,10 +352,9 @@ def amounts(accounts, tokens, user, whales):
     yield amounts
 
 
-@pytest.fixture
-def weth():
-    token_address = "0x21be370D5312f44cB42ce377BC9b8a0cEF1A4C83"
-    yield interface.IERC20Extended(token_address)
+@pytest.fixture(scope="module")
+def weth(router):
+    yield interface.IERC20Extended(router.WETH())
 
 
 @pytest.fixture
@@ -231,8 +364,8 @@ def weth_amout(user, weth):
     yield weth_amout
 
 
-@pytest.fixture
-def tokens(conf, Contract):
+@pytest.fixture(scope="module")
+def tokens(conf):
     nTokens = 2
     #lp = Contract(conf['LP'])
     #tokenList = conf['tokens']
@@ -246,7 +379,7 @@ def tokens(conf, Contract):
 
     yield tokens
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def scTokens(conf, tokens):
     nTokens = 2
     #tokenList = conf['tokens']
@@ -258,19 +391,23 @@ def scTokens(conf, tokens):
     # token_address = "0x21be370D5312f44cB42ce377BC9b8a0cEF1A4C83"  # this should be the address of the ERC-20 used by the strategy/vault (DAI)
     yield scTokens
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def ibTokens(conf, tokens):
+    if 'lendTokens' in conf :
+        yield conf['lendTokens']
+        return
     nTokens = 2
     #tokenList = conf['tokens']
+    lendTokenDict = scTokenDict if conf['comptroller'] == screamComptroller else ibTokenDict
     ibTokens = []
     for i in range(nTokens) : 
         token = tokens[i]
-        ibTokens = ibTokens + [ibTokenDict[token.address]]
+        ibTokens = ibTokens + [lendTokenDict[token.address]]
     # token_address = "0x04068DA6C83AFCFA0e13ba15A6696662335D5B75"  # USDC
     # token_address = "0x21be370D5312f44cB42ce377BC9b8a0cEF1A4C83"  # this should be the address of the ERC-20 used by the strategy/vault (DAI)
     yield ibTokens
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def jointLP(pm, gov, conf, keeper ,rewards, guardian, management, jointLPHolderUniV2) : 
     lp = conf['LP']
     farmToken = conf['harvest_tokens'][0]
@@ -283,7 +420,7 @@ def jointLP(pm, gov, conf, keeper ,rewards, guardian, management, jointLPHolderU
 
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def vaults(pm, gov, rewards, guardian, management, tokens):
     tokenList = tokens
     vaults = []
@@ -298,15 +435,15 @@ def vaults(pm, gov, rewards, guardian, management, tokens):
 
     yield vaults
 
-@pytest.fixture
-def strategies(strategist, StrategyInsurance  ,keeper, vaults, tokens, gov, conf, jointLP, Strategy):
+@pytest.fixture(scope="module")
+def strategies(strategist, StrategyInsurance  ,keeper, vaults, tokens, ibTokens, gov, conf, jointLP, Strategy):
 
 
     strategies = []
     i = 0
     for vault in vaults : 
         token = tokens[i]
-        strategy = Strategy.deploy(vault, jointLP, ibTokenDict[tokens[i].address], ibComptroller, conf['router'], SCREAM, {"from": strategist} )
+        strategy = Strategy.deploy(vault, jointLP, ibTokens[i], conf['comptroller'], conf['router'], conf['compToken'], {"from": strategist} )
         insurance = StrategyInsurance.deploy(strategy, {'from' : strategist})
         strategy.setInsurance(insurance, {'from': gov})
         strategies = strategies + [strategy]
@@ -318,21 +455,35 @@ def strategies(strategist, StrategyInsurance  ,keeper, vaults, tokens, gov, conf
     yield strategies
 
 @pytest.fixture
+def batcher(ActionBatcher, user, strategist, tokens, strategies):
+    # runs scripted setup as one transaction, see scripts/batcher.py. Function scoped, so it
+    # is deployed after the test's snapshot and making it keeper is reverted with the test
+    batcher = ActionBatcher.deploy({'from' : user})
+    for token in tokens :
+        token.approve(batcher, 2 ** 256 - 1, {'from' : user})
+    for strategy in strategies :
+        strategy.setKeeper(batcher, {'from' : strategist})
+    yield batcher
+
+@pytest.fixture(scope="module")
 def strategy_contract():
     # yield  project.CoreStrategyProject.USDCWFTMScreamLqdrSpooky
     yield  project.JointlpvolatileProject.Strategy
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def jointLP_contract():
     # yield  project.CoreStrategyProject.USDCWFTMScreamLqdrSpooky
     yield  project.JointlpvolatileProject.jointLPHolderUniV2
 
 
-@pytest.fixture
-def whales(tokens, Contract) : 
+@pytest.fixture(scope="module")
+def whales(tokens, conf, contractAt) : 
+    if 'whale' in conf :
+        yield [conf['whale'] for token in tokens]
+        return
     router = SPOOKY_ROUTER
-    altRouterContract = Contract(router)
-    factory = Contract(altRouterContract.factory())
+    altRouterContract = contractAt(router)
+    factory = interface.IUniswapV2Factory(altRouterContract.factory())
     whales = []
     tokenList = tokens
     whale = factory.getPair(tokens[0], tokens[1])
@@ -341,15 +492,23 @@ def whales(tokens, Contract) :
         
         whales = whales + [whale]
 
-    return(whales)
+    yield whales
 
 @pytest.fixture(scope="session")
 def RELATIVE_APPROX():
     yield 1e-2
 
 
+# Module scoped isolation fixture, the deployment fixtures above run once per module
+# on top of it and the chain is reset when the module finishes.
+@pytest.fixture(scope="module", autouse=True)
+def module_setup(module_isolation):
+    pass
+
+
 # Function scoped isolation fixture to enable xdist.
-# Snapshots the chain before each test and reverts after test completion.
+# Snapshots the chain before each test (after the module's deployments) and reverts
+# after test completion.
 @pytest.fixture(scope="function", autouse=True)
 def shared_setup(fn_isolation):
     pass
\ No newline at end of file
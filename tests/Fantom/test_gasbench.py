@@ -0,0 +1,59 @@
+import os
+
+import pytest
+
+from scripts import gasbench
+from scripts.gasbaseline import GasBaseline
+from test_offsetprice import offSetDebtRatio
+
+
+@pytest.fixture(scope="module")
+def gasBaseline():
+    baseline = GasBaseline(
+        update=os.environ.get('GAS_BASELINE_UPDATE') == '1', strict=os.environ.get('GAS_BASELINE_STRICT') == '1'
+    )
+    yield baseline
+    baseline.save()
+
+
+@pytest.fixture(scope="module")
+def invested(chain, tokens, vaults, strategies, user, amounts):
+    yield gasbench.invest(chain, tokens, vaults, strategies, user, amounts)
+
+
+def test_harvest_first_deposit(gasBaseline, invested, jointLP, pairName):
+    for i in range(len(invested)) :
+        gasbench.check(gasBaseline, jointLP, pairName, 'harvestFirstDeposit{0}'.format(i), invested[i])
+
+
+def test_harvest_steady(chain, gasBaseline, invested, strategies, jointLP, pairName):
+    gasbench.check(gasBaseline, jointLP, pairName, 'harvestSteady', gasbench.harvestSteady(chain, strategies))
+
+
+def test_harvest_with_rewards(chain, gasBaseline, invested, strategies, jointLP, conf, pairName):
+    tx = gasbench.harvestWithRewards(chain, strategies, jointLP, conf)
+    gasbench.check(gasBaseline, jointLP, pairName, 'harvestWithRewards', tx)
+
+
+def test_add_to_joint(gasBaseline, invested, tokens, strategies, jointLP, whales, amounts, pairName):
+    tx = gasbench.addToJoint(tokens, strategies, jointLP, whales, amounts)
+    gasbench.check(gasBaseline, jointLP, pairName, 'addToJoint', tx)
+
+
+@pytest.mark.parametrize("proportion", [100, 5000, 10000])
+def test_withdraw(gasBaseline, invested, gov, user, vaults, jointLP, pairName, proportion):
+    tx = gasbench.withdraw(gov, user, vaults, jointLP, proportion)
+    gasbench.check(gasBaseline, jointLP, pairName, 'withdraw{0}pct'.format(proportion // 100), tx)
+
+
+def test_rebalance_debt(gasBaseline, invested, gov, whales, tokens, jointLP, conf, pairName, contractAt):
+    tx = gasbench.rebalanceDebt(gov, jointLP, lambda: offSetDebtRatio(gov, whales, tokens, conf, contractAt, 0, 0.03))
+    gasbench.check(gasBaseline, jointLP, pairName, 'rebalanceDebt', tx)
+
+
+def test_harvest_rewards(chain, gasBaseline, invested, gov, jointLP, conf, pairName):
+    gasbench.check(gasBaseline, jointLP, pairName, 'harvestRewards', gasbench.harvestRewards(chain, gov, jointLP, conf))
+
+
+def test_withdraw_all_from_joint(gasBaseline, invested, gov, jointLP, pairName):
+    gasbench.check(gasBaseline, jointLP, pairName, 'withdrawAllFromJoint', gasbench.withdrawAllFromJoint(gov, jointLP))
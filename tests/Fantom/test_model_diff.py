@@ -0,0 +1,182 @@
+import random
+
+import brownie
+import pytest
+from brownie import interface, multicall
+
+from jointsim.differential import diffViews
+from test_offsetprice import offSetDebtRatio
+
+N_STATES = 25
+SEED = 0
+
+
+@pytest.fixture
+def multicall2(accounts):
+    # the fork has no Multicall2 at a known address, deploy one so reads can be batched
+    multicall.deploy({'from': accounts[0]})
+
+
+def readChain(jointLP, providers, lp, holderTokens, cTokens, views=True):
+    """Reads the state the model needs and every compared view in one multicall. Without
+    views only the state is read, the ratio views revert while the holder has no LP."""
+    with multicall:
+        state = {
+            'reserves': (jointLP.getLpReserves(0), jointLP.getLpReserves(1)),
+            'totalSupply': lp.totalSupply(),
+            'lpPooled': jointLP.countLpPooled(),
+            'lpUnpooled': lp.balanceOf(jointLP),
+            'balances': [token.balanceOf(jointLP) for token in holderTokens],
+            'token0TotalSupply': holderTokens[0].totalSupply(),
+            'strategies': [
+                {
+                    'debtJoint': strategy.debtJoint(),
+                    'oraclePrice': strategy.getOraclePrice(),
+                    'wantBalance': strategy.balanceOfWant(),
+                    'cTokenBalance': cToken.balanceOf(strategy),
+                    'exchangeRate': cToken.exchangeRateStored(),
+                }
+                for strategy, cToken in zip(providers, cTokens)
+            ],
+        }
+        viewed = None
+        if views:
+            viewed = {
+                'calcDebtRatio': jointLP.calcDebtRatio(),
+                'balanceTokenWithRebalance': [jointLP.balanceTokenWithRebalance(i) for i in range(2)],
+                'calculateProfit': [jointLP.calculateProfit(token) for token in holderTokens],
+                'calcPriceDiff': jointLP.calcPriceDiff(),
+                'estimatedTotalAssets': [strategy.estimatedTotalAssets() for strategy in providers],
+            }
+    return _resolve(state), _resolve(viewed)
+
+
+def _resolve(value):
+    # multicall results are proxies until the block exits
+    if isinstance(value, dict):
+        return {key: _resolve(v) for key, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_resolve(v) for v in value]
+    return value
+
+
+def randomStep(rng, chain, gov, keeper, user, whales, tokens, vaults, strategies, jointLP, amounts, conf, contractAt):
+    action = rng.choice(('deposit', 'swap', 'swap', 'rebalance', 'harvest'))
+    i = rng.randrange(2)
+    if action == 'deposit':
+        amount = min(int(amounts[i] * rng.uniform(0.01, 0.3)), tokens[i].balanceOf(user))
+        tokens[i].approve(vaults[i], amount, {'from': user})
+        vaults[i].deposit(amount, {'from': user})
+        strategies[i].harvest({'from': gov})
+    elif action == 'swap':
+        offSetDebtRatio(gov, whales, tokens, conf, contractAt, i, rng.uniform(0.001, 0.06))
+    elif action == 'rebalance':
+        if max(jointLP.calcDebtRatio()) > jointLP.debtUpper():
+            try:
+                jointLP.rebalanceDebt({'from': keeper})
+            except brownie.exceptions.VirtualMachineError:
+                # blocked by the price check, still a valid state to compare
+                pass
+    else:
+        chain.sleep(rng.randrange(1, 3 * 86400))
+        chain.mine(1)
+        strategies[i].harvest({'from': gov})
+    return action
+
+
+def invest(chain, gov, user, tokens, vaults, strategies, amounts):
+    for i in range(2):
+        amount = amounts[i] // 2
+        tokens[i].approve(vaults[i], amount, {'from': user})
+        vaults[i].deposit(amount, {'from': user})
+    chain.sleep(5)
+    chain.mine(5)
+    for strategy in strategies:
+        strategy.harvest({'from': gov})
+
+
+def holderContracts(jointLP, strategies):
+    """The pair, the holder's tokens in pair order, their providers and lend markets."""
+    lp = interface.IUniswapV2Pair(jointLP.lp())
+    holderTokens = [interface.IERC20Extended(jointLP.tokens(i)) for i in range(2)]
+    providers = [
+        next(strategy for strategy in strategies if strategy.want() == token.address) for token in holderTokens
+    ]
+    cTokens = [interface.ICTokenErc20(strategy.cTokenLend()) for strategy in providers]
+    return lp, holderTokens, providers, cTokens
+
+
+def test_model_matches_chain(
+    chain, gov, keeper, user, whales, tokens, vaults, strategies, jointLP, amounts, conf, contractAt, multicall2
+):
+    rng = random.Random(SEED)
+    lp, holderTokens, providers, cTokens = holderContracts(jointLP, strategies)
+    invest(chain, gov, user, tokens, vaults, strategies, amounts)
+
+    for step in range(N_STATES):
+        action = randomStep(
+            rng, chain, gov, keeper, user, whales, tokens, vaults, strategies, jointLP, amounts, conf, contractAt
+        )
+        state, views = readChain(jointLP, providers, lp, holderTokens, cTokens)
+        mismatches = diffViews(state, views)
+        assert not mismatches, 'state {0} after {1}: {2}'.format(step, action, mismatches)
+
+
+def setMockState(
+    rng, chain, gov, user, vaults, providers, lp, holderTokens, cTokens, jointLP,
+    MockERC20, MockPriceOracle, MockComptroller, MockCToken
+):
+    """Sets one part of the state directly on the local mock stack: the pair's reserves,
+    an oracle price, loose want on the holder or a provider, a lend exchange rate, or
+    a provider's debt in the joint through its vault."""
+    part = rng.choice(('reserves', 'reserves', 'oraclePrice', 'balances', 'exchangeRate', 'debt'))
+    i = rng.randrange(2)
+    token = MockERC20.at(holderTokens[i].address)
+    if part == 'reserves':
+        # anything the pair holds above its reserves becomes reserves on sync
+        token.mint(lp, int(lp.getReserves()[i] * rng.uniform(0.001, 0.06)), {'from': gov})
+        lp.sync({'from': gov})
+    elif part == 'oraclePrice':
+        oracle = MockPriceOracle.at(MockComptroller.at(MockCToken.at(cTokens[i].address).comptroller()).oracle())
+        price = oracle.getUnderlyingPrice(cTokens[i])
+        oracle.setUnderlyingPrice(cTokens[i], int(price * rng.uniform(0.97, 1.03)), {'from': gov})
+    elif part == 'balances':
+        dust = 10 ** holderTokens[i].decimals() * rng.randrange(1, 100)
+        token.mint(rng.choice((jointLP.address, providers[i].address)), dust, {'from': gov})
+    elif part == 'exchangeRate':
+        cToken = MockCToken.at(cTokens[i].address)
+        cToken.setSupplyRatePerSecond(rng.randrange(10 ** 8, 10 ** 10), {'from': gov})
+        chain.sleep(rng.randrange(1, 30 * 86400))
+        cToken.accrueInterest({'from': gov})
+    else:
+        vault = next(vault for vault in vaults if vault.token() == holderTokens[i].address)
+        if rng.random() < 0.5:
+            amount = token.balanceOf(user) // rng.randrange(5, 20)
+            token.approve(vault, amount, {'from': user})
+            vault.deposit(amount, {'from': user})
+            providers[i].harvest({'from': gov})
+        else:
+            vault.withdraw(vault.balanceOf(user) // rng.randrange(2, 10), user, 10_000, {'from': user})
+    return part
+
+
+def test_model_matches_mock_states(
+    local, chain, gov, user, tokens, vaults, strategies, jointLP, amounts, multicall2,
+    MockERC20, MockPriceOracle, MockComptroller, MockCToken
+):
+    # development only: the mocks let the test write reserves, prices, balances and lend
+    # rates directly instead of reaching them through swaps on a fork
+    if not local:
+        pytest.skip('sets state on the local mock stack only')
+    rng = random.Random(SEED)
+    lp, holderTokens, providers, cTokens = holderContracts(jointLP, strategies)
+    invest(chain, gov, user, tokens, vaults, strategies, amounts)
+
+    for step in range(N_STATES):
+        part = setMockState(
+            rng, chain, gov, user, vaults, providers, lp, holderTokens, cTokens, jointLP,
+            MockERC20, MockPriceOracle, MockComptroller, MockCToken,
+        )
+        state, views = readChain(jointLP, providers, lp, holderTokens, cTokens)
+        mismatches = diffViews(state, views)
+        assert not mismatches, 'state {0} after setting {1}: {2}'.format(step, part, mismatches)
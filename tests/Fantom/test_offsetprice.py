@@ -3,6 +3,8 @@ from brownie import interface, Contract, accounts
 import pytest
 import time 
 
+from scripts.batcher import ActionBatch
+
 
 def calculateLosses(tokens, strategies,amounts):
     losses = []
@@ -16,14 +18,14 @@ def calculateLosses(tokens, strategies,amounts):
 
 
 
-def offSetDebtRatio(gov, whales, tokens, conf, Contract, tokenIndex, swapPct):
+def offSetDebtRatio(gov, whales, tokens, conf, contractAt, tokenIndex, swapPct):
     # use other AMM's LP to force some swaps 
     solidRouter = '0xa38cd27185a464914D3046f0AB9d43356B34829D'
 
     if conf['lpType'] == 'uniV2' :
-        router = Contract(conf['router'])
+        router = contractAt(conf['router'])
     else : 
-        router = Contract(solidRouter)
+        router = contractAt(solidRouter)
 
     whale = whales[tokenIndex]
     token = tokens[tokenIndex]
@@ -44,34 +46,34 @@ def offSetDebtRatio(gov, whales, tokens, conf, Contract, tokenIndex, swapPct):
 
 
 def test_rebalanceDebtA(
-    chain, accounts, whales, Contract, gov, tokens, vaults, strategies, jointLP, user, strategist, amounts, RELATIVE_APPROX, conf
+    chain, accounts, whales, contractAt, gov, tokens, vaults, strategies, jointLP, user, strategist, amounts, RELATIVE_APPROX, conf, batcher
 ) : 
-    # Deposit to the vault
+    # Deposit to the vaults in one transaction
+    batch = ActionBatch(batcher)
     for i in range(len(tokens)) : 
-        token = tokens[i]
-        vault = vaults[i]
-        strategy = strategies[i]
-        amount = amounts[i]
-        token.approve(vault.address, amount, {"from": user})
-        vault.deposit(amount, {"from": user})
-        assert token.balanceOf(vault.address) == amount
-        
-        # harvest
+        batch.deposit(user, tokens[i], vaults[i], amounts[i])
+    batch.execute({"from": user})
+    for i in range(len(tokens)) : 
+        assert tokens[i].balanceOf(vaults[i].address) == amounts[i]
+
+    # harvest both in another
     chain.sleep(5)
     chain.mine(5)
+    for i in range(len(tokens)) : 
+        batch.harvest(strategies[i])
+    batch.execute({"from": user})
 
     for i in range(len(tokens)) : 
         token = tokens[i]
         vault = vaults[i]
         strategy = strategies[i]
         amount = amounts[i]
-        strategy.harvest()
         strat = strategy
         assert pytest.approx(strategy.estimatedTotalAssets(), rel=RELATIVE_APPROX) == amount
 
     tokenIndex = 0
     swapPct = 0.03
-    offSetDebtRatio(gov, whales, tokens, conf, Contract, tokenIndex, swapPct)
+    offSetDebtRatio(gov, whales, tokens, conf, contractAt, tokenIndex, swapPct)
     chain.sleep(5)
     chain.mine(5)
     #assert False
@@ -100,34 +102,34 @@ def test_rebalanceDebtA(
     print('Debt Ratio B :  {0}'.format(debtRatio1))
 
 def test_rebalanceDebtB(
-    chain, accounts, whales, Contract, gov, tokens, vaults, strategies, jointLP, user, strategist, amounts, RELATIVE_APPROX, conf
+    chain, accounts, whales, contractAt, gov, tokens, vaults, strategies, jointLP, user, strategist, amounts, RELATIVE_APPROX, conf, batcher
 ) : 
-    # Deposit to the vault
+    # Deposit to the vaults in one transaction
+    batch = ActionBatch(batcher)
     for i in range(len(tokens)) : 
-        token = tokens[i]
-        vault = vaults[i]
-        strategy = strategies[i]
-        amount = amounts[i]
-        token.approve(vault.address, amount, {"from": user})
-        vault.deposit(amount, {"from": user})
-        assert token.balanceOf(vault.address) == amount
-        
-        # harvest
+        batch.deposit(user, tokens[i], vaults[i], amounts[i])
+    batch.execute({"from": user})
+    for i in range(len(tokens)) : 
+        assert tokens[i].balanceOf(vaults[i].address) == amounts[i]
+
+    # harvest both in another
     chain.sleep(5)
     chain.mine(5)
+    for i in range(len(tokens)) : 
+        batch.harvest(strategies[i])
+    batch.execute({"from": user})
 
     for i in range(len(tokens)) : 
         token = tokens[i]
         vault = vaults[i]
         strategy = strategies[i]
         amount = amounts[i]
-        strategy.harvest()
         strat = strategy
         assert pytest.approx(strategy.estimatedTotalAssets(), rel=RELATIVE_APPROX) == amount
 
     tokenIndex = 1
     swapPct = 0.03
-    offSetDebtRatio(gov, whales, tokens, conf, Contract, tokenIndex, swapPct)
+    offSetDebtRatio(gov, whales, tokens, conf, contractAt, tokenIndex, swapPct)
     chain.sleep(5)
     chain.mine(5)
     #assert False
@@ -158,34 +160,34 @@ def test_rebalanceDebtB(
 
 
 def test_operation_offsetA(
-    chain, accounts, whales, Contract, gov, tokens, vaults, strategies, jointLP, user, strategist, amounts, RELATIVE_APPROX, conf
+    chain, accounts, whales, contractAt, gov, tokens, vaults, strategies, jointLP, user, strategist, amounts, RELATIVE_APPROX, conf, batcher
 ):
-    # Deposit to the vault
+    # Deposit to the vaults in one transaction
+    batch = ActionBatch(batcher)
     for i in range(len(tokens)) : 
-        token = tokens[i]
-        vault = vaults[i]
-        strategy = strategies[i]
-        amount = amounts[i]
-        token.approve(vault.address, amount, {"from": user})
-        vault.deposit(amount, {"from": user})
-        assert token.balanceOf(vault.address) == amount
-        
-        # harvest
+        batch.deposit(user, tokens[i], vaults[i], amounts[i])
+    batch.execute({"from": user})
+    for i in range(len(tokens)) : 
+        assert tokens[i].balanceOf(vaults[i].address) == amounts[i]
+
+    # harvest both in another
     chain.sleep(5)
     chain.mine(5)
+    for i in range(len(tokens)) : 
+        batch.harvest(strategies[i])
+    batch.execute({"from": user})
 
     for i in range(len(tokens)) : 
         token = tokens[i]
         vault = vaults[i]
         strategy = strategies[i]
         amount = amounts[i]
-        strategy.harvest()
         strat = strategy
         assert pytest.approx(strategy.estimatedTotalAssets(), rel=RELATIVE_APPROX) == amount
 
     tokenIndex = 0
     swapPct = 0.02
-    offSetDebtRatio(gov, whales, tokens, conf, Contract, tokenIndex, swapPct)
+    offSetDebtRatio(gov, whales, tokens, conf, contractAt, tokenIndex, swapPct)
     chain.sleep(5)
     chain.mine(5)
     #assert False
@@ -210,7 +212,7 @@ def test_operation_offsetA(
 
 
 def test_reduce_debt_offsetA(
-    chain, accounts, whales, Contract, gov, tokens, vaults, strategies, jointLP, user, strategist, amounts, RELATIVE_APPROX, conf
+    chain, accounts, whales, contractAt, gov, tokens, vaults, strategies, jointLP, user, strategist, amounts, RELATIVE_APPROX, conf
 ):
     # Deposit to the vault
     for i in range(len(tokens)) : 
@@ -224,7 +226,7 @@ def test_reduce_debt_offsetA(
         
     tokenIndex = 0
     swapPct = 0.02
-    offSetDebtRatio(gov, whales, tokens, conf, Contract, tokenIndex, swapPct)
+    offSetDebtRatio(gov, whales, tokens, conf, contractAt, tokenIndex, swapPct)
     chain.sleep(5)
     chain.mine(5)
 
@@ -260,34 +262,34 @@ def test_reduce_debt_offsetA(
 
 
 def test_operation_offsetB(
-    chain, accounts, whales, Contract, gov, tokens, vaults, strategies, jointLP, user, strategist, amounts, RELATIVE_APPROX, conf
+    chain, accounts, whales, contractAt, gov, tokens, vaults, strategies, jointLP, user, strategist, amounts, RELATIVE_APPROX, conf, batcher
 ):
-    # Deposit to the vault
+    # Deposit to the vaults in one transaction
+    batch = ActionBatch(batcher)
     for i in range(len(tokens)) : 
-        token = tokens[i]
-        vault = vaults[i]
-        strategy = strategies[i]
-        amount = amounts[i]
-        token.approve(vault.address, amount, {"from": user})
-        vault.deposit(amount, {"from": user})
-        assert token.balanceOf(vault.address) == amount
-        
-        # harvest
+        batch.deposit(user, tokens[i], vaults[i], amounts[i])
+    batch.execute({"from": user})
+    for i in range(len(tokens)) : 
+        assert tokens[i].balanceOf(vaults[i].address) == amounts[i]
+
+    # harvest both in another
     chain.sleep(5)
     chain.mine(5)
+    for i in range(len(tokens)) : 
+        batch.harvest(strategies[i])
+    batch.execute({"from": user})
 
     for i in range(len(tokens)) : 
         token = tokens[i]
         vault = vaults[i]
         strategy = strategies[i]
         amount = amounts[i]
-        strategy.harvest()
         strat = strategy
         assert pytest.approx(strategy.estimatedTotalAssets(), rel=RELATIVE_APPROX) == amount
 
     tokenIndex = 1
     swapPct = 0.02
-    offSetDebtRatio(gov, whales, tokens, conf, Contract, tokenIndex, swapPct)
+    offSetDebtRatio(gov, whales, tokens, conf, contractAt, tokenIndex, swapPct)
     chain.sleep(5)
     chain.mine(5)
     #assert False
@@ -312,7 +314,7 @@ def test_operation_offsetB(
 
 
 def test_reduce_debt_offsetB(
-    chain, accounts, whales, Contract, gov, tokens, vaults, strategies, jointLP, user, strategist, amounts, RELATIVE_APPROX, conf
+    chain, accounts, whales, contractAt, gov, tokens, vaults, strategies, jointLP, user, strategist, amounts, RELATIVE_APPROX, conf
 ):
     # Deposit to the vault
     for i in range(len(tokens)) : 
@@ -326,7 +328,7 @@ def test_reduce_debt_offsetB(
         
     tokenIndex = 1
     swapPct = 0.02
-    offSetDebtRatio(gov, whales, tokens, conf, Contract, tokenIndex, swapPct)
+    offSetDebtRatio(gov, whales, tokens, conf, contractAt, tokenIndex, swapPct)
     chain.sleep(5)
     chain.mine(5)
 
@@ -369,34 +371,34 @@ def test_reduce_debt_offsetB(
 
 
 def test_price_offset_checks_A(
-    chain, accounts, whales, Contract, gov, tokens, vaults, strategies, jointLP, user, strategist, amounts, RELATIVE_APPROX, conf
+    chain, accounts, whales, contractAt, gov, tokens, vaults, strategies, jointLP, user, strategist, amounts, RELATIVE_APPROX, conf, batcher
 ) : 
-    # Deposit to the vault
+    # Deposit to the vaults in one transaction
+    batch = ActionBatch(batcher)
     for i in range(len(tokens)) : 
-        token = tokens[i]
-        vault = vaults[i]
-        strategy = strategies[i]
-        amount = amounts[i]
-        token.approve(vault.address, amount, {"from": user})
-        vault.deposit(amount, {"from": user})
-        assert token.balanceOf(vault.address) == amount
-        
-        # harvest
+        batch.deposit(user, tokens[i], vaults[i], amounts[i])
+    batch.execute({"from": user})
+    for i in range(len(tokens)) : 
+        assert tokens[i].balanceOf(vaults[i].address) == amounts[i]
+
+    # harvest both in another
     chain.sleep(5)
     chain.mine(5)
+    for i in range(len(tokens)) : 
+        batch.harvest(strategies[i])
+    batch.execute({"from": user})
 
     for i in range(len(tokens)) : 
         token = tokens[i]
         vault = vaults[i]
         strategy = strategies[i]
         amount = amounts[i]
-        strategy.harvest()
         strat = strategy
         assert pytest.approx(strategy.estimatedTotalAssets(), rel=RELATIVE_APPROX) == amount
 
     tokenIndex = 0
     swapPct = 0.1
-    offSetDebtRatio(gov, whales, tokens, conf, Contract, tokenIndex, swapPct)
+    offSetDebtRatio(gov, whales, tokens, conf, contractAt, tokenIndex, swapPct)
     chain.sleep(5)
     chain.mine(5)
     #assert False
@@ -463,34 +465,34 @@ def test_price_offset_checks_A(
 
 
 def test_price_offset_checks_B(
-    chain, accounts, whales, Contract, gov, tokens, vaults, strategies, jointLP, user, strategist, amounts, RELATIVE_APPROX, conf
+    chain, accounts, whales, contractAt, gov, tokens, vaults, strategies, jointLP, user, strategist, amounts, RELATIVE_APPROX, conf, batcher
 ) : 
-    # Deposit to the vault
+    # Deposit to the vaults in one transaction
+    batch = ActionBatch(batcher)
     for i in range(len(tokens)) : 
-        token = tokens[i]
-        vault = vaults[i]
-        strategy = strategies[i]
-        amount = amounts[i]
-        token.approve(vault.address, amount, {"from": user})
-        vault.deposit(amount, {"from": user})
-        assert token.balanceOf(vault.address) == amount
-        
-        # harvest
+        batch.deposit(user, tokens[i], vaults[i], amounts[i])
+    batch.execute({"from": user})
+    for i in range(len(tokens)) : 
+        assert tokens[i].balanceOf(vaults[i].address) == amounts[i]
+
+    # harvest both in another
     chain.sleep(5)
     chain.mine(5)
+    for i in range(len(tokens)) : 
+        batch.harvest(strategies[i])
+    batch.execute({"from": user})
 
     for i in range(len(tokens)) : 
         token = tokens[i]
         vault = vaults[i]
         strategy = strategies[i]
         amount = amounts[i]
-        strategy.harvest()
         strat = strategy
         assert pytest.approx(strategy.estimatedTotalAssets(), rel=RELATIVE_APPROX) == amount
 
     tokenIndex = 1
     swapPct = 0.15
-    offSetDebtRatio(gov, whales, tokens, conf, Contract, tokenIndex, swapPct)
+    offSetDebtRatio(gov, whales, tokens, conf, contractAt, tokenIndex, swapPct)
     chain.sleep(5)
     chain.mine(5)
     #assert False
@@ -570,7 +572,7 @@ def test_migration_offsetA(
     user,
     RELATIVE_APPROX,
     whales,
-    Contract
+    contractAt
 ):
     # Deposit to the vault and harvest
     for i in range(len(tokens)) : 
@@ -602,7 +604,7 @@ def test_migration_offsetA(
     tokenIndex = 0
     swapPct = 0.02
 
-    offSetDebtRatio(gov, whales, tokens, conf, Contract, tokenIndex, swapPct)
+    offSetDebtRatio(gov, whales, tokens, conf, contractAt, tokenIndex, swapPct)
     jointLP.setPriceSource(False, 500, {'from' : gov})
 
     chain.sleep(1)
@@ -632,7 +634,7 @@ def test_migration_offsetB(
     user,
     RELATIVE_APPROX,
     whales,
-    Contract
+    contractAt
 ):
     # Deposit to the vault and harvest
     for i in range(len(tokens)) : 
@@ -664,7 +666,7 @@ def test_migration_offsetB(
     tokenIndex = 1
     swapPct = 0.02
 
-    offSetDebtRatio(gov, whales, tokens, conf, Contract, tokenIndex, swapPct)
+    offSetDebtRatio(gov, whales, tokens, conf, contractAt, tokenIndex, swapPct)
     jointLP.setPriceSource(False, 500, {'from' : gov})
 
     chain.sleep(1)
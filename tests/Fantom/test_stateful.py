@@ -0,0 +1,113 @@
+import pytest
+from brownie import chain, multicall
+from brownie.test import strategy
+
+from jointsim.differential import modelFromState
+from test_model_diff import holderContracts, readChain
+from test_offsetprice import offSetDebtRatio
+
+# local chains only: every example reverts to the snapshot taken after __init__
+SETTINGS = {'max_examples': 200, 'stateful_step_count': 15}
+MAX_SWAP = 0.02
+
+
+class JointStateMachine:
+    st_index = strategy('uint8', max_value=1)
+    st_pct = strategy('decimal', min_value='0.01', max_value='1', places=2)
+    st_swap = strategy('decimal', min_value='0.001', max_value=str(MAX_SWAP), places=3)
+    st_sleep = strategy('uint32', min_value=1, max_value=3 * 86400)
+
+    def __init__(cls, fixtures):
+        cls.fixtures = fixtures
+        for name, value in fixtures.items() :
+            setattr(cls, name, value)
+        # withdrawals would revert once the pair drifts from the mock oracle
+        cls.jointLP.setPriceSource(False, 500, {'from' : cls.gov})
+        # batches the state reads of the model check
+        multicall.deploy({'from' : cls.user})
+
+    def setup(self):
+        self.jointLP = self.fixtures['jointLP']
+        self.strategies = list(self.fixtures['strategies'])
+
+    def rule_deposit(self, i='st_index', pct='st_pct'):
+        amount = int(self.tokens[i].balanceOf(self.user) * pct)
+        if amount > 0 :
+            self.tokens[i].approve(self.vaults[i], amount, {'from' : self.user})
+            self.vaults[i].deposit(amount, {'from' : self.user})
+
+    def rule_harvest(self, i='st_index', seconds='st_sleep'):
+        chain.sleep(seconds)
+        chain.mine(1)
+        self.strategies[i].harvest({'from' : self.gov})
+
+    def rule_swap(self, i='st_index', pct='st_swap'):
+        offSetDebtRatio(self.gov, self.whales, self.tokens, self.conf, self.contractAt, i, float(pct))
+
+    def rule_rebalanceDebt(self):
+        # the debt ratios divide by the LP held, after withdrawAllFromJoint they revert
+        if self.jointLP.lpBalance() > 0 and max(self.jointLP.calcDebtRatioToken(0), self.jointLP.calcDebtRatioToken(1)) > self.jointLP.debtUpper() :
+            self.jointLP.rebalanceDebt({'from' : self.keeper})
+
+    def rule_withdraw(self, i='st_index', pct='st_pct'):
+        shares = int(self.vaults[i].balanceOf(self.user) * pct)
+        if shares > 0 :
+            self.vaults[i].withdraw(shares, self.user, 10_000, {'from' : self.user})
+
+    def rule_withdrawAllFromJoint(self):
+        self.jointLP.withdrawAllFromJoint({'from' : self.gov})
+
+    def rule_migrate(self):
+        conf = self.conf
+        newJointLP = self.jointLP_contract.deploy(conf['LP'], conf['farm'], conf['farmPID'], conf['router'], conf['harvest_tokens'][0], {'from' : self.gov})
+        newJointLP.setKeeper(self.keeper, {'from' : self.gov})
+        newJointLP.setPriceSource(False, 500, {'from' : self.gov})
+        newStrategies = []
+        for i in range(len(self.tokens)) :
+            newStrategy = self.strategy_contract.deploy(self.vaults[i], newJointLP, self.ibTokens[i], conf['comptroller'], conf['router'], conf['compToken'], {'from' : self.strategist})
+            insurance = self.StrategyInsurance.deploy(newStrategy, {'from' : self.strategist})
+            newStrategy.setInsurance(insurance, {'from' : self.gov})
+            newStrategies = newStrategies + [newStrategy]
+        newJointLP.initaliseStrategies(newStrategies, {'from' : self.gov})
+        for i in range(len(self.tokens)) :
+            self.vaults[i].migrateStrategy(self.strategies[i], newStrategies[i], {'from' : self.gov})
+        self.jointLP = newJointLP
+        self.strategies = newStrategies
+
+    def invariant_debtJoint(self):
+        debts = [strategy.debtJoint() for strategy in self.strategies]
+        # both sides are provided and withdrawn together
+        assert (debts[0] > 0) == (debts[1] > 0)
+        if self.jointLP.lpBalance() == 0 :
+            assert debts == [0, 0]
+
+    def invariant_estimatedTotalAssets(self):
+        # jointsim prices the joint's impermanent loss and the pair fee of the rebalance
+        # swap with the contracts' integer maths, so the loss a provider shows against its
+        # debt has to be the model's to the wei, with no rounding allowance
+        lp, holderTokens, providers, cTokens = holderContracts(self.jointLP, self.strategies)
+        state, _ = readChain(self.jointLP, providers, lp, holderTokens, cTokens, views=self.jointLP.lpBalance() > 0)
+        _, models = modelFromState(state)
+        for strategy, model in zip(providers, models) :
+            assets = strategy.estimatedTotalAssets()
+            assert assets == strategy.balanceLend() + strategy.balanceJoint() + strategy.balanceOfWant()
+            assert assets == model.estimatedTotalAssets()
+
+    def invariant_vaultAccounting(self):
+        for token, vault, strategy in zip(self.tokens, self.vaults, self.strategies) :
+            assert vault.totalAssets() == token.balanceOf(vault) + vault.totalDebt()
+            assert vault.totalDebt() == vault.strategies(strategy).dict()['totalDebt']
+
+
+def test_joint_lifecycle(
+    state_machine, local, conf, gov, user, strategist, keeper, whales, amounts, tokens, vaults, strategies, jointLP,
+    ibTokens, strategy_contract, jointLP_contract, StrategyInsurance, contractAt
+):
+    if not local :
+        pytest.skip('runs on the local mock stack only')
+    fixtures = dict(
+        conf=conf, gov=gov, user=user, strategist=strategist, keeper=keeper, whales=whales, tokens=tokens,
+        vaults=vaults, strategies=strategies, jointLP=jointLP, ibTokens=ibTokens, strategy_contract=strategy_contract,
+        jointLP_contract=jointLP_contract, StrategyInsurance=StrategyInsurance, contractAt=contractAt,
+    )
+    state_machine(JointStateMachine, fixtures, settings=SETTINGS)
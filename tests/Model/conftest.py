@@ -0,0 +1,20 @@
+import pytest
+
+from jointsim import JointLPHolderUniV2, UniV2Pair
+
+
+@pytest.fixture
+def pair():
+    # FRAX / WFTM with WFTM at 0.25 FRAX
+    yield UniV2Pair(1_000_000 * 10 ** 18, 4_000_000 * 10 ** 18, 2_000_000 * 10 ** 18)
+
+
+@pytest.fixture
+def holder(pair):
+    # providers added 10k FRAX + 40k WFTM, all of it staked in the farm
+    yield JointLPHolderUniV2(
+        pair,
+        lpPooled=20_000 * 10 ** 18,
+        debtJoint=(10_000 * 10 ** 18, 40_000 * 10 ** 18),
+        oraclePrices=(10 ** 18, 25 * 10 ** 16),
+    )
@@ -0,0 +1,86 @@
+import math
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from jointsim.backtest import RESERVES_DTYPE, backtest, openReserves, writeReserves
+
+
+def _history(n, seed=0):
+    rng = random.Random(seed)
+    reserve0 = reserve1 = 10 ** 24
+    rows = []
+    for block in range(n):
+        k = reserve0 * reserve1
+        price = reserve1 / reserve0 * math.exp(rng.gauss(0, 0.003))
+        reserve1 = int(math.sqrt(k * price))
+        reserve0 = k // reserve1
+        rows.append(
+            (1_000 + block, 1_600_000_000 + block, reserve0, reserve1, 10 ** 24)
+        )
+    return rows
+
+
+def test_reserves_roundtrip(tmp_path):
+    path = str(tmp_path / "reserves.npy")
+    rows = [(1, 2, 2 ** 112 - 1, 3, 2 ** 120 + 5)]
+    writeReserves(path, rows)
+    reserves = openReserves(path)
+    assert reserves.dtype == RESERVES_DTYPE
+    assert (
+        int(reserves[0]["reserve0"][0]) + (int(reserves[0]["reserve0"][1]) << 64)
+        == 2 ** 112 - 1
+    )
+    assert (
+        int(reserves[0]["totalSupply"][0]) + (int(reserves[0]["totalSupply"][1]) << 64)
+        == 2 ** 120 + 5
+    )
+
+    with pytest.raises(ValueError):
+        writeReserves(path, [(1, 2, 3, 4, 2 ** 128)])
+
+
+def test_backtest_rebalances(tmp_path):
+    path = str(tmp_path / "reserves.npy")
+    writeReserves(path, _history(5_000))
+    result = backtest(path, chunkSize=512)
+    assert result["rows"] == 5_000
+    assert result["rebalances"] > 0
+    assert result["rebalanceBlocks"] == sorted(result["rebalanceBlocks"])
+    assert result["swapCost"] > 0
+    assert result["il"] < 0
+    # rebalancing keeps the debt ratios within debtUpper
+    assert max(result["debtRatio"]) < 10_250 + 500
+    assert result["failedRebalances"] == 0
+
+
+def test_backtest_readds_returned_tokens(tmp_path):
+    # a random walk wide enough to need hundreds of rebalances
+    path = str(tmp_path / "reserves.npy")
+    writeReserves(path, _history(50_000, seed=1))
+    result = backtest(path)
+    assert result["rebalances"] > 100
+    assert result["failedRebalances"] == 0
+    assert result["exitBlock"] is None
+    assert result["lpRetained"] > 0.5
+    assert max(result["debtRatio"]) < 10_250 + 500
+
+
+def test_backtest_window_matches(tmp_path):
+    path = str(tmp_path / "reserves.npy")
+    writeReserves(path, _history(3_000, seed=3))
+    assert backtest(path, window=1) == backtest(path, window=1 << 20)
+
+
+def test_backtest_chunking_matches(tmp_path):
+    path = str(tmp_path / "reserves.npy")
+    writeReserves(path, _history(3_000, seed=3))
+    assert backtest(path, chunkSize=100) == backtest(path, chunkSize=1 << 20)
+
+
+def test_no_rebalance_below_debt_upper(tmp_path):
+    path = str(tmp_path / "reserves.npy")
+    writeReserves(path, _history(3_000, seed=3))
+    assert backtest(path, jointParams=(9900, 50, 10000, 100_000))["rebalances"] == 0
@@ -0,0 +1,61 @@
+import pytest
+
+from jointsim.bankrun import DEFAULT_RUN, runBankRuns, runSequence
+from jointsim.montecarlo import DEFAULT_SCENARIO, deploy
+from jointsim.safemath import Revert
+
+RELATIVE_APPROX = 1e-2
+
+
+@pytest.fixture
+def stack():
+    yield deploy("FRAXFTMSpiritLQDR", dict(DEFAULT_SCENARIO, price=0.25))
+
+
+def test_withdraw(stack):
+    holder, strategies, deposits = stack
+    vault = strategies[0].vault
+    shares = vault.totalSupply // 10
+    value, loss = vault.withdraw(shares, 10000)
+    assert pytest.approx(value + loss, rel=RELATIVE_APPROX) == deposits[0] // 10
+    assert vault.totalSupply == 9 * shares
+    assert vault.totalDebt == deposits[0] - value - loss
+    # the other provider got its share of the joint back
+    assert strategies[1].balanceOfWant() > 0
+
+
+def test_withdraw_max_loss(stack):
+    holder, strategies, deposits = stack
+    vault = strategies[0].vault
+    state = [model._state() for model in holder._models()]
+    with pytest.raises(Revert):
+        # the lend dust and the joint fee cost more than 0 bps
+        vault.withdraw(vault.totalSupply // 2, 0)
+    assert [model._state() for model in holder._models()] == state
+
+
+def test_full_exit_cliff(stack):
+    holder, strategies, deposits = stack
+    strategy = strategies[0]
+    strategy.vault.withdraw(strategy.vault.totalSupply * 99 // 100, 10000)
+    assert strategy.jointExits == 1
+    assert strategy.debtJoint == 0
+    assert holder.lpBalance() == 0
+
+
+def test_run_sequence():
+    run = dict(DEFAULT_RUN, depositors=10)
+    result = runSequence(
+        "FRAXFTMSpiritLQDR", dict(DEFAULT_SCENARIO, price=0.25), run, 0
+    )
+    assert result["withdrawals"] == 20
+    assert result["rebalances"] > 0
+    # IL from a 20% move is realised by whoever leaves
+    assert result["loss0"] > 0 and result["loss1"] > 0
+
+
+def test_run_bank_runs():
+    results = runBankRuns(
+        "USDCFTMSpookyLQDR", None, {"depositors": 5}, nSequences=4, processes=2
+    )
+    assert [result["seed"] for result in results] == [0, 1, 2, 3]
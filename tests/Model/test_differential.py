@@ -0,0 +1,43 @@
+from jointsim.differential import diffViews, modelFromState, modelViews
+
+
+def stateOf(holder):
+    return {
+        "reserves": (holder.pair.reserve0, holder.pair.reserve1),
+        "totalSupply": holder.pair.totalSupply,
+        "lpPooled": holder.lpPooled,
+        "lpUnpooled": holder.lpUnpooled,
+        "balances": list(holder.balances),
+        "token0TotalSupply": holder.token0TotalSupply,
+        "strategies": [
+            {
+                "debtJoint": holder.debtJoint[i],
+                "oraclePrice": holder.oraclePrices[i],
+                "wantBalance": 10 ** 18,
+                "cTokenBalance": 5 * 10 ** 18,
+                "exchangeRate": 2 * 10 ** 17,
+            }
+            for i in range(2)
+        ],
+    }
+
+
+def test_model_from_state(holder):
+    state = stateOf(holder)
+    rebuilt, strategies = modelFromState(state)
+    assert rebuilt.calcDebtRatio() == holder.calcDebtRatio()
+    assert strategies[0].balanceLend() == 10 ** 18
+    assert (
+        strategies[1].estimatedTotalAssets()
+        == 2 * 10 ** 18 + strategies[1].balanceJoint()
+    )
+
+
+def test_diff_views(holder):
+    state = stateOf(holder)
+    chainViews = modelViews(state)
+    assert diffViews(state, chainViews) == {}
+
+    chainViews["calculateProfit"] = [list(chainViews["calculateProfit"][0]), [0, 1]]
+    mismatches = diffViews(state, chainViews)
+    assert list(mismatches) == ["calculateProfit"]
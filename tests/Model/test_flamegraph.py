@@ -0,0 +1,44 @@
+from scripts.flamegraph import byContract, byFunction, collapse, readFolded, writeFolded
+
+
+def step(depth, jumpDepth, fn, gas, gasCost, op="PUSH1"):
+    return {
+        "depth": depth,
+        "jumpDepth": jumpDepth,
+        "fn": fn,
+        "gas": gas,
+        "gasCost": gasCost,
+        "op": op,
+    }
+
+
+# harvest jumps into _harvestRewards, which calls the holder and then stops
+TRACE = [
+    step(0, 0, "Strategy.harvest", 1000, 3),
+    step(0, 1, "Strategy._harvestRewards", 997, 3),
+    # the CALL's gasCost includes the gas it forwards, it isn't used
+    step(0, 1, "Strategy._harvestRewards", 994, 900, "CALL"),
+    step(1, 0, "jointLPHolderUniV2.harvestFromProvider", 800, 5),
+    step(1, 0, "jointLPHolderUniV2.harvestFromProvider", 795, 2, "RETURN"),
+    step(0, 0, "Strategy.harvest", 880, 0, "STOP"),
+]
+
+
+def test_collapse(tmp_path):
+    stacks = collapse(TRACE, gasUsed=21_150)
+    assert stacks == {
+        "Strategy.harvest": 3,
+        # the call costs 994 - 880 less the 7 gas spent in the holder
+        "Strategy.harvest;Strategy._harvestRewards": 3 + 107,
+        "Strategy.harvest;Strategy._harvestRewards;jointLPHolderUniV2.harvestFromProvider": 7,
+        "Strategy.harvest;[intrinsic]": 21_030,
+    }
+
+    path = str(tmp_path / "flame" / "harvest.folded")
+    writeFolded(stacks, path)
+    assert readFolded(path) == stacks
+
+    inclusive, own = byContract(stacks)
+    assert inclusive == {"Strategy": 21_150, "jointLPHolderUniV2": 7}
+    assert own == {"Strategy": 113, "jointLPHolderUniV2": 7, "[intrinsic]": 21_030}
+    assert byFunction(stacks)["Strategy._harvestRewards"] == 110
@@ -0,0 +1,78 @@
+import json
+import os
+
+import pytest
+
+from jointsim.gas import (
+    ACTIONS,
+    GAS_USED,
+    UnmeasuredGas,
+    keeperGas,
+    measuredGas,
+    pathHops,
+)
+from jointsim.montecarlo import DEFAULT_SCENARIO, runScenario
+from jointsim.pairs import PAIRS
+from jointsim.rewards import FARMS
+
+
+def test_table_covers_every_farm():
+    for pairName, pairConf in PAIRS.items():
+        assert pairConf["farm"] in FARMS
+        for action in ACTIONS:
+            assert keeperGas(pairName, action, estimate=True) > 0
+    for farm in GAS_USED.values():
+        for action in ACTIONS:
+            assert farm[action][3] >= farm[action][2]
+
+
+def test_path_hops():
+    # FRAX isn't WFTM, so LQDR is sold through WFTM, the pair tokens swap directly
+    assert pathHops("FRAXFTMSpiritLQDR", "harvestRewards") == 3
+    assert pathHops("FRAXFTMSpiritLQDR", "rebalanceDebt") == 2
+
+
+def test_net_return_subtracts_gas():
+    scenario = dict(DEFAULT_SCENARIO, price=0.25, days=30, gasEstimates=True)
+    free = runScenario("FRAXFTMSpiritLQDR", scenario, 0)
+    paid = runScenario("FRAXFTMSpiritLQDR", dict(scenario, gasPrice=300), 0)
+    assert free["keeperGas"] == paid["keeperGas"] > 0
+    for i in range(2):
+        assert free["netReturn{0}".format(i)] == free["return{0}".format(i)]
+        assert paid["gasCost{0}".format(i)] > 0
+        assert paid["netReturn{0}".format(i)] == pytest.approx(
+            free["return{0}".format(i)] - paid["gasCost{0}".format(i)]
+        )
+
+
+def test_measured_gas_overrides_estimate(tmp_path):
+    path = str(tmp_path / "gas_baseline.json")
+    estimate = keeperGas("FRAXFTMSpiritLQDR", "rebalanceDebt", path, estimate=True)
+    with pytest.raises(UnmeasuredGas, match="GAS_BASELINE_UPDATE=1"):
+        keeperGas("FRAXFTMSpiritLQDR", "rebalanceDebt", path)
+
+    baseline = {
+        "jointLPHolderUniV2": {
+            "FRAXFTMSpiritLQDR": {"development": {"rebalanceDebt": 200_000}}
+        }
+    }
+    with open(path, "w") as f:
+        json.dump(baseline, f)
+    # the mocks' gas until a fork has been benchmarked
+    assert measuredGas("FRAXFTMSpiritLQDR", "rebalanceDebt", path) == 200_000
+
+    baseline["jointLPHolderUniV2"]["FRAXFTMSpiritLQDR"]["ftm-main-fork"] = {
+        "rebalanceDebt": 412_345
+    }
+    with open(path, "w") as f:
+        json.dump(baseline, f)
+    # the baseline is cached per mtime, make sure this write gets a new one
+    os.utime(path, (0, 1))
+    assert measuredGas("FRAXFTMSpiritLQDR", "rebalanceDebt", path) == 412_345
+    assert keeperGas("FRAXFTMSpiritLQDR", "rebalanceDebt", path) == 412_345
+    assert (
+        keeperGas("FRAXFTMSpiritLQDR", "rebalanceDebt", path, estimate=True) == 412_345
+    )
+    assert measuredGas("FRAXFTMSpiritLQDR", "harvest", path) is None
+    assert keeperGas("FRAXFTMSpiritLQDR", "harvest", path, estimate=True) > 0
+    assert estimate == GAS_USED["LQDRMasterChef"]["rebalanceDebt"][2]
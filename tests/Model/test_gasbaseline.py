@@ -0,0 +1,53 @@
+import json
+import os
+
+from scripts.gasbaseline import GasBaseline, regressed
+
+
+def test_baseline(tmp_path):
+    path = str(tmp_path / "gas_baseline.json")
+    key = ("jointLPHolderUniV2", "FRAXFTMSpiritLQDR", "development")
+    veloKey = ("jointLPHolderVelo", "USDCWETHVELO", "development")
+
+    # a normal run never writes, and a path without a baseline only fails when strict
+    baseline = GasBaseline(path)
+    assert baseline.record(key, "rebalanceDebt", 400_000) is None
+    assert baseline.check(key, "rebalanceDebt", 400_000) is None
+    assert "GAS_BASELINE_UPDATE=1" in baseline.missing(key, "rebalanceDebt")
+    strict = GasBaseline(path, strict=True)
+    assert "GAS_BASELINE_UPDATE=1" in strict.check(key, "rebalanceDebt", 400_000)
+    baseline.save()
+    assert not os.path.exists(path)
+
+    updating = GasBaseline(path, update=True)
+    assert updating.check(key, "rebalanceDebt", 400_000) is None
+    updating.save()
+    # a second suite updating later merges with the file on disk
+    other = GasBaseline(path, update=True)
+    other.check(veloKey, "rebalanceDebt", 500_000)
+    other.save()
+    entries = json.load(open(path))
+    assert entries["jointLPHolderUniV2"]["FRAXFTMSpiritLQDR"]["development"] == {
+        "rebalanceDebt": 400_000
+    }
+    assert entries["jointLPHolderVelo"]["USDCWETHVELO"]["development"] == {
+        "rebalanceDebt": 500_000
+    }
+
+    checking = GasBaseline(path, strict=True)
+    assert checking.missing(key, "rebalanceDebt") is None
+    assert checking.check(key, "rebalanceDebt", 408_000) is None
+    assert "more than 2% above 400000" in checking.check(key, "rebalanceDebt", 450_000)
+    checking.save()
+    assert GasBaseline(path).expected(key, "rebalanceDebt") == 400_000
+
+    rewriting = GasBaseline(path, update=True)
+    assert rewriting.record(key, "rebalanceDebt", 390_000) == 400_000
+    rewriting.save()
+    assert GasBaseline(path).expected(key, "rebalanceDebt") == 390_000
+
+
+def test_regressed():
+    assert not regressed(400_000, 408_000)
+    assert regressed(400_000, 408_001)
+    assert not regressed(400_000, 300_000)
@@ -0,0 +1,87 @@
+import pytest
+
+from jointsim import Revert
+
+
+def test_views_at_entry(holder):
+    assert holder.balanceToken(0) == 10_000 * 10 ** 18
+    assert holder.balanceToken(1) == 40_000 * 10 ** 18
+    assert holder.calcDebtRatio() == (10_000, 10_000)
+    assert holder.calculateProfit(0) == (0, 0)
+    assert holder.calculateProfit(1) == (0, 0)
+    assert holder.calcPriceDiff() == 10_000
+    assert holder._testPriceSource()
+
+
+def test_convert_truncates(holder):
+    assert holder.convertAtoB(0, 1, 3) == 12
+    assert holder.convertAtoB(1, 0, 3) == 0
+    assert holder.convertAtoBOracle(1, 0, 7) == 1
+
+
+def test_debt_ratio_after_price_move(holder, pair):
+    # someone dumps FRAX into the pair, FRAX provider now owns more FRAX than it is owed
+    pair.swap(30_000 * 10 ** 18, 0)
+    debtRatio0, debtRatio1 = holder.calcDebtRatio()
+    assert debtRatio0 < 10_000 < debtRatio1
+
+    loss0, profit0 = holder.calculateProfit(0)
+    loss1, profit1 = holder.calculateProfit(1)
+    # after the notional rebalance both providers share the IL
+    assert profit0 == 0 and profit1 == 0
+    assert loss0 > 0 and loss1 > 0
+    assert holder.balanceTokenWithRebalance(1) > holder.balanceToken(1)
+
+
+def test_rebalance_debt(holder, pair):
+    pair.swap(50_000 * 10 ** 18, 0)
+    holder.setPriceSource(False, 500)
+    assert holder.calcDebtRatioToken(1) > holder.debtUpper
+
+    debtBefore = list(holder.debtJoint)
+    sent0, sent1 = holder.rebalanceDebt()
+    assert sent0 == 0 and sent1 > 0
+    assert holder.debtJoint[0] == debtBefore[0]
+    assert holder.debtJoint[1] < debtBefore[1]
+    assert holder.balances == [0, 0]
+
+    debtRatio0, debtRatio1 = holder.calcDebtRatio()
+    assert abs(debtRatio0 - debtRatio1) <= holder.bpsRebalanceDiff
+
+
+def test_rebalance_requires_debt_upper(holder, pair):
+    pair.swap(1_000 * 10 ** 18, 0)
+    with pytest.raises(Revert):
+        holder.rebalanceDebt()
+
+
+def test_price_check_blocks_withdraw(holder, pair):
+    pair.swap(50_000 * 10 ** 18, 0)
+    state = [model._state() for model in holder._models()]
+    with pytest.raises(Revert):
+        holder.withdraw(5_000)
+    assert [model._state() for model in holder._models()] == state
+
+    holder.setPriceSource(False, 500)
+    sent0, sent1 = holder.withdraw(5_000)
+    assert sent0 > 0 and sent1 > 0
+    assert holder.debtJoint[0] == 5_000 * 10 ** 18
+    assert holder.debtJoint[1] == 20_000 * 10 ** 18
+
+
+def test_withdraw_all(holder, pair):
+    totalSupply = pair.totalSupply
+    sent0, sent1 = holder.withdrawAllFromJoint()
+    assert holder.lpBalance() == 0
+    assert pair.totalSupply == totalSupply - 20_000 * 10 ** 18
+    assert holder.debtJoint == [0, 0]
+    assert sent0 == 10_000 * 10 ** 18
+    assert sent1 == 40_000 * 10 ** 18
+
+
+def test_withdraw_slippage_revert_rolls_back(holder):
+    holder.slippageAdj = 10_001
+    state = [model._state() for model in holder._models()]
+    with pytest.raises(Revert):
+        holder.withdrawAllFromJointNoRebalance()
+    assert [model._state() for model in holder._models()] == state
@@ -0,0 +1,125 @@
+from scripts.hotspots import analyze, formatReport
+
+STRATEGY = "0x" + "11" * 20
+HOLDER = "0x" + "22" * 20
+PAIR = "0x" + "33" * 20
+
+
+def word(value):
+    return "{0:064x}".format(value)
+
+
+def step(op, depth, address, fn, stack=(), memory=()):
+    return {
+        "op": op,
+        "depth": depth,
+        "address": address,
+        "contractName": fn.split(".")[0],
+        "fn": fn,
+        "stack": [word(value) for value in stack],
+        "memory": list(memory),
+    }
+
+
+def staticCall(address, fn, target, calldata):
+    # STATICCALL pops gas, address, argsOffset, argsLength, retOffset, retLength
+    memory = [calldata.ljust(64 * ((len(calldata) + 63) // 64), "0")]
+    return step(
+        "STATICCALL",
+        1,
+        address,
+        fn,
+        (0, 0, len(calldata) // 2, 0, int(target, 16), 10 ** 6),
+        memory,
+    )
+
+
+GET_RESERVES = "0902f1ac"
+
+
+def test_analyze():
+    trace = [
+        step("SLOAD", 0, STRATEGY, "Strategy.balanceJoint", (3,)),
+        step(
+            "STATICCALL",
+            0,
+            STRATEGY,
+            "Strategy.balanceJoint",
+            (0, 0, 0, 0, int(HOLDER, 16), 10 ** 6),
+        ),
+        step("SLOAD", 1, HOLDER, "jointLPHolderUniV2.calcDebtRatioToken", (7,)),
+        staticCall(HOLDER, "jointLPHolderUniV2.calcDebtRatioToken", PAIR, GET_RESERVES),
+        step("SLOAD", 2, PAIR, "UniswapV2Pair.getReserves", (8,)),
+        step("SLOAD", 1, HOLDER, "jointLPHolderUniV2.calcDebtRatioToken", (7,)),
+        staticCall(HOLDER, "jointLPHolderUniV2.calcDebtRatioToken", PAIR, GET_RESERVES),
+        step("SLOAD", 2, PAIR, "UniswapV2Pair.getReserves", (8,)),
+        step("STOP", 1, HOLDER, "jointLPHolderUniV2.calcDebtRatioToken"),
+    ]
+    report = analyze(trace)
+    assert (report["sloads"], report["uniqueSlots"], report["redundantSloads"]) == (
+        5,
+        3,
+        2,
+    )
+    assert (report["calls"], report["uniqueCalls"], report["redundantCalls"]) == (
+        3,
+        2,
+        1,
+    )
+    assert report["repeatedCalls"] == [
+        {"call": "UniswapV2Pair.getReserves()", "target": PAIR, "count": 2}
+    ]
+    assert [
+        (slot["contract"], slot["slot"], slot["count"])
+        for slot in report["repeatedSlots"]
+    ] == [
+        ("jointLPHolderUniV2", "0x7", 2),
+        ("UniswapV2Pair", "0x8", 2),
+    ]
+    assert report["sloadsByFunction"]["jointLPHolderUniV2.calcDebtRatioToken"] == 2
+    assert (
+        formatReport("balanceJoint", report)[1]
+        == "     2x call  UniswapV2Pair.getReserves()"
+    )
+
+
+def test_gas_by_function():
+    # balanceJoint -> calcDebtRatioToken -> getReserves, one SLOAD in each frame. A call's
+    # gasCost includes the gas it forwards, each frame returns what it didn't use
+    trace = [
+        step("SLOAD", 0, STRATEGY, "Strategy.balanceJoint", (3,)),
+        step(
+            "STATICCALL",
+            0,
+            STRATEGY,
+            "Strategy.balanceJoint",
+            (0, 0, 0, 0, int(HOLDER, 16), 7000),
+        ),
+        step("SLOAD", 1, HOLDER, "jointLPHolderUniV2.calcDebtRatioToken", (7,)),
+        staticCall(HOLDER, "jointLPHolderUniV2.calcDebtRatioToken", PAIR, GET_RESERVES),
+        step("SLOAD", 2, PAIR, "UniswapV2Pair.getReserves", (8,)),
+        step("RETURN", 2, PAIR, "UniswapV2Pair.getReserves"),
+        step("RETURN", 1, HOLDER, "jointLPHolderUniV2.calcDebtRatioToken"),
+        step("STOP", 0, STRATEGY, "Strategy.balanceJoint"),
+    ]
+    gas = [10_000, 7_900, 7_000, 4_900, 4_000, 1_900, 2_700, 3_500]
+    gasCost = [2_100, 7_100, 2_100, 4_100, 2_100, 0, 0, 0]
+    for entry, left, cost in zip(trace, gas, gasCost):
+        entry.update(gas=left, gasCost=cost)
+
+    report = analyze(trace, gasUsed=27_836)
+    assert report["gasByFunction"] == {
+        # 6,500 of execution plus 21,336 of intrinsic gas charged to the top-level call
+        "Strategy.balanceJoint": {"self": 2_200, "total": 27_836},
+        "[intrinsic]": {"self": 21_336, "total": 21_336},
+        # its SLOAD and the 100 gas STATICCALL, plus the 2,100 spent in getReserves
+        "jointLPHolderUniV2.calcDebtRatioToken": {"self": 2_200, "total": 4_300},
+        "UniswapV2Pair.getReserves": {"self": 2_100, "total": 2_100},
+    }
+    assert formatReport("balanceJoint", report)[-1] == (
+        "      2,100 self     2,100 total  UniswapV2Pair.getReserves"
+    )
+    # without the steps' gas there is nothing to charge
+    assert "gasByFunction" not in analyze(
+        [step("SLOAD", 0, STRATEGY, "Strategy.balanceJoint", (3,))]
+    )
@@ -0,0 +1,79 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from jointsim.insurance import StrategyInsurance
+from jointsim.insurancesweep import randomHarvests, simulateInsurance
+
+
+class Receiver:
+    wantBalance = 0
+
+
+def replay(pnl, totalDebt, params):
+    """Runs the integer model through one history the way Strategy.prepareReturn does."""
+    insurance = StrategyInsurance(*params)
+    insurance.strategy = Receiver()
+    payments = 0
+    for result in pnl:
+        if result > 0:
+            payment = insurance.reportProfit(totalDebt, result)
+            if 0 < payment < result - payment:
+                insurance.balance += payment
+                payments += payment
+        else:
+            insurance.reportLoss(totalDebt, -result)
+    return insurance, payments
+
+
+def test_matches_model():
+    # amounts stay below 2**53 so float64 is exact
+    rng = random.Random(0)
+    totalDebt = 10 ** 12
+    params = [(50, 1000, 5), (200, 2500, 20), (10, 500, 1)]
+    pnl = [
+        [rng.randint(-3 * 10 ** 9, 2 * 10 ** 9) for _ in range(200)] for _ in range(30)
+    ]
+    histories = [(row, params[i % len(params)]) for i, row in enumerate(pnl)]
+
+    result = simulateInsurance(
+        pnl,
+        totalDebt,
+        [p[0] for _, p in histories],
+        [p[1] for _, p in histories],
+        [p[2] for _, p in histories],
+    )
+    for i, (row, param) in enumerate(histories):
+        insurance, payments = replay(row, totalDebt, param)
+        assert result["balance"][i] == insurance.balance
+        assert result["lossSum"][i] == insurance.lossSum
+        assert result["payments"][i] == payments
+        assert result["compensation"][i] == insurance.strategy.wantBalance
+
+
+def test_time_to_target():
+    # 1% profit per harvest, 10% taken: 0.1% of debt per harvest into a 0.5% target
+    result = simulateInsurance(np.full((1, 10), 10 ** 10), 10 ** 12)
+    assert result["harvestsToTarget"][0] == 5
+    assert result["balance"][0] == 5 * 10 ** 9
+    assert result["losses"][0] == 0
+
+
+def test_compensation_capped():
+    pnl = [[10 ** 10] * 5 + [-(10 ** 10)]]
+    result = simulateInsurance(pnl, 10 ** 12)
+    # maximumCompenstionRate 5 bps of 1e12
+    assert result["compensation"][0] == 5 * 10 ** 8
+    assert result["absorbed"][0] == pytest.approx(0.05)
+
+
+def test_random_harvests_batch():
+    pnl = randomHarvests(2_000, 100, 1e24)
+    result = simulateInsurance(pnl, 1e24)
+    assert result["balance"].shape == (2_000,)
+    assert (result["balance"] >= 0).all()
+    np.testing.assert_allclose(
+        result["balance"], result["payments"] - result["compensation"], atol=1e10
+    )
@@ -0,0 +1,99 @@
+import pytest
+
+from jointsim.lending import RAY, SECONDS_PER_YEAR, WAD, aaveReserve, compoundMarket
+from jointsim.montecarlo import DEFAULT_SCENARIO, deploy, runScenario
+from jointsim.safemath import Revert
+
+RELATIVE_APPROX = 1e-3
+UNDERLYING = 1_000_000 * 10 ** 18
+
+
+def test_compound_exchange_rate_accrues_supply_rate():
+    market = compoundMarket(UNDERLYING, 0.7)
+    supplyRate = market.supplyRatePerYear()
+    # 70% of the 5% per year below the kink, less the 10% reserve factor
+    assert pytest.approx(supplyRate / WAD, rel=RELATIVE_APPROX) == 0.7 * 0.035 * 0.9
+    market.accrueInterest(SECONDS_PER_YEAR)
+    assert (
+        pytest.approx(market.exchangeRateStored() / WAD - 1, rel=RELATIVE_APPROX)
+        == supplyRate / WAD
+    )
+
+
+def test_compound_jumps_past_kink():
+    below = compoundMarket(UNDERLYING, 0.8)
+    above = compoundMarket(UNDERLYING, 0.9)
+    assert above.supplyRatePerYear() > 3 * below.supplyRatePerYear()
+
+
+def test_compound_supply_round_trip():
+    market = compoundMarket(UNDERLYING, 0.7)
+    market.accrueInterest(86400)
+    shares = market.supply(10 ** 21)
+    assert market.balanceOf(shares) == pytest.approx(10 ** 21, abs=2)
+    # lending lowers utilisation and so the rate
+    assert (
+        market.supplyRatePerYear() < compoundMarket(UNDERLYING, 0.7).supplyRatePerYear()
+    )
+    assert market.withdraw(market.balanceOf(shares)) <= shares
+
+
+def test_aave_index_accrues_liquidity_rate():
+    reserve = aaveReserve(UNDERLYING, 0.7)
+    liquidityRate = reserve.currentLiquidityRate
+    # 0.7 / 0.9 of the 4% slope, times usage, less the 10% reserve factor
+    assert (
+        pytest.approx(liquidityRate / RAY, rel=RELATIVE_APPROX)
+        == 0.04 * 0.7 / 0.9 * 0.7 * 0.9
+    )
+    shares = reserve.supply(10 ** 21)
+    reserve.accrueInterest(SECONDS_PER_YEAR)
+    assert (
+        pytest.approx(reserve.balanceOf(shares) / 10 ** 21 - 1, rel=1e-2)
+        == liquidityRate / RAY
+    )
+    assert reserve.accruedToTreasury > 0
+
+
+def test_aave_withdraw_more_than_available_reverts():
+    reserve = aaveReserve(UNDERLYING, 0.7)
+    with pytest.raises(Revert):
+        reserve.withdraw(UNDERLYING)
+
+
+@pytest.mark.parametrize("lendModel", ["compound", "aave"])
+def test_provider_lends_into_market(lendModel):
+    scenario = dict(DEFAULT_SCENARIO, price=0.25, lendModel=lendModel)
+    holder, strategies, deposits = deploy("FRAXFTMSpiritLQDR", scenario)
+    for strategy in strategies:
+        market = strategy.lendMarket
+        assert strategy.cTokenBalance > 0
+        assert (
+            pytest.approx(strategy.balanceLend(), rel=RELATIVE_APPROX)
+            == deposits[strategy.tokenIndex] * 0.05
+        )
+        balanceLend = strategy.balanceLend()
+        market.accrueInterest(holder.timestamp + SECONDS_PER_YEAR)
+        assert strategy.balanceLend() > balanceLend
+
+
+def test_failed_call_rolls_back_market():
+    scenario = dict(DEFAULT_SCENARIO, price=0.25, lendModel="compound")
+    holder, strategies, deposits = deploy("FRAXFTMSpiritLQDR", scenario)
+    strategy = strategies[0]
+    market = strategy.lendMarket
+    cash = market.cash
+    holder.setPriceSource(True, 1)
+    holder.oraclePrices[0] //= 2
+    with pytest.raises(Revert):
+        strategy.vault.withdraw(strategy.vault.totalSupply)
+    assert market.cash == cash
+
+
+def test_scenario_reports_lend_yield():
+    scenario = dict(
+        DEFAULT_SCENARIO, price=0.25, days=30, lendModel="aave", gasEstimates=True
+    )
+    result = runScenario("FRAXFTMSpiritLQDR", scenario, 0)
+    assert result["lendYield0"] > 0
+    assert result["lendYield1"] > 0
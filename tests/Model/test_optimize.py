@@ -0,0 +1,51 @@
+from jointsim.optimize import PARAMETERS, candidates, optimize, paretoFrontier
+
+
+def test_candidates():
+    grid = candidates(
+        {
+            "debtUpper": (10150, 10250),
+            "bpsRebalanceDiff": (50,),
+            "rebalancePercent": (10000,),
+        }
+    )
+    assert len(grid) == 2
+    assert [candidate["debtUpper"] for candidate in grid] == [10150, 10250]
+    assert all(set(candidate) == set(PARAMETERS) for candidate in grid)
+
+
+def test_pareto_frontier():
+    scores = [
+        {"rebalanceGas": 1, "ilDrift": 0.05},
+        {"rebalanceGas": 2, "ilDrift": 0.02},
+        {"rebalanceGas": 2, "ilDrift": 0.03},
+        {"rebalanceGas": 3, "ilDrift": 0.04},
+        {"rebalanceGas": 4, "ilDrift": 0.01},
+    ]
+    frontier = paretoFrontier(scores)
+    assert [(entry["rebalanceGas"], entry["ilDrift"]) for entry in frontier] == [
+        (1, 0.05),
+        (2, 0.02),
+        (4, 0.01),
+    ]
+
+
+def test_optimize():
+    grid = {
+        "debtUpper": (10150, 10600),
+        "bpsRebalanceDiff": (50,),
+        "rebalancePercent": (10000,),
+    }
+    scores, frontier = optimize(
+        "FRAXFTMSpiritLQDR",
+        grid,
+        {"days": 30, "gasEstimates": True},
+        nScenarios=4,
+        processes=2,
+    )
+    assert len(scores) == 2
+    tight, loose = scores
+    # a tighter band rebalances at least as often on the same price paths
+    assert tight["rebalanceGas"] >= loose["rebalanceGas"]
+    assert tight["keeperGas"] >= tight["rebalanceGas"]
+    assert frontier and all(entry in scores for entry in frontier)
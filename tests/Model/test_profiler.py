@@ -0,0 +1,84 @@
+import csv
+import json
+
+from scripts.profiler import Profiler
+
+
+class Provider:
+    def make_request(self, method, params):
+        return {"result": params}
+
+
+class Tx:
+    def __init__(self, txid, gas_used):
+        self.txid = txid
+        self.gas_used = gas_used
+
+
+def test_profile(tmp_path):
+    profiler = Profiler(str(tmp_path / "profile.json"), slowest=1)
+    profiler.instrument(Provider)
+    provider = Provider()
+    provider.make_request("eth_chainId", [])
+
+    # sent before the run
+    history = [Tx("0x0", 21_000)]
+    profiler.startTest("test_a", len(history))
+    profiler.fixtureSetup("vaults", "module", 2.0)
+    provider.make_request("eth_sendTransaction", [{}])
+    provider.make_request("eth_call", [{}])
+    history = history + [Tx("0x1", 1_000_000), Tx("0x2", 50_000)]
+    profiler.gasUsed(history)
+    profiler.endTest()
+    for when, duration in (("setup", 2.5), ("call", 1.0), ("teardown", 0.5)):
+        profiler.phase("test_a", when, duration, "passed")
+
+    # fn_isolation reverted test_a's own tx, the module deployment stays
+    history = history[:2]
+    profiler.startTest("test_b", len(history))
+    assert provider.make_request("evm_increaseTime", [60]) == {"result": [60]}
+    # replaying test_a's call on the reverted chain gives the same txid, still charged
+    history = history + [Tx("0x2", 50_000)]
+    profiler.gasUsed(history)
+    profiler.endTest()
+    profiler.phase("test_b", "setup", 0.1, "passed")
+    profiler.phase("test_b", "call", 0.2, "failed")
+    profiler.restore()
+    provider.make_request("eth_call", [{}])
+
+    rows = profiler.rows()
+    assert [row["nodeid"] for row in rows] == ["test_a", "test_b"]
+    assert rows[0]["duration"] == 4.0
+    assert (
+        rows[0]["rpcCalls"],
+        rows[0]["transactions"],
+        rows[0]["gasUsed"],
+        rows[0]["fixtureSeconds"],
+    ) == (2, 1, 1_050_000, 2.0)
+    assert (rows[1]["outcome"], rows[1]["rpcCalls"], rows[1]["gasUsed"]) == (
+        "failed",
+        1,
+        50_000,
+    )
+    assert {
+        method: total["count"] for method, total in profiler.rpcTotals().items()
+    } == {
+        "eth_chainId": 1,
+        "eth_sendTransaction": 1,
+        "eth_call": 1,
+        "evm_increaseTime": 1,
+    }
+
+    jsonPath, csvPath = profiler.write()
+    report = json.load(open(jsonPath))
+    assert report["tests"] == rows
+    assert report["fixtures"] == [
+        {"name": "vaults", "scope": "module", "count": 1, "seconds": 2.0}
+    ]
+    assert report["session"]["rpc"]["eth_chainId"]["count"] == 1
+    assert [row["nodeid"] for row in csv.DictReader(open(csvPath))] == [
+        "test_a",
+        "test_b",
+    ]
+    summary = profiler.summary()
+    assert summary[0] == "slowest 1 tests:" and summary[1].endswith("test_a")
@@ -0,0 +1,90 @@
+import pytest
+
+from jointsim.insurance import StrategyInsurance
+from jointsim.montecarlo import (
+    DEFAULT_SCENARIO,
+    deploy,
+    runMonteCarlo,
+    runScenario,
+    summarize,
+)
+
+RELATIVE_APPROX = 1e-2
+
+
+@pytest.fixture
+def stack():
+    scenario = dict(DEFAULT_SCENARIO, price=0.25)
+    yield deploy("FRAXFTMSpiritLQDR", scenario)
+
+
+def test_first_harvest(stack):
+    holder, strategies, deposits = stack
+    for strategy, amount in zip(strategies, deposits):
+        assert (
+            pytest.approx(strategy.estimatedTotalAssets(), rel=RELATIVE_APPROX)
+            == amount
+        )
+        assert strategy.debtJoint > 0
+        assert strategy.vault.totalDebt == amount
+    assert holder.lpPooled > 0
+    assert holder.calcDebtRatio() == (10_000, 10_000)
+
+
+def test_liquidate_position(stack):
+    holder, strategies, deposits = stack
+    strategy = strategies[0]
+    debtJoint = strategy.debtJoint
+    liquidated, loss = strategy.liquidatePosition(deposits[0] // 2)
+    assert pytest.approx(liquidated, rel=RELATIVE_APPROX) == deposits[0] // 2
+    assert loss == deposits[0] // 2 - liquidated
+    assert strategy.debtJoint < debtJoint
+    # the other provider got its share of the joint back
+    assert strategies[1].balanceOfWant() > 0
+
+
+def test_reduce_debt(stack):
+    holder, strategies, deposits = stack
+    for strategy, amount in zip(strategies, deposits):
+        strategy.vault.updateStrategyDebtRatio(0)
+        holder.timestamp += 3600
+        strategy.harvest()
+        assert pytest.approx(strategy.vault.totalIdle, rel=RELATIVE_APPROX) == amount
+
+
+def test_insurance_caps_compensation():
+    insurance = StrategyInsurance()
+    insurance.strategy = type("Strat", (), {"wantBalance": 0})()
+    assert insurance.reportProfit(10 ** 22, 10 ** 20) == 10 ** 19
+    insurance.balance = 10 ** 19
+
+    # 5 bps of 1e22 per harvest
+    assert insurance.reportLoss(10 ** 22, 10 ** 20) == 5 * 10 ** 18
+    assert insurance.lossSum == 10 ** 20
+    assert insurance.reportProfit(10 ** 22, 10 ** 19) == 0
+    assert insurance.lossSum == 9 * 10 ** 19
+    assert insurance.balance == 0
+    assert insurance.strategy.wantBalance == 10 ** 19
+
+
+def test_run_scenario_is_deterministic():
+    scenario = dict(DEFAULT_SCENARIO, days=30, gasEstimates=True)
+    result = runScenario("FRAXFTMSpiritLQDR", scenario, 7)
+    assert result == runScenario("FRAXFTMSpiritLQDR", scenario, 7)
+    assert result["return0"] > -1 and result["return1"] > -1
+
+
+def test_run_monte_carlo():
+    results = runMonteCarlo(
+        "USDCFTMSpookyLQDR",
+        {"days": 10, "gasEstimates": True},
+        nScenarios=8,
+        processes=2,
+    )
+    assert sorted(result["seed"] for result in results) == list(range(8))
+    summary = summarize(results)
+    assert (
+        summary["return0"]["p5"]
+        <= summary["return0"]["p50"]
+        <= summary["return0"]["p95"]
+    )
@@ -0,0 +1,53 @@
+from jointsim.pair import UniV2Pair
+from jointsim.rewards import (
+    DAY,
+    HOUR,
+    optimalInterval,
+    rewardPool,
+    saleTimes,
+    sellRewardTokens,
+    simulateSchedule,
+)
+
+
+def test_sale_times():
+    # the second provider harvests 30 minutes after the first, canHarvestJoint blocks it
+    harvests = [HOUR * 4, HOUR * 4 + 1800, HOUR * 8, HOUR * 8 + 1800]
+    assert saleTimes(harvests, HOUR) == [HOUR * 4, HOUR * 8]
+    assert saleTimes(harvests, 0) == harvests
+
+
+def test_second_sale_sees_first():
+    pool = rewardPool("LQDRMasterChef")
+    farmAmount = 10_000 * 10 ** 18
+    proceeds, value = sellRewardTokens(farmAmount, pool)
+    assert proceeds == value
+    assert proceeds[0] > proceeds[1]
+    # the pool passed in is left untouched
+    assert pool.reserve0 == 150_000 * 10 ** 18
+
+    hop = UniV2Pair(10 ** 24, 4 * 10 ** 24, 0, 30)
+    proceeds, value = sellRewardTokens(farmAmount, pool, (None, hop))
+    assert proceeds[1] > value[1]
+
+
+def test_impact_grows_with_interval():
+    short = simulateSchedule("LQDRMasterChef", 4 * HOUR, 50, 300)
+    long = simulateSchedule("LQDRMasterChef", 7 * DAY, 50, 300)
+    assert short["sales"] > long["sales"]
+    assert short["gas"] > long["gas"]
+    assert short["impactBps"] < long["impactBps"]
+
+
+def test_optimal_interval():
+    # thin reward pool and cheap gas favour frequent sales
+    best, table = optimalInterval(
+        "SpookyMasterChef", 500, 1, rewardLiquidity=(20_000, 100_000)
+    )
+    assert best["interval"] <= 12 * HOUR
+    # deep pool and expensive gas favour rare sales
+    best, table = optimalInterval(
+        "SpookyMasterChef", 5, 3000, rewardLiquidity=(10 ** 8, 10 ** 9)
+    )
+    assert best["interval"] >= 4 * DAY
+    assert len(table) == 8
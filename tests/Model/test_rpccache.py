@@ -0,0 +1,85 @@
+import json
+import threading
+import urllib.request
+
+from scripts.rpccache import RpcCache, RpcProxy, cacheBlock, makeServer
+
+
+class Upstream:
+    """Counts the requests it answers, result is the request params."""
+
+    def __init__(self):
+        self.calls = []
+
+    def handle(self, payload):
+        requests = payload if isinstance(payload, list) else [payload]
+        self.calls.extend(request["method"] for request in requests)
+        responses = [
+            {"jsonrpc": "2.0", "id": request["id"], "result": request["params"]}
+            for request in requests
+        ]
+        return responses if isinstance(payload, list) else responses[0]
+
+
+def serve(handler):
+    server = makeServer(handler, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, "http://127.0.0.1:{0}".format(server.server_address[1])
+
+
+def post(url, payload):
+    request = urllib.request.Request(
+        url, json.dumps(payload).encode(), {"Content-Type": "application/json"}
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+
+def request(id, method, *params):
+    return {"jsonrpc": "2.0", "id": id, "method": method, "params": list(params)}
+
+
+def test_cache_block():
+    assert cacheBlock("eth_getStorageAt", ["0xabc", "0x0", "0x10"]) == 16
+    assert cacheBlock("eth_call", [{"to": "0xabc"}, {"blockNumber": "0x10"}]) == 16
+    assert cacheBlock("eth_chainId", []) == -1
+    assert cacheBlock("eth_getBalance", ["0xabc", "latest"]) is None
+    assert cacheBlock("eth_sendRawTransaction", ["0x00"]) is None
+
+
+def test_replays_from_cache(tmp_path):
+    upstream = Upstream()
+    upstreamServer, upstreamUrl = serve(upstream)
+    cache = RpcCache(str(tmp_path / "cache.sqlite"))
+    try:
+        proxy = RpcProxy(cache, upstreamUrl)
+        server, url = serve(proxy)
+        batch = [
+            request(1, "eth_getCode", "0xabc", "0x10"),
+            request(2, "eth_getBalance", "0xabc", "latest"),
+            request(3, "eth_chainId"),
+        ]
+        first = post(url, batch)
+        second = post(url, batch)
+        server.shutdown()
+    finally:
+        upstreamServer.shutdown()
+
+    assert first == second
+    assert [response["id"] for response in second] == [1, 2, 3]
+    # only the latest read goes upstream twice
+    assert upstream.calls == [
+        "eth_getCode",
+        "eth_getBalance",
+        "eth_chainId",
+        "eth_getBalance",
+    ]
+    assert (proxy.hits, proxy.misses) == (2, 4)
+    assert cache.stats() == {16: 1, -1: 1}
+
+    offline = RpcProxy(RpcCache(str(tmp_path / "cache.sqlite")))
+    assert offline.handle(request(4, "eth_getCode", "0xabc", "0x10"))["result"] == [
+        "0xabc",
+        "0x10",
+    ]
+    assert "error" in offline.handle(request(5, "eth_getCode", "0xabc", "0x11"))
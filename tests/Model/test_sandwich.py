@@ -0,0 +1,51 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from jointsim.sandwich import recommendPriceSourceDiff, stress
+
+
+def test_no_attack_leaks_nothing():
+    result = stress([0.0], [0.001, 0.1], doPriceCheck=False)
+    assert np.allclose(result["priceDiff"], 10000)
+    assert not result["blocked"].any()
+    assert np.allclose(result["leakBps"], 0)
+    assert np.allclose(result["attackerBps"], 0)
+
+
+def test_price_check_blocks_outside_band():
+    attacks = [-0.2, -0.01, 0.01, 0.2]
+    result = stress(attacks, [0.01], priceSourceDiff=250)
+    inside = np.abs(result["priceDiff"] - 10000) < 250
+    assert (result["blocked"] == ~inside).all()
+    # big attacks move the price by far more than 2.5%, small ones don't
+    assert result["blocked"][[0, 3]].all()
+    assert not result["blocked"][[1, 2]].any()
+
+
+def test_unchecked_withdraw_leaks_to_attacker():
+    checked = stress([0.3], [0.05], priceSourceDiff=250)
+    unchecked = stress([0.3], [0.05], doPriceCheck=False)
+    assert checked["blocked"].all()
+    assert unchecked["leakBps"][0, 0] > 10
+    assert unchecked["attackerBps"][0, 0] > 0
+    # the attacker can't take more than the holder lost
+    assert unchecked["attackerBps"][0, 0] < unchecked["leakBps"][0, 0]
+
+
+def test_rebalance_needs_debt_upper():
+    balanced = stress([0.001], [0.01], action="rebalanceDebt", doPriceCheck=False)
+    skewed = stress(
+        [0.001], [0.01], action="rebalanceDebt", doPriceCheck=False, entryMove=0.1
+    )
+    assert balanced["blocked"].all()
+    assert not skewed["blocked"].any()
+
+
+def test_recommended_diff_blocks_profitable_attacks():
+    recommended, unchecked = recommendPriceSourceDiff(swapFee=30)
+    assert recommended is not None and recommended > 0
+    checked = stress(priceSourceDiff=recommended, swapFee=30)
+    assert not (checked["attackerBps"] > 0).any()
+    profitable = unchecked["attackerBps"] > 0
+    assert (np.abs(unchecked["priceDiff"][profitable] - 10000) >= recommended).all()
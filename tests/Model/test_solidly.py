@@ -0,0 +1,142 @@
+import pytest
+
+from jointsim import JointLPHolderVelo, Revert, SolidlyPair
+from jointsim.montecarlo import runScenario, DEFAULT_SCENARIO, _movePrice
+from jointsim.solidly import Route, convertPathRoutes, getTokenOutPath
+
+
+@pytest.fixture
+def veloPair():
+    # WETH / USDC volatile at 1600 USDC
+    yield SolidlyPair(
+        1_000 * 10 ** 18, 1_600_000 * 10 ** 6, 10 ** 15, False, 2, (18, 6)
+    )
+
+
+@pytest.fixture
+def veloHolder(veloPair):
+    # providers added 10 WETH + 16k USDC, all of it staked in the gauge
+    yield JointLPHolderVelo(
+        veloPair,
+        ("WETH", "USDC"),
+        "WETH",
+        lpPooled=10 ** 13,
+        debtJoint=(10 * 10 ** 18, 16_000 * 10 ** 6),
+        # raw units: 1 wei of WETH is 1.6e-9 USDC units
+        oraclePrices=(16 * 10 ** 8, 10 ** 18),
+        token0TotalSupply=10 ** 24,
+    )
+
+
+def test_volatile_swap_fee_leaves_pool(veloPair):
+    amountIn = 10 ** 18
+    net = amountIn - amountIn * 2 // 10000
+    expected = net * veloPair.reserve1 // (veloPair.reserve0 + net)
+    assert veloPair.getAmountOut(amountIn, 0) == expected
+
+    reserve0 = veloPair.reserve0
+    assert veloPair.swap(amountIn, 0) == expected
+    assert veloPair.reserve0 == reserve0 + net
+
+
+def test_stable_curve():
+    # USDC / DAI, 1M a side
+    stable = SolidlyPair(10 ** 12, 10 ** 24, 10 ** 18, True, 2, (6, 18))
+    volatile = SolidlyPair(10 ** 12, 10 ** 24, 10 ** 18, False, 2, (6, 18))
+    amountIn = 100_000 * 10 ** 6
+
+    out = stable.getAmountOut(amountIn, 0)
+    assert out > volatile.getAmountOut(amountIn, 0)
+    # the flat part of the curve: 10% of the pool trades within 0.5% of 1:1 after fees
+    assert 0.995 < out / 10 ** 18 / (amountIn / 10 ** 6) < 1
+    # the other direction gives the mirror quote
+    assert (
+        pytest.approx(stable.getAmountOut(100_000 * 10 ** 18, 1) * 10 ** 12, rel=1e-6)
+        == out
+    )
+
+    k = stable._k(stable.reserve0, stable.reserve1)
+    stable.swap(amountIn, 0)
+    assert stable._k(stable.reserve0, stable.reserve1) >= k
+
+
+def test_move_stable_price():
+    stable = SolidlyPair(10 ** 12, 10 ** 24, 10 ** 18, True, 2, (6, 18))
+    # balanced reserves trade 1:1 in whole tokens
+    assert stable.spotPrice() == pytest.approx(10 ** 12)
+    for move in (1.003, 0.99, 1.05):
+        price = stable.spotPrice() * move
+        k = stable._k(stable.reserve0, stable.reserve1)
+        _movePrice(stable, price)
+        assert stable.spotPrice() == pytest.approx(price, rel=1e-9)
+        assert stable._k(stable.reserve0, stable.reserve1) >= k
+    # 0.3% off peg moves far more of the pool than x * y = k would
+    stable = SolidlyPair(10 ** 12, 10 ** 24, 10 ** 18, True, 2, (6, 18))
+    volatile = SolidlyPair(10 ** 12, 10 ** 24, 10 ** 18, False, 2, (6, 18))
+    _movePrice(stable, 1.003 * 10 ** 12)
+    _movePrice(volatile, 1.003 * 10 ** 12)
+    assert 10 ** 12 - stable.reserve0 > 10 * (10 ** 12 - volatile.reserve0)
+
+
+def test_routes():
+    assert getTokenOutPath("VELO", "USDC", "WETH") == ["VELO", "WETH", "USDC"]
+    assert getTokenOutPath("USDC", "WETH", "WETH") == ["USDC", "WETH"]
+    assert convertPathRoutes(["VELO", "WETH", "USDC"]) == [
+        Route("VELO", "WETH", False),
+        Route("WETH", "USDC", False),
+    ]
+
+
+def test_rebalance(veloHolder, veloPair):
+    # WETH up about 6%
+    veloPair.swap(50_000 * 10 ** 6, 1)
+    veloHolder.oraclePrices[0] = veloPair.reserve1 * 10 ** 18 // veloPair.reserve0
+    debtRatio0, debtRatio1 = veloHolder.calcDebtRatio()
+    assert debtRatio0 > veloHolder.debtUpper
+
+    sent = veloHolder.rebalanceDebt()
+    assert sent[0] > 0 and sent[1] == 0
+    debtRatio0, debtRatio1 = veloHolder.calcDebtRatio()
+    assert abs(debtRatio0 - debtRatio1) <= veloHolder.bpsRebalanceDiff
+    assert veloHolder.swapSlippage[0] > 0
+
+
+def test_withdraw_from_farm_pulls_whole_amount(veloHolder):
+    veloHolder.lpUnpooled = 10 ** 12
+    veloHolder._withdrawFromFarm(2 * 10 ** 12)
+    # the UniV2 holder would only pull the 1e12 shortfall
+    assert veloHolder.lpUnpooled == 3 * 10 ** 12
+    assert veloHolder.lpPooled == 8 * 10 ** 12
+
+
+def test_three_hop_route():
+    pair = SolidlyPair(10 ** 24, 10 ** 24, 10 ** 24, False, 2, (18, 18))
+    wethPair = SolidlyPair(10 ** 24, 10 ** 24, 10 ** 24, False, 2, (18, 18))
+    holder = JointLPHolderVelo(
+        pair,
+        ("DAI", "OP"),
+        "WETH",
+        routePairs={("WETH", "OP", False): wethPair},
+        balances=(10 ** 18, 0),
+    )
+    with pytest.raises(Revert):
+        holder.swapExactFromTo(0, 1, 10 ** 18)
+    assert holder.balances == [10 ** 18, 0]
+
+    holder.routePairs[("DAI", "WETH", False)] = SolidlyPair(
+        10 ** 24, 10 ** 24, 10 ** 24, False, 2, (18, 18)
+    )
+    holder.swapExactFromTo(0, 1, 10 ** 18)
+    assert holder.balances[0] == 0
+    # two hops pay two fees
+    assert holder.balances[1] < pair.getAmountOut(10 ** 18, 0)
+    assert wethPair.reserve1 < 10 ** 24
+
+
+def test_montecarlo_velo():
+    result = runScenario(
+        "USDCWETHVELO",
+        dict(DEFAULT_SCENARIO, days=30, price=1600, gasEstimates=True),
+        0,
+    )
+    assert result["return0"] > -0.5 and result["return1"] > -0.5
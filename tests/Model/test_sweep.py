@@ -0,0 +1,58 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from jointsim import JointLPHolderUniV2, UniV2Pair
+from jointsim.sweep import priceMoveSurface, sweep
+
+
+def test_sweep_matches_model():
+    rng = random.Random(0)
+    states = []
+    for _ in range(500):
+        totalSupply = rng.randint(10 ** 20, 10 ** 24)
+        reserve0 = rng.randint(10 ** 20, 10 ** 24)
+        reserve1 = rng.randint(10 ** 20, 10 ** 24)
+        lp = rng.randint(10 ** 16, totalSupply // 10)
+        debt0 = lp * reserve0 // totalSupply * rng.randint(8_000, 12_000) // 10_000
+        debt1 = lp * reserve1 // totalSupply * rng.randint(8_000, 12_000) // 10_000
+        states.append((reserve0, reserve1, lp, debt0, debt1, totalSupply))
+
+    result = sweep(*[np.array(column, dtype=np.float64) for column in zip(*states)])
+
+    for i, (reserve0, reserve1, lp, debt0, debt1, totalSupply) in enumerate(states):
+        holder = JointLPHolderUniV2(
+            UniV2Pair(reserve0, reserve1, totalSupply),
+            lpPooled=lp,
+            debtJoint=(debt0, debt1),
+        )
+        assert abs(result["debtRatio0"][i] - holder.calcDebtRatioToken(0)) <= 1
+        assert abs(result["debtRatio1"][i] - holder.calcDebtRatioToken(1)) <= 1
+        # a debt ratio landing 1 bps off moves the notional rebalance by ~1 bps of balance
+        for token, debt in enumerate((debt0, debt1)):
+            loss, profit = holder.calculateProfit(token)
+            assert result["loss{0}".format(token)][i] == pytest.approx(
+                loss, abs=debt * 2e-4
+            )
+            assert result["profit{0}".format(token)][i] == pytest.approx(
+                profit, abs=debt * 2e-4
+            )
+
+
+def test_price_move_surface(holder):
+    moves = np.arange(80, 121) / 100
+    result = priceMoveSurface(holder, moves)
+
+    flat = np.argmin(np.abs(moves - 1))
+    assert result["debtRatio0"][flat] == 10_000
+    assert result["debtRatio1"][flat] == 10_000
+    assert result["priceDiff"][flat] == 10_000
+    # token0 getting more expensive leaves the pool short token0
+    assert np.all(result["debtRatio0"][moves > 1] > 10_000)
+    assert np.all(result["debtRatio1"][moves > 1] < 10_000)
+    # IL grows with the size of the move, whichever way it goes
+    assert result["loss0"][0] > result["loss0"][10] > 0
+    assert result["loss0"][-1] > result["loss0"][-11] > 0
+    assert result["loss1"][0] > result["loss1"][10] > 0
@@ -1,7 +1,8 @@
 import pytest
 from brownie import config
 from brownie import Contract
-from brownie import interface, project
+from brownie import chain, interface, project, network, ZERO_ADDRESS
+from brownie.convert import to_address
 
 VELO = '0x3c8B650257cFb5f272f799F5e2b4e65093a11a05'
 VELO_ROUTER = '0xa132DAB612dB5cB9fC9Ac426A0Cc215A3423F9c9'
@@ -80,6 +81,7 @@ CONFIG = {
         'harvestWhales' : ['0x9c7305eb78a432ced5C4D14Cac27E8Ed569A2e26'],
         'compToken': VELO,
         'router': VELO_ROUTER,
+        'altRouter': ZIP_ROUTER,
         'lpType' : 'solid'
     },
 
@@ -88,50 +90,201 @@ CONFIG = {
 }
 
 
-@pytest.fixture
-def conf():
-    yield CONFIG['USDCWETHVELO']
+# ABIs from contracts/interfaces for the addresses the suite looks up, so Contract()
+# resolves them offline and only goes to the explorer for anything else
+INTERFACES = {
+    VELO_ROUTER : 'ISolidlyRouter01',
+    ZIP_ROUTER : 'IUniswapV2Router02',
+    POOL_ADDRESS_PROVIDER : 'IPoolAddressesProvider',
+    AUSDC : 'IAToken',
+    AWETH : 'IAToken',
+}
+for pairConf in CONFIG.values() :
+    INTERFACES[pairConf['LP']] = 'IBaseV1Pair' if pairConf['lpType'] == 'solid' else 'IUniswapV2Pair'
+INTERFACES = {to_address(address): name for address, name in INTERFACES.items()}
 
-@pytest.fixture
+
+def lookupContract(address, interfaces=INTERFACES):
+    # Contract(address) without the explorer for addresses in interfaces
+    address = to_address(address)
+    if address in interfaces :
+        return getattr(interface, interfaces[address])(address)
+    return Contract(address)
+
+
+# pairs the conf matrix can't run, with the reason they're skipped
+SKIP_PAIRS = {}
+
+
+def pairParams(config, skipPairs):
+    params = []
+    for pair in config :
+        marks = []
+        if pair in skipPairs :
+            marks = [pytest.mark.skip(reason=skipPairs[pair])]
+        params = params + [pytest.param(pair, marks=marks, id=pair)]
+    return params
+
+
+# networks without a fork, where conf is replaced by the mock stack from localConf
+LOCAL_NETWORKS = ['development']
+# the pair localConf rebuilds from mocks, the only one run on LOCAL_NETWORKS
+LOCAL_PAIR = 'USDCWETHVELO'
+
+# USD prices, decimals and per side pool liquidity of the local stack
+LOCAL_PRICES = {'USDC': 1, 'WETH': 1500, 'VELO': VELO_PRICE}
+LOCAL_DECIMALS = {'USDC': 6, 'WETH': 18, 'VELO': 18}
+LOCAL_POOL_VALUE = 5_000_000
+LOCAL_VELO_PER_SECOND = 10 ** 19
+# Aave v3 supply APR, in ray
+LOCAL_LIQUIDITY_RATE = 2 * 10 ** 25
+
+
+@pytest.fixture(scope="session")
+def local():
+    yield network.show_active() in LOCAL_NETWORKS
+
+
+@pytest.fixture(scope="module")
+def localConf(accounts, gov, MockERC20, MockSolidlyFactory, MockSolidlyRouter, MockGauge, MockUniswapV2Factory, MockUniswapV2Router, MockAaveOracle, MockAavePool, MockAToken, MockPoolAddressesProvider):
+    # USDCWETHVELO rebuilt from mocks: USDC / WETH on a 0.02% volatile Solidly pair with a
+    # VELO gauge, VELO sold through WETH on both the Solidly router and a UniswapV2 one
+    # standing in for Zipswap, and Aave v3 lending priced by MockAaveOracle
+    whale = accounts[9]
+    mocks = {}
+    for symbol in LOCAL_PRICES :
+        mocks[symbol] = MockERC20.deploy(symbol, symbol, LOCAL_DECIMALS[symbol], {'from' : gov})
+        mocks[symbol].mint(whale, 10 ** 9 * 10 ** LOCAL_DECIMALS[symbol], {'from' : gov})
+
+    weth = mocks['WETH']
+    factory = MockSolidlyFactory.deploy(2, 2, {'from' : gov})
+    router = MockSolidlyRouter.deploy(factory, weth, {'from' : gov})
+    altFactory = MockUniswapV2Factory.deploy(30, {'from' : gov})
+    altRouter = MockUniswapV2Router.deploy(altFactory, weth, {'from' : gov})
+    for symbol in ['USDC', 'VELO'] :
+        token = mocks[symbol]
+        amount = int(LOCAL_POOL_VALUE / LOCAL_PRICES[symbol]) * 10 ** LOCAL_DECIMALS[symbol]
+        amountWeth = int(LOCAL_POOL_VALUE / LOCAL_PRICES['WETH'] * 10 ** 18)
+        for dex in [router, altRouter] :
+            token.mint(gov, amount, {'from' : gov})
+            weth.mint(gov, amountWeth, {'from' : gov})
+            token.approve(dex, amount, {'from' : gov})
+            weth.approve(dex, amountWeth, {'from' : gov})
+        router.addLiquidity(token, weth, False, amount, amountWeth, 0, 0, gov, 2 ** 256 - 1, {'from' : gov})
+        altRouter.addLiquidity(token, weth, amount, amountWeth, 0, 0, gov, 2 ** 256 - 1, {'from' : gov})
+    lp = factory.getPair(mocks['USDC'], weth, False)
+
+    gauge = MockGauge.deploy(lp, mocks['VELO'], LOCAL_VELO_PER_SECOND, {'from' : gov})
+
+    oracle = MockAaveOracle.deploy(ZERO_ADDRESS, {'from' : gov})
+    pool = MockAavePool.deploy({'from' : gov})
+    provider = MockPoolAddressesProvider.deploy(pool, oracle, {'from' : gov})
+    lendTokens = []
+    for symbol in ['USDC', 'WETH'] :
+        token = mocks[symbol]
+        aToken = MockAToken.deploy(pool, token, LOCAL_DECIMALS[symbol], {'from' : gov})
+        pool.initReserve(token, aToken, {'from' : gov})
+        pool.setLiquidityRate(token, LOCAL_LIQUIDITY_RATE, {'from' : gov})
+        # Aave prices in USD with 8 decimals
+        oracle.setAssetPrice(token, int(LOCAL_PRICES[symbol] * 10 ** 8), {'from' : gov})
+        lendTokens = lendTokens + [aToken]
+
+    # nothing deployed on a development chain is in brownie's deployment map, so
+    # Contract(address) has no ABI for the mocks either. A copy, the live pairs of the
+    # session keep looking up the global INTERFACES
+    interfaces = dict(INTERFACES, **{
+        to_address(router.address): 'ISolidlyRouter01',
+        to_address(altRouter.address): 'IUniswapV2Router02',
+        to_address(lp): 'IBaseV1Pair',
+        to_address(provider.address): 'IPoolAddressesProvider',
+    })
+    for aToken in lendTokens :
+        interfaces[to_address(aToken.address)] = 'IAToken'
+
+    yield dict(
+        CONFIG[LOCAL_PAIR],
+        LP = lp,
+        tokens = [mocks['USDC'].address, weth.address],
+        farm = gauge.address,
+        farmPID = 0,
+        comptroller = provider.address,
+        harvest_tokens = [mocks['VELO'].address],
+        harvestWhales = [whale.address],
+        compToken = mocks['VELO'].address,
+        router = router.address,
+        altRouter = altRouter.address,
+        lendTokens = [aToken.address for aToken in lendTokens],
+        whale = whale.address,
+        interfaces = interfaces,
+    )
+
+
+@pytest.fixture(scope="module", params=pairParams(CONFIG, SKIP_PAIRS))
+def pairName(local, request):
+    if local and request.param != LOCAL_PAIR :
+        pytest.skip('only {0} is mocked on {1}'.format(LOCAL_PAIR, network.show_active()))
+    yield request.param
+    # module_isolation resets the chain once per module, the next pair of the module
+    # deploys on a clean chain too rather than on top of this one
+    chain.reset()
+
+
+@pytest.fixture(scope="module")
+def conf(local, pairName, request):
+    if local :
+        yield request.getfixturevalue('localConf')
+    else :
+        yield CONFIG[pairName]
+
+@pytest.fixture(scope="module")
 def gov(accounts):
     yield accounts.at("0x7601630eC802952ba1ED2B6e4db16F699A0a5A87", force=True)
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def user(accounts):
     yield accounts[0]
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def rewards(accounts):
     yield accounts[1]
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def guardian(accounts):
     yield accounts[2]
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def management(accounts):
     yield accounts[3]
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def strategist(accounts):
     yield accounts[4]
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def keeper(accounts):
     yield accounts[5]
 
-@pytest.fixture
-def router(conf):
-    yield Contract(conf['router'])
+@pytest.fixture(scope="module")
+def contractAt(conf):
+    # lookupContract with the ABIs of the conf in use, localConf adds the mocks'
+    interfaces = conf.get('interfaces', INTERFACES)
+    def contractAt(address):
+        return lookupContract(address, interfaces)
+    yield contractAt
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
+def router(conf, contractAt):
+    yield contractAt(conf['router'])
+
+
+@pytest.fixture(scope="module")
 def amounts(accounts, tokens, user, whales):
     amounts = []
     i = 0 
@@ -147,10 +300,9 @@ def amounts(accounts, tokens, user, whales):
     yield amounts
 
 
-@pytest.fixture
-def weth():
-    token_address = "0x21be370D5312f44cB42ce377BC9b8a0cEF1A4C83"
-    yield interface.IERC20Extended(token_address)
+@pytest.fixture(scope="module")
+def weth(router):
+    yield interface.IERC20Extended(router.weth())
 
 
 @pytest.fixture
@@ -160,8 +312,8 @@ def weth_amout(user, weth):
     yield weth_amout
 
 
-@pytest.fixture
-def tokens(conf, Contract):
+@pytest.fixture(scope="module")
+def tokens(conf):
     nTokens = 2
     #lp = Contract(conf['LP'])
     #tokenList = conf['tokens']
@@ -175,8 +327,11 @@ def tokens(conf, Contract):
 
     yield tokens
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def aTokens(conf, tokens):
+    if 'lendTokens' in conf :
+        yield conf['lendTokens']
+        return
     nTokens = 2
     #tokenList = conf['tokens']
     aTokens = []
@@ -189,7 +344,7 @@ def aTokens(conf, tokens):
 
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def jointLP(pm, gov, conf, keeper ,rewards, guardian, management, jointLPHolderUniV2, jointLPHolderVelo) : 
     lp = conf['LP']
     farmToken = conf['harvest_tokens'][0]
@@ -205,7 +360,7 @@ def jointLP(pm, gov, conf, keeper ,rewards, guardian, management, jointLPHolderU
 
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def vaults(pm, gov, rewards, guardian, management, tokens):
     tokenList = tokens
     vaults = []
@@ -220,22 +375,24 @@ def vaults(pm, gov, rewards, guardian, management, tokens):
 
     yield vaults
 
-@pytest.fixture
-def strategies(strategist, StrategyInsurance, MockAaveOracle, accounts  ,keeper, vaults, tokens, gov, conf, jointLP, providerAAVE):
+@pytest.fixture(scope="module")
+def strategies(strategist, StrategyInsurance, MockAaveOracle, accounts  ,keeper, vaults, tokens, aTokens, gov, conf, local, jointLP, providerAAVE):
 
-    # Set the mock price oracle (oracle fails when running through tests)
-    pool_address_provider = interface.IPoolAddressesProvider(POOL_ADDRESS_PROVIDER)
-    old_oracle = pool_address_provider.getPriceOracle()
-    oracle = MockAaveOracle.deploy(old_oracle, {'from': accounts[0]})
+    # Set the mock price oracle (oracle fails when running through tests), the local
+    # provider already points at one
+    pool_address_provider = interface.IPoolAddressesProvider(conf['comptroller'])
+    if not local :
+        old_oracle = pool_address_provider.getPriceOracle()
+        oracle = MockAaveOracle.deploy(old_oracle, {'from': accounts[0]})
 
-    admin = accounts.at(pool_address_provider.owner(), True)
-    pool_address_provider.setPriceOracle(oracle, {'from': admin})
+        admin = accounts.at(pool_address_provider.owner(), True)
+        pool_address_provider.setPriceOracle(oracle, {'from': admin})
 
     strategies = []
     i = 0
     for vault in vaults : 
         token = tokens[i]
-        strategy = providerAAVE.deploy(vault, jointLP, aTokenDict[tokens[i].address], POOL_ADDRESS_PROVIDER, ZIP_ROUTER, VELO, {"from": strategist} )
+        strategy = providerAAVE.deploy(vault, jointLP, aTokens[i], conf['comptroller'], conf['altRouter'], conf['compToken'], {"from": strategist} )
         insurance = StrategyInsurance.deploy(strategy, {'from' : strategist})
         strategy.setInsurance(insurance, {'from': gov})
         strategies = strategies + [strategy]
@@ -247,11 +404,22 @@ def strategies(strategist, StrategyInsurance, MockAaveOracle, accounts  ,keeper,
     yield strategies
 
 @pytest.fixture
+def batcher(ActionBatcher, user, strategist, tokens, strategies):
+    # runs scripted setup as one transaction, see scripts/batcher.py. Function scoped, so it
+    # is deployed after the test's snapshot and making it keeper is reverted with the test
+    batcher = ActionBatcher.deploy({'from' : user})
+    for token in tokens :
+        token.approve(batcher, 2 ** 256 - 1, {'from' : user})
+    for strategy in strategies :
+        strategy.setKeeper(batcher, {'from' : strategist})
+    yield batcher
+
+@pytest.fixture(scope="module")
 def strategy_contract():
     # yield  project.CoreStrategyProject.USDCWFTMScreamLqdrSpooky
     yield  project.JointlpvolatileProject.providerAAVE
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def jointLP_contract(conf):
     # yield  project.CoreStrategyProject.USDCWFTMScreamLqdrSpooky
 
@@ -262,12 +430,14 @@ def jointLP_contract(conf):
 
 
 
-@pytest.fixture
-def whales(tokens, Contract) : 
-    ZIP_ROUTER = '0xE6Df0BB08e5A97b40B21950a0A51b94c4DbA0Ff6'
+@pytest.fixture(scope="module")
+def whales(conf, tokens, contractAt) : 
+    if 'whale' in conf :
+        yield [conf['whale']] * len(tokens)
+        return
 
-    altRouterContract = Contract(ZIP_ROUTER)
-    factory = Contract(altRouterContract.factory())
+    altRouterContract = contractAt(conf['altRouter'])
+    factory = interface.IUniswapV2Factory(altRouterContract.factory())
     whales = []
     tokenList = tokens
     whale = factory.getPair(tokens[0], tokens[1])
@@ -276,15 +446,23 @@ def whales(tokens, Contract) :
         
         whales = whales + [whale]
 
-    return(whales)
+    yield whales
 
 @pytest.fixture(scope="session")
 def RELATIVE_APPROX():
     yield 1e-2
 
 
+# Module scoped isolation fixture, the deployment fixtures above run once per module
+# on top of it and the chain is reset when the module finishes.
+@pytest.fixture(scope="module", autouse=True)
+def module_setup(module_isolation):
+    pass
+
+
 # Function scoped isolation fixture to enable xdist.
-# Snapshots the chain before each test and reverts after test completion.
+# Snapshots the chain before each test (after the module's deployments) and reverts
+# after test completion.
 @pytest.fixture(scope="function", autouse=True)
 def shared_setup(fn_isolation):
     pass
\ No newline at end of file
@@ -0,0 +1,60 @@
+import json
+import os
+
+import pytest
+
+from scripts.hotspots import formatReport, profileCall
+
+
+@pytest.fixture(scope="module")
+def invested(chain, tokens, vaults, strategies, user, amounts):
+    for i in range(len(tokens)) :
+        tokens[i].approve(vaults[i].address, amounts[i], {"from": user})
+        vaults[i].deposit(amounts[i], {"from": user})
+    chain.sleep(5)
+    chain.mine(5)
+    for strategy in strategies :
+        strategy.harvest()
+
+
+def write_report(pairName, reports):
+    path = os.environ.get('HOTSPOT_REPORT')
+    if not path :
+        return
+    existing = {}
+    if os.path.exists(path) :
+        existing = json.load(open(path))
+    existing[pairName] = reports
+    if os.path.dirname(path) :
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f :
+        json.dump(existing, f, indent=2)
+
+
+def test_view_hotspots(invested, user, tokens, strategies, jointLP, pairName):
+    # the views keepers and UIs poll, outermost first
+    views = [
+        ('estimatedTotalAssets', strategies[0].estimatedTotalAssets, ()),
+        ('balanceJoint', strategies[0].balanceJoint, ()),
+        ('calculateProfit', jointLP.calculateProfit, (tokens[0],)),
+        ('balanceTokenWithRebalance', jointLP.balanceTokenWithRebalance, (0,)),
+        ('calcDebtRatioToken', jointLP.calcDebtRatioToken, (0,)),
+        ('pendingRewards', jointLP.pendingRewards, ()),
+    ]
+    reports = {}
+    for name, fn, args in views :
+        reports[name] = profileCall(fn, *args, sender=user)
+        for line in formatReport(name, reports[name]) :
+            print(line)
+    write_report(pairName, reports)
+
+    # each view runs the ones below it
+    assert reports['estimatedTotalAssets']['calls'] >= reports['balanceJoint']['calls'] >= reports['calculateProfit']['calls']
+    assert reports['balanceTokenWithRebalance']['sloads'] >= reports['calcDebtRatioToken']['sloads'] > 0
+    # the top-level call's total is the transaction's gasUsed and every gas unit is charged
+    # to exactly one function's own code
+    for name, report in reports.items() :
+        functions = report['gasByFunction']
+        root = max(functions, key=lambda fn: functions[fn]['total'])
+        assert functions[root]['total'] == report['gasUsed'], name
+        assert sum(gas['self'] for gas in functions.values()) == report['gasUsed'], name
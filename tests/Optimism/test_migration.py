@@ -3,7 +3,6 @@ from brownie import interface, Contract, accounts
 import pytest
 import time 
 
-ZIP_ROUTER = '0xE6Df0BB08e5A97b40B21950a0A51b94c4DbA0Ff6'
 
 def test_migration(
     chain,
@@ -43,7 +42,7 @@ def test_migration(
         token = tokens[i]
         aToken = aTokens[i]
         vault = vaults[i]
-        newStrategy = strategy_contract.deploy(vault, newJointLP, aToken, conf['comptroller'],ZIP_ROUTER, conf['compToken'], {"from": strategist} )        
+        newStrategy = strategy_contract.deploy(vault, newJointLP, aToken, conf['comptroller'], conf['altRouter'], conf['compToken'], {"from": strategist} )        
         newStrategies = newStrategies + [newStrategy]
 
     newJointLP.initaliseStrategies(newStrategies, {"from": gov})
@@ -3,7 +3,7 @@ from brownie import interface, Contract, accounts
 import pytest
 import time 
 
-ZIP_ROUTER = '0xE6Df0BB08e5A97b40B21950a0A51b94c4DbA0Ff6'
+from scripts.batcher import ActionBatch
 
 
 def calculateLosses(tokens, strategies,amounts):
@@ -18,7 +18,7 @@ def calculateLosses(tokens, strategies,amounts):
 
 
 
-def offSetDebtRatio(interface, gov, whales, tokens, conf, Contract, tokenIndex, swapPct):
+def offSetDebtRatio(interface, gov, whales, tokens, conf, contractAt, tokenIndex, swapPct):
     # use other AMM's LP to force some swaps 
     solidRouter = '0xa38cd27185a464914D3046f0AB9d43356B34829D'
 
@@ -46,34 +46,34 @@ def offSetDebtRatio(interface, gov, whales, tokens, conf, Contract, tokenIndex,
 
 
 def test_rebalanceDebtA(
-    chain, interface ,accounts, whales, Contract, gov, tokens, vaults, strategies, jointLP, user, strategist, amounts, RELATIVE_APPROX, conf
+    chain, interface ,accounts, whales, contractAt, gov, tokens, vaults, strategies, jointLP, user, strategist, amounts, RELATIVE_APPROX, conf, batcher
 ) : 
-    # Deposit to the vault
+    # Deposit to the vaults in one transaction
+    batch = ActionBatch(batcher)
     for i in range(len(tokens)) : 
-        token = tokens[i]
-        vault = vaults[i]
-        strategy = strategies[i]
-        amount = amounts[i]
-        token.approve(vault.address, amount, {"from": user})
-        vault.deposit(amount, {"from": user})
-        assert token.balanceOf(vault.address) == amount
-        
-        # harvest
+        batch.deposit(user, tokens[i], vaults[i], amounts[i])
+    batch.execute({"from": user})
+    for i in range(len(tokens)) : 
+        assert tokens[i].balanceOf(vaults[i].address) == amounts[i]
+
+    # harvest both in another
     chain.sleep(5)
     chain.mine(5)
+    for i in range(len(tokens)) : 
+        batch.harvest(strategies[i])
+    batch.execute({"from": user})
 
     for i in range(len(tokens)) : 
         token = tokens[i]
         vault = vaults[i]
         strategy = strategies[i]
         amount = amounts[i]
-        strategy.harvest()
         strat = strategy
         assert pytest.approx(strategy.estimatedTotalAssets(), rel=RELATIVE_APPROX) == amount
 
     tokenIndex = 0
     swapPct = 0.03
-    offSetDebtRatio(interface, gov, whales, tokens, conf, Contract, tokenIndex, swapPct)
+    offSetDebtRatio(interface, gov, whales, tokens, conf, contractAt, tokenIndex, swapPct)
     chain.sleep(5)
     chain.mine(5)
     #assert False
@@ -102,34 +102,34 @@ def test_rebalanceDebtA(
     print('Debt Ratio B :  {0}'.format(debtRatio1))
 
 def test_rebalanceDebtB(
-    chain, interface ,accounts, whales, Contract, gov, tokens, vaults, strategies, jointLP, user, strategist, amounts, RELATIVE_APPROX, conf
+    chain, interface ,accounts, whales, contractAt, gov, tokens, vaults, strategies, jointLP, user, strategist, amounts, RELATIVE_APPROX, conf, batcher
 ) : 
-    # Deposit to the vault
+    # Deposit to the vaults in one transaction
+    batch = ActionBatch(batcher)
     for i in range(len(tokens)) : 
-        token = tokens[i]
-        vault = vaults[i]
-        strategy = strategies[i]
-        amount = amounts[i]
-        token.approve(vault.address, amount, {"from": user})
-        vault.deposit(amount, {"from": user})
-        assert token.balanceOf(vault.address) == amount
-        
-        # harvest
+        batch.deposit(user, tokens[i], vaults[i], amounts[i])
+    batch.execute({"from": user})
+    for i in range(len(tokens)) : 
+        assert tokens[i].balanceOf(vaults[i].address) == amounts[i]
+
+    # harvest both in another
     chain.sleep(5)
     chain.mine(5)
+    for i in range(len(tokens)) : 
+        batch.harvest(strategies[i])
+    batch.execute({"from": user})
 
     for i in range(len(tokens)) : 
         token = tokens[i]
         vault = vaults[i]
         strategy = strategies[i]
         amount = amounts[i]
-        strategy.harvest()
         strat = strategy
         assert pytest.approx(strategy.estimatedTotalAssets(), rel=RELATIVE_APPROX) == amount
 
     tokenIndex = 1
     swapPct = 0.03
-    offSetDebtRatio(interface, gov, whales, tokens, conf, Contract, tokenIndex, swapPct)
+    offSetDebtRatio(interface, gov, whales, tokens, conf, contractAt, tokenIndex, swapPct)
     chain.sleep(5)
     chain.mine(5)
     #assert False
@@ -160,34 +160,34 @@ def test_rebalanceDebtB(
 
 
 def test_operation_offsetA(
-    chain, interface ,accounts, whales, Contract, gov, tokens, vaults, strategies, jointLP, user, strategist, amounts, RELATIVE_APPROX, conf
+    chain, interface ,accounts, whales, contractAt, gov, tokens, vaults, strategies, jointLP, user, strategist, amounts, RELATIVE_APPROX, conf, batcher
 ):
-    # Deposit to the vault
+    # Deposit to the vaults in one transaction
+    batch = ActionBatch(batcher)
     for i in range(len(tokens)) : 
-        token = tokens[i]
-        vault = vaults[i]
-        strategy = strategies[i]
-        amount = amounts[i]
-        token.approve(vault.address, amount, {"from": user})
-        vault.deposit(amount, {"from": user})
-        assert token.balanceOf(vault.address) == amount
-        
-        # harvest
+        batch.deposit(user, tokens[i], vaults[i], amounts[i])
+    batch.execute({"from": user})
+    for i in range(len(tokens)) : 
+        assert tokens[i].balanceOf(vaults[i].address) == amounts[i]
+
+    # harvest both in another
     chain.sleep(5)
     chain.mine(5)
+    for i in range(len(tokens)) : 
+        batch.harvest(strategies[i])
+    batch.execute({"from": user})
 
     for i in range(len(tokens)) : 
         token = tokens[i]
         vault = vaults[i]
         strategy = strategies[i]
         amount = amounts[i]
-        strategy.harvest()
         strat = strategy
         assert pytest.approx(strategy.estimatedTotalAssets(), rel=RELATIVE_APPROX) == amount
 
     tokenIndex = 0
     swapPct = 0.02
-    offSetDebtRatio(interface, gov, whales, tokens, conf, Contract, tokenIndex, swapPct)
+    offSetDebtRatio(interface, gov, whales, tokens, conf, contractAt, tokenIndex, swapPct)
     chain.sleep(5)
     chain.mine(5)
     #assert False
@@ -212,7 +212,7 @@ def test_operation_offsetA(
 
 
 def test_reduce_debt_offsetA(
-    chain, interface ,accounts, whales, Contract, gov, tokens, vaults, strategies, jointLP, user, strategist, amounts, RELATIVE_APPROX, conf
+    chain, interface ,accounts, whales, contractAt, gov, tokens, vaults, strategies, jointLP, user, strategist, amounts, RELATIVE_APPROX, conf
 ):
     # Deposit to the vault
     for i in range(len(tokens)) : 
@@ -226,7 +226,7 @@ def test_reduce_debt_offsetA(
         
     tokenIndex = 0
     swapPct = 0.02
-    offSetDebtRatio(interface, gov, whales, tokens, conf, Contract, tokenIndex, swapPct)
+    offSetDebtRatio(interface, gov, whales, tokens, conf, contractAt, tokenIndex, swapPct)
     chain.sleep(5)
     chain.mine(5)
 
@@ -262,34 +262,34 @@ def test_reduce_debt_offsetA(
 
 
 def test_operation_offsetB(
-    chain, interface ,accounts, whales, Contract, gov, tokens, vaults, strategies, jointLP, user, strategist, amounts, RELATIVE_APPROX, conf
+    chain, interface ,accounts, whales, contractAt, gov, tokens, vaults, strategies, jointLP, user, strategist, amounts, RELATIVE_APPROX, conf, batcher
 ):
-    # Deposit to the vault
+    # Deposit to the vaults in one transaction
+    batch = ActionBatch(batcher)
     for i in range(len(tokens)) : 
-        token = tokens[i]
-        vault = vaults[i]
-        strategy = strategies[i]
-        amount = amounts[i]
-        token.approve(vault.address, amount, {"from": user})
-        vault.deposit(amount, {"from": user})
-        assert token.balanceOf(vault.address) == amount
-        
-        # harvest
+        batch.deposit(user, tokens[i], vaults[i], amounts[i])
+    batch.execute({"from": user})
+    for i in range(len(tokens)) : 
+        assert tokens[i].balanceOf(vaults[i].address) == amounts[i]
+
+    # harvest both in another
     chain.sleep(5)
     chain.mine(5)
+    for i in range(len(tokens)) : 
+        batch.harvest(strategies[i])
+    batch.execute({"from": user})
 
     for i in range(len(tokens)) : 
         token = tokens[i]
         vault = vaults[i]
         strategy = strategies[i]
         amount = amounts[i]
-        strategy.harvest()
         strat = strategy
         assert pytest.approx(strategy.estimatedTotalAssets(), rel=RELATIVE_APPROX) == amount
 
     tokenIndex = 1
     swapPct = 0.02
-    offSetDebtRatio(interface, gov, whales, tokens, conf, Contract, tokenIndex, swapPct)
+    offSetDebtRatio(interface, gov, whales, tokens, conf, contractAt, tokenIndex, swapPct)
     chain.sleep(5)
     chain.mine(5)
     #assert False
@@ -314,7 +314,7 @@ def test_operation_offsetB(
 
 
 def test_reduce_debt_offsetB(
-    chain, interface ,accounts, whales, Contract, gov, tokens, vaults, strategies, jointLP, user, strategist, amounts, RELATIVE_APPROX, conf
+    chain, interface ,accounts, whales, contractAt, gov, tokens, vaults, strategies, jointLP, user, strategist, amounts, RELATIVE_APPROX, conf
 ):
     # Deposit to the vault
     for i in range(len(tokens)) : 
@@ -328,7 +328,7 @@ def test_reduce_debt_offsetB(
         
     tokenIndex = 1
     swapPct = 0.02
-    offSetDebtRatio(interface, gov, whales, tokens, conf, Contract, tokenIndex, swapPct)
+    offSetDebtRatio(interface, gov, whales, tokens, conf, contractAt, tokenIndex, swapPct)
     chain.sleep(5)
     chain.mine(5)
 
@@ -371,34 +371,34 @@ def test_reduce_debt_offsetB(
 
 
 def test_price_offset_checks_A(
-    chain, interface ,accounts, whales, Contract, gov, tokens, vaults, strategies, jointLP, user, strategist, amounts, RELATIVE_APPROX, conf
+    chain, interface ,accounts, whales, contractAt, gov, tokens, vaults, strategies, jointLP, user, strategist, amounts, RELATIVE_APPROX, conf, batcher
 ) : 
-    # Deposit to the vault
+    # Deposit to the vaults in one transaction
+    batch = ActionBatch(batcher)
     for i in range(len(tokens)) : 
-        token = tokens[i]
-        vault = vaults[i]
-        strategy = strategies[i]
-        amount = amounts[i]
-        token.approve(vault.address, amount, {"from": user})
-        vault.deposit(amount, {"from": user})
-        assert token.balanceOf(vault.address) == amount
-        
-        # harvest
+        batch.deposit(user, tokens[i], vaults[i], amounts[i])
+    batch.execute({"from": user})
+    for i in range(len(tokens)) : 
+        assert tokens[i].balanceOf(vaults[i].address) == amounts[i]
+
+    # harvest both in another
     chain.sleep(5)
     chain.mine(5)
+    for i in range(len(tokens)) : 
+        batch.harvest(strategies[i])
+    batch.execute({"from": user})
 
     for i in range(len(tokens)) : 
         token = tokens[i]
         vault = vaults[i]
         strategy = strategies[i]
         amount = amounts[i]
-        strategy.harvest()
         strat = strategy
         assert pytest.approx(strategy.estimatedTotalAssets(), rel=RELATIVE_APPROX) == amount
 
     tokenIndex = 0
     swapPct = 0.1
-    offSetDebtRatio(interface, gov, whales, tokens, conf, Contract, tokenIndex, swapPct)
+    offSetDebtRatio(interface, gov, whales, tokens, conf, contractAt, tokenIndex, swapPct)
     chain.sleep(5)
     chain.mine(5)
     #assert False
@@ -465,34 +465,34 @@ def test_price_offset_checks_A(
 
 
 def test_price_offset_checks_B(
-    chain, interface ,accounts, whales, Contract, gov, tokens, vaults, strategies, jointLP, user, strategist, amounts, RELATIVE_APPROX, conf
+    chain, interface ,accounts, whales, contractAt, gov, tokens, vaults, strategies, jointLP, user, strategist, amounts, RELATIVE_APPROX, conf, batcher
 ) : 
-    # Deposit to the vault
+    # Deposit to the vaults in one transaction
+    batch = ActionBatch(batcher)
     for i in range(len(tokens)) : 
-        token = tokens[i]
-        vault = vaults[i]
-        strategy = strategies[i]
-        amount = amounts[i]
-        token.approve(vault.address, amount, {"from": user})
-        vault.deposit(amount, {"from": user})
-        assert token.balanceOf(vault.address) == amount
-        
-        # harvest
+        batch.deposit(user, tokens[i], vaults[i], amounts[i])
+    batch.execute({"from": user})
+    for i in range(len(tokens)) : 
+        assert tokens[i].balanceOf(vaults[i].address) == amounts[i]
+
+    # harvest both in another
     chain.sleep(5)
     chain.mine(5)
+    for i in range(len(tokens)) : 
+        batch.harvest(strategies[i])
+    batch.execute({"from": user})
 
     for i in range(len(tokens)) : 
         token = tokens[i]
         vault = vaults[i]
         strategy = strategies[i]
         amount = amounts[i]
-        strategy.harvest()
         strat = strategy
         assert pytest.approx(strategy.estimatedTotalAssets(), rel=RELATIVE_APPROX) == amount
 
     tokenIndex = 1
     swapPct = 0.15
-    offSetDebtRatio(interface, gov, whales, tokens, conf, Contract, tokenIndex, swapPct)
+    offSetDebtRatio(interface, gov, whales, tokens, conf, contractAt, tokenIndex, swapPct)
     chain.sleep(5)
     chain.mine(5)
     #assert False
@@ -573,7 +573,7 @@ def test_migration_offsetA(
     user,
     RELATIVE_APPROX,
     whales,
-    Contract
+    contractAt
 ):
     # Deposit to the vault and harvest
     for i in range(len(tokens)) : 
@@ -597,7 +597,7 @@ def test_migration_offsetA(
         token = tokens[i]
         aToken = aTokens[i]
         vault = vaults[i]
-        newStrategy = strategy_contract.deploy(vault, newJointLP, aToken, conf['comptroller'],ZIP_ROUTER, conf['compToken'], {"from": strategist} )        
+        newStrategy = strategy_contract.deploy(vault, newJointLP, aToken, conf['comptroller'], conf['altRouter'], conf['compToken'], {"from": strategist} )        
         newStrategies = newStrategies + [newStrategy]
 
 
@@ -606,7 +606,7 @@ def test_migration_offsetA(
     tokenIndex = 0
     swapPct = 0.02
 
-    offSetDebtRatio(interface, gov, whales, tokens, conf, Contract, tokenIndex, swapPct)
+    offSetDebtRatio(interface, gov, whales, tokens, conf, contractAt, tokenIndex, swapPct)
     jointLP.setPriceSource(False, 500, {'from' : gov})
 
     chain.sleep(1)
@@ -637,7 +637,7 @@ def test_migration_offsetB(
     user,
     RELATIVE_APPROX,
     whales,
-    Contract
+    contractAt
 ):
     # Deposit to the vault and harvest
     for i in range(len(tokens)) : 
@@ -661,7 +661,7 @@ def test_migration_offsetB(
         token = tokens[i]
         aToken = aTokens[i]
         vault = vaults[i]
-        newStrategy = strategy_contract.deploy(vault, newJointLP, aToken, conf['comptroller'],ZIP_ROUTER, conf['compToken'], {"from": strategist} )        
+        newStrategy = strategy_contract.deploy(vault, newJointLP, aToken, conf['comptroller'], conf['altRouter'], conf['compToken'], {"from": strategist} )        
         newStrategies = newStrategies + [newStrategy]
 
     newJointLP.initaliseStrategies(newStrategies, {"from": gov})
@@ -669,7 +669,7 @@ def test_migration_offsetB(
     tokenIndex = 1
     swapPct = 0.02
 
-    offSetDebtRatio(interface, gov, whales, tokens, conf, Contract, tokenIndex, swapPct)
+    offSetDebtRatio(interface, gov, whales, tokens, conf, contractAt, tokenIndex, swapPct)
     jointLP.setPriceSource(False, 500, {'from' : gov})
 
     chain.sleep(1)